@@ -10,6 +10,8 @@ from app.db.base import Base
 
 from app.db.models.task import Task
 from app.db.models.outbox import OutboxEvent
+from app.db.models.task_counter import TaskCounter
+from app.db.models.task_result import TaskResult
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,38 @@
+"""tasks keyset indexes
+
+Revision ID: 42f158653d15
+Revises: 3b462055396b
+Create Date: 2026-10-18 10:12:41.531204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '42f158653d15'
+down_revision: Union[str, Sequence[str], None] = '3b462055396b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tasks_created_at_id', 'tasks', ['created_at', 'id'], unique=False)
+    op.create_index('ix_tasks_priority_created_at_id', 'tasks', ['priority', 'created_at', 'id'], unique=False)
+    op.create_index('ix_tasks_status_created_at_id', 'tasks', ['status', 'created_at', 'id'], unique=False)
+    op.drop_index('ix_tasks_status', table_name='tasks')
+    op.drop_index('ix_tasks_priority', table_name='tasks')
+    op.drop_index('ix_tasks_created_at', table_name='tasks')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_tasks_created_at', 'tasks', ['created_at'], unique=False)
+    op.create_index('ix_tasks_priority', 'tasks', ['priority'], unique=False)
+    op.create_index('ix_tasks_status', 'tasks', ['status'], unique=False)
+    op.drop_index('ix_tasks_status_created_at_id', table_name='tasks')
+    op.drop_index('ix_tasks_priority_created_at_id', table_name='tasks')
+    op.drop_index('ix_tasks_created_at_id', table_name='tasks')
@@ -0,0 +1,28 @@
+"""task type
+
+Revision ID: 5f3a8c71d2b9
+Revises: 7c1d9e2a4f60
+Create Date: 2026-10-18 18:12:40.531877
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f3a8c71d2b9'
+down_revision: Union[str, Sequence[str], None] = '7c1d9e2a4f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('type', sa.String(length=64), server_default='default', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tasks', 'type')
@@ -0,0 +1,100 @@
+"""outbox partitioning
+
+Revision ID: 7c1d9e2a4f60
+Revises: e48bad40f9a5
+Create Date: 2026-10-18 14:36:52.104719
+
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1d9e2a4f60'
+down_revision: Union[str, Sequence[str], None] = 'e48bad40f9a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, task_id, shard_bucket, routing_key, payload, status, attempts, next_attempt_at, last_error, created_at, sent_at"
+PENDING = sa.text("status = 'NEW'")
+AHEAD_DAYS = 3
+
+
+def _columns() -> list[sa.Column]:
+    return [
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('task_id', sa.UUID(), nullable=False),
+        sa.Column('shard_bucket', sa.SmallInteger(), nullable=False),
+        sa.Column('routing_key', sa.String(length=255), nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('status', postgresql.ENUM('NEW', 'SENT', 'FAILED', name='outbox_status', create_type=False), server_default='NEW', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    ]
+
+
+def _create_partition(day: date) -> None:
+    op.execute(
+        f"CREATE TABLE outbox_events_p{day:%Y%m%d} PARTITION OF outbox_events "
+        f"FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') TO ('{(day + timedelta(days=1)).isoformat()} 00:00:00+00')"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_outbox_status_bucket_next_attempt', table_name='outbox_events')
+    op.drop_index('ix_outbox_status_next_attempt', table_name='outbox_events')
+    op.drop_index('ix_outbox_task_id', table_name='outbox_events')
+    op.execute("ALTER TABLE outbox_events RENAME CONSTRAINT outbox_events_pkey TO outbox_events_legacy_pkey")
+    op.rename_table('outbox_events', 'outbox_events_legacy')
+
+    op.create_table('outbox_events',
+    *_columns(),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)',
+    )
+    op.execute("CREATE TABLE outbox_events_default PARTITION OF outbox_events DEFAULT")
+
+    # суточные партиции на всю историю и на несколько дней вперед, старые потом удалит outbox_maintenance
+    today = datetime.now(timezone.utc).date()
+    first = op.get_bind().execute(
+        sa.text("SELECT min(created_at AT TIME ZONE 'UTC')::date FROM outbox_events_legacy")
+    ).scalar() or today
+    day = first
+    while day <= today + timedelta(days=AHEAD_DAYS):
+        _create_partition(day)
+        day += timedelta(days=1)
+
+    op.execute(f"INSERT INTO outbox_events ({COLUMNS}) SELECT {COLUMNS} FROM outbox_events_legacy")
+    op.drop_table('outbox_events_legacy')
+
+    op.create_index('ix_outbox_pending_next_attempt', 'outbox_events', ['next_attempt_at', 'created_at'], unique=False, postgresql_where=PENDING)
+    op.create_index('ix_outbox_pending_bucket_next_attempt', 'outbox_events', ['shard_bucket', 'next_attempt_at', 'created_at'], unique=False, postgresql_where=PENDING)
+    op.create_index('ix_outbox_task_id', 'outbox_events', ['task_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbox_task_id', table_name='outbox_events')
+    op.drop_index('ix_outbox_pending_bucket_next_attempt', table_name='outbox_events')
+    op.drop_index('ix_outbox_pending_next_attempt', table_name='outbox_events')
+    op.execute("ALTER TABLE outbox_events RENAME CONSTRAINT outbox_events_pkey TO outbox_events_partitioned_pkey")
+    op.rename_table('outbox_events', 'outbox_events_partitioned')
+
+    op.create_table('outbox_events',
+    *_columns(),
+    sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute(f"INSERT INTO outbox_events ({COLUMNS}) SELECT {COLUMNS} FROM outbox_events_partitioned")
+    op.drop_table('outbox_events_partitioned')
+
+    op.create_index('ix_outbox_status_next_attempt', 'outbox_events', ['status', 'next_attempt_at'], unique=False)
+    op.create_index('ix_outbox_task_id', 'outbox_events', ['task_id'], unique=False)
+    op.create_index('ix_outbox_status_bucket_next_attempt', 'outbox_events', ['status', 'shard_bucket', 'next_attempt_at'], unique=False)
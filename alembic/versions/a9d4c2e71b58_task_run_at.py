@@ -0,0 +1,43 @@
+"""task run_at
+
+Revision ID: a9d4c2e71b58
+Revises: 5f3a8c71d2b9
+Create Date: 2026-10-18 21:04:12.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d4c2e71b58'
+down_revision: Union[str, Sequence[str], None] = '5f3a8c71d2b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # новое значение enum нельзя использовать в той же транзакции, где оно добавлено (индекс ниже)
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE task_status ADD VALUE IF NOT EXISTS 'SCHEDULED' AFTER 'NEW'")
+    op.add_column('tasks', sa.Column('run_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('tasks', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(
+        'ix_tasks_scheduled_run_at',
+        'tasks',
+        ['run_at', 'id'],
+        unique=False,
+        postgresql_where=sa.text("status = 'SCHEDULED'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_scheduled_run_at', table_name='tasks', postgresql_where=sa.text("status = 'SCHEDULED'"))
+    # значение enum в Postgres не удаляется; отложенные задачи остаются PENDING без события outbox
+    op.execute("UPDATE tasks SET status = 'PENDING' WHERE status = 'SCHEDULED'")
+    op.drop_column('tasks', 'attempts')
+    op.drop_column('tasks', 'run_at')
@@ -0,0 +1,92 @@
+"""task counters
+
+Revision ID: c3e8b5d1f047
+Revises: a9d4c2e71b58
+Create Date: 2026-10-18 22:37:05.914263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e8b5d1f047'
+down_revision: Union[str, Sequence[str], None] = 'a9d4c2e71b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# дельты считаются по transition tables один раз на оператор, а не на строку;
+# шард по pg_backend_pid(): параллельные транзакции обновляют разные строки счетчика
+APPLY_FUNCTION = """
+CREATE FUNCTION task_counters_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM task_counters;
+        RETURN NULL;
+    ELSIF TG_OP = 'INSERT' THEN
+        INSERT INTO task_counters (status, priority, shard, count)
+        SELECT status, priority, pg_backend_pid() % 16, count(*) FROM new_rows GROUP BY status, priority
+        ON CONFLICT (status, priority, shard) DO UPDATE SET count = task_counters.count + EXCLUDED.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO task_counters (status, priority, shard, count)
+        SELECT status, priority, pg_backend_pid() % 16, -count(*) FROM old_rows GROUP BY status, priority
+        ON CONFLICT (status, priority, shard) DO UPDATE SET count = task_counters.count + EXCLUDED.count;
+    ELSE
+        -- UPDATE без смены статуса/приоритета дает нулевую дельту и ничего не пишет
+        INSERT INTO task_counters (status, priority, shard, count)
+        SELECT status, priority, pg_backend_pid() % 16, sum(delta)
+        FROM (
+            SELECT status, priority, 1 AS delta FROM new_rows
+            UNION ALL
+            SELECT status, priority, -1 FROM old_rows
+        ) d
+        GROUP BY status, priority
+        HAVING sum(delta) <> 0
+        ON CONFLICT (status, priority, shard) DO UPDATE SET count = task_counters.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+TRIGGERS = {
+    'trg_task_counters_insert': 'AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows',
+    'trg_task_counters_update': 'AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'trg_task_counters_delete': 'AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows',
+    'trg_task_counters_truncate': 'AFTER TRUNCATE ON tasks',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # запись в tasks блокируется до конца миграции, бэкфилл и триггеры видят одно и то же состояние
+    op.execute("LOCK TABLE tasks IN SHARE MODE")
+    op.create_table(
+        'task_counters',
+        sa.Column('status', postgresql.ENUM(name='task_status', create_type=False), nullable=False),
+        sa.Column('priority', postgresql.ENUM(name='task_priority', create_type=False), nullable=False),
+        sa.Column('shard', sa.SmallInteger(), nullable=False),
+        sa.Column('count', sa.BigInteger(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('status', 'priority', 'shard'),
+    )
+    op.execute(APPLY_FUNCTION)
+    # transition tables нельзя объявить у триггера на несколько событий, поэтому по триггеру на событие
+    for name, event in TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER {name} {event} FOR EACH STATEMENT EXECUTE FUNCTION task_counters_apply()")
+
+    op.execute(
+        "INSERT INTO task_counters (status, priority, shard, count) "
+        "SELECT status, priority, 0, count(*) FROM tasks GROUP BY status, priority"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER {name} ON tasks")
+    op.execute("DROP FUNCTION task_counters_apply()")
+    op.drop_table('task_counters')
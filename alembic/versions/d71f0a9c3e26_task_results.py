@@ -0,0 +1,60 @@
+"""task results
+
+Revision ID: d71f0a9c3e26
+Revises: c3e8b5d1f047
+Create Date: 2026-10-19 00:21:48.602731
+
+"""
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd71f0a9c3e26'
+down_revision: Union[str, Sequence[str], None] = 'c3e8b5d1f047'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'task_results',
+        sa.Column('task_id', sa.UUID(), nullable=False),
+        sa.Column('encoding', sa.String(length=16), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('task_id'),
+    )
+    # данные уже сжаты приложением, TOAST не тратит время на повторное pglz сжатие
+    op.execute("ALTER TABLE task_results ALTER COLUMN data SET STORAGE EXTERNAL")
+    # уже записанные результаты остаются в tasks.result, приложение читает оба места
+
+
+def _decompress(data: bytes, encoding: str) -> bytes:
+    # без импорта app: миграция не должна зависеть от того, как приложение сжимает результаты позже
+    if encoding == "plain":
+        return data
+    if encoding == "zlib":
+        return zlib.decompress(data)
+    if encoding == "zstd":
+        from compression import zstd  # Python 3.14+
+
+        return zstd.decompress(data)
+    raise ValueError(f"Неизвестное сжатие результата: {encoding}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT task_id, encoding, data FROM task_results")).all()
+    for task_id, encoding, data in rows:
+        bind.execute(
+            sa.text("UPDATE tasks SET result = :result WHERE id = :id"),
+            {"id": task_id, "result": _decompress(data, encoding).decode("utf-8")},
+        )
+    op.drop_table('task_results')
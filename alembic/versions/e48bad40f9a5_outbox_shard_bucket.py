@@ -0,0 +1,36 @@
+"""outbox shard bucket
+
+Revision ID: e48bad40f9a5
+Revises: 42f158653d15
+Create Date: 2026-10-18 11:02:17.448391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e48bad40f9a5'
+down_revision: Union[str, Sequence[str], None] = '42f158653d15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('outbox_events', sa.Column('shard_bucket', sa.SmallInteger(), server_default='0', nullable=False))
+    # то же, что app.db.models.outbox.outbox_shard_bucket: первые 4 байта md5(task_id) % 1024
+    op.execute(
+        "UPDATE outbox_events "
+        "SET shard_bucket = (('x' || substr(md5(uuid_send(task_id)), 1, 8))::bit(32)::bigint % 1024)::smallint"
+    )
+    op.alter_column('outbox_events', 'shard_bucket', server_default=None)
+    op.create_index('ix_outbox_status_bucket_next_attempt', 'outbox_events', ['status', 'shard_bucket', 'next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbox_status_bucket_next_attempt', table_name='outbox_events')
+    op.drop_column('outbox_events', 'shard_bucket')
@@ -0,0 +1,54 @@
+import time
+from typing import Iterable
+
+from fastapi import APIRouter, Response
+from starlette.routing import BaseRoute
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from app.core.metrics import HTTP_REQUEST_SECONDS
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+def route_labels(routes: Iterable[BaseRoute], prefix: str = "") -> dict[int, str]:
+    # шаблон пути, а не сам путь: иначе каждый task_id станет отдельной серией;
+    # path_format без конверторов ({x:path} -> {x}), prefix - тот, с которым роутер подключен через include_router
+    return {id(route): prefix + route.path_format for route in routes if hasattr(route, "path_format")}
+
+
+def _route_label(scope, labels: dict[int, str]) -> str:
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    return labels.get(id(route)) or getattr(route, "path_format", "unmatched")
+
+
+class MetricsMiddleware:
+    # чистый ASGI без BaseHTTPMiddleware: не буферизует SSE и не добавляет задач на запрос
+    def __init__(self, app, labels: dict[int, str]) -> None:
+        self.app = app
+        self._labels = labels
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(scope["method"], _route_label(scope, self._labels), status).observe(time.perf_counter() - started)
@@ -0,0 +1,41 @@
+from typing import Any, Callable, Iterable, Sequence
+
+import orjson
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from starlette.types import Receive, Scope, Send
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        # OPT_UTC_Z: время в том же виде, что отдает pydantic (...Z)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    # on_close вызывается при любом исходе отправки, в том числе при обрыве клиента до первого чанка,
+    # когда генератор не стартовал и background не запускается
+    def __init__(self, content: Any, on_close: Callable[[], None], **kwargs: Any) -> None:
+        super().__init__(content, **kwargs)
+        self._on_close = on_close
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._on_close()
+
+
+def orm_rows(objects: Iterable[Any], schema: type[BaseModel]) -> list[dict[str, Any]]:
+    # загруженные колонки берутся из __dict__ без дескрипторов ORM и валидации pydantic, uuid/datetime/enum сериализует orjson
+    fields = tuple(schema.model_fields)
+    rows = []
+    for obj in objects:
+        state = obj.__dict__
+        rows.append({name: state[name] if name in state else getattr(obj, name) for name in fields})
+    return rows
+
+
+def projected_rows(rows: Iterable[Sequence[Any]], names: Sequence[str]) -> list[dict[str, Any]]:
+    # запрошенные поля идут первыми колонками строки, служебные колонки в конце отбрасывает zip
+    return [dict(zip(names, row)) for row in rows]
@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+
+from app.schemas.cache import StatusCacheStatsRead
+from app.services.status_cache import status_cache
+
+router = APIRouter(prefix="/cache", tags=["Кэш"])
+
+
+@router.get("/status", response_model=StatusCacheStatsRead, summary="Статистика кэша статусов", description="Размер кэша статусов задач, попадания, промахи и среднее время ответа.")
+async def get_status_cache_stats() -> StatusCacheStatsRead:
+    return StatusCacheStatsRead.model_validate(status_cache.stats())
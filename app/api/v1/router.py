@@ -1,5 +1,19 @@
 from fastapi import APIRouter
+
+from app.api.v1.cache import router as cache_router
 from app.api.v1.tasks import router as tasks_router
+from app.api.v1.tasks_async import router as async_tasks_router
+
+
+API_V1_PREFIX = "/api/v1"
+
+
+def v1_routers(async_db: bool) -> list[APIRouter]:
+    return [async_tasks_router if async_db else tasks_router, cache_router]
+
 
-router = APIRouter(prefix="/api/v1")
-router.include_router(tasks_router)
\ No newline at end of file
+def build_router(async_db: bool) -> APIRouter:
+    router = APIRouter(prefix=API_V1_PREFIX)
+    for sub_router in v1_routers(async_db):
+        router.include_router(sub_router)
+    return router
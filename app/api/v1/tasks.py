@@ -1,12 +1,28 @@
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.api.responses import ClosingStreamingResponse, ORJSONResponse, orm_rows, projected_rows
+from app.core.config import settings
 from app.core.enums import Priority, TaskStatus
-from app.db.session import get_db
-from app.schemas.tasks import TaskCreate, TaskListRead, TaskRead, TaskStatusRead
+from app.db.session import SessionLocal, get_db
+from app.schemas.tasks import (
+    TaskBatchCreate,
+    TaskCreate,
+    TaskListRead,
+    TaskRead,
+    TaskStatusBatchRead,
+    TaskStatusBatchRequest,
+    TaskStatsRead,
+    TaskStatusRead,
+)
+from app.services.task_events import open_status_stream, wait_for_terminal
 from app.services.task_service import TaskService
+from app.utils.pagination import next_cursor
+from app.utils.status_stream import status_map_chunks
 
 router = APIRouter(prefix="/tasks", tags=["Задачи"])
 
@@ -15,12 +31,49 @@ def get_service(db: Session = Depends(get_db)) -> TaskService:
     return TaskService(db)
 
 
+def _read_statuses(task_ids: list[UUID]) -> dict[UUID, TaskStatus]:
+    # отдельная короткая сессия: ожидание не должно держать соединение из пула
+    with SessionLocal() as db:
+        return TaskService(db).get_task_statuses(task_ids)
+
+
+async def _snapshot(task_ids: list[UUID]) -> dict[UUID, TaskStatus]:
+    return await run_in_threadpool(_read_statuses, task_ids)
+
+
 @router.post("", response_model=TaskRead, status_code=status.HTTP_201_CREATED, summary="Создать задачу", description="Создание нновой задачи.")
 def create_task(payload: TaskCreate, svc: TaskService = Depends(get_service)) -> TaskRead:
-    task = svc.create_task(title=payload.title, description=payload.description, priority=payload.priority)
+    task = svc.create_task(
+        title=payload.title,
+        description=payload.description,
+        priority=payload.priority,
+        task_type=payload.type,
+        run_at=payload.run_at,
+    )
     return TaskRead.model_validate(task)
 
 
+@router.post(":batch", response_model=list[TaskRead], status_code=status.HTTP_201_CREATED, summary="Создать задачи пачкой", description="Создание нескольких задач одной транзакцией.")
+def create_tasks_batch(payload: TaskBatchCreate, svc: TaskService = Depends(get_service)) -> ORJSONResponse:
+    tasks = svc.create_tasks([x.model_dump() for x in payload.items])
+    return ORJSONResponse(orm_rows(tasks, TaskRead), status_code=status.HTTP_201_CREATED)
+
+
+@router.get("/events", summary="Поток статусов задач", description="SSE: сначала текущий статус каждой задачи, затем переходы в COMPLETED/FAILED/CANCELLED. Поток закрывается, когда все задачи завершены.")
+async def stream_task_events(
+    ids: list[UUID] = Query(..., min_length=1, max_length=settings.TASKS_EVENTS_MAX_IDS, description="task_id задач, параметр можно повторять"),
+) -> ClosingStreamingResponse:
+    sub, stream = await open_status_stream(ids, _snapshot)
+    return ClosingStreamingResponse(
+        stream, sub.close, media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/stats", response_model=TaskStatsRead, summary="Счетчики задач", description="Количество задач по статусам и приоритетам из инкрементальных счетчиков, без count(*) по таблице задач.")
+def get_task_stats(svc: TaskService = Depends(get_service)) -> TaskStatsRead:
+    return TaskStatsRead.model_validate(svc.get_stats())
+
+
 @router.get("/{task_id}", response_model=TaskRead, summary="Получить задачу", description="Получить всю информацию по задаче по её task_id.")
 def get_task(task_id: UUID, svc: TaskService = Depends(get_service)) -> TaskRead:
     task = svc.get_task(task_id)
@@ -31,17 +84,58 @@ def get_task(task_id: UUID, svc: TaskService = Depends(get_service)) -> TaskRead
 def list_tasks(
     limit: int = Query(20, ge=1, le=100, description="Количество задач в ответе"),
     offset: int = Query(0, ge=0, description="Смещение для пагинации"),
+    cursor: str | None = Query(default=None, description="Курсор следующей страницы (next_cursor), offset при этом игнорируется"),
     status_filter: TaskStatus | None = Query(default=None, alias="status", description="Фильтр по статусу задачи"),
     priority_filter: Priority | None = Query(default=None, alias="priority", description="Фильтр по приоритету задачи"),
-    svc: TaskService = Depends(get_service)) -> TaskListRead:
-    items = svc.list_tasks(limit=limit, offset=offset, status=status_filter, priority=priority_filter)
-    return TaskListRead(items=[TaskRead.model_validate(x) for x in items], limit=limit, offset=offset)
+    fields: str | None = Query(default=None, description="Поля задачи через запятую, например id,title,status,created_at. Из БД читаются только эти колонки"),
+    with_total: bool = Query(False, description="Добавить total - число задач под фильтрами status/priority из счетчиков"),
+    svc: TaskService = Depends(get_service)) -> ORJSONResponse:
+    total = svc.count_tasks(status=status_filter, priority=priority_filter) if with_total else None
+    if fields is not None:
+        names, rows = svc.list_task_rows(
+            fields=fields, limit=limit, offset=offset, status=status_filter, priority=priority_filter, cursor=cursor
+        )
+        return ORJSONResponse(
+            {
+                "items": projected_rows(rows, names),
+                "limit": limit,
+                "offset": offset,
+                "next_cursor": next_cursor(rows, limit),
+                "total": total,
+            }
+        )
+
+    items = svc.list_tasks(limit=limit, offset=offset, status=status_filter, priority=priority_filter, cursor=cursor)
+    # строки сериализуются напрямую, response_model остается для схемы OpenAPI
+    return ORJSONResponse(
+        {
+            "items": orm_rows(items, TaskRead),
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": next_cursor(items, limit),
+            "total": total,
+        }
+    )
 
 
 @router.get("/{task_id}/status", response_model=TaskStatusRead, summary="Статус задачи", description="Возвращает текущий статус задачи по её task_id.")
 def get_task_status(task_id: UUID, svc: TaskService = Depends(get_service)) -> TaskStatusRead:
-    task = svc.get_task(task_id)
-    return TaskStatusRead(id=task.id, status=task.status)
+    return TaskStatusRead(id=task_id, status=svc.get_task_status(task_id))
+
+
+@router.post("/status:batch", response_model=TaskStatusBatchRead, summary="Статусы задач пачкой", description="Статусы нескольких задач одним запросом, не найденные task_id возвращаются в not_found.")
+def get_task_statuses_batch(payload: TaskStatusBatchRequest, svc: TaskService = Depends(get_service)) -> StreamingResponse:
+    statuses = svc.find_task_statuses(payload.ids)
+    not_found = [x for x in dict.fromkeys(payload.ids) if x not in statuses]
+    return StreamingResponse(status_map_chunks(statuses, not_found), media_type="application/json")
+
+
+@router.get("/{task_id}/wait", response_model=TaskStatusRead, summary="Дождаться завершения задачи", description="Long-poll: отвечает, как только задача перейдет в COMPLETED/FAILED/CANCELLED, либо по истечении timeout с текущим статусом.")
+async def wait_task(
+    task_id: UUID,
+    timeout: float = Query(30.0, gt=0, le=settings.TASKS_WAIT_MAX_SECONDS, description="Максимальное ожидание в секундах"),
+) -> TaskStatusRead:
+    return TaskStatusRead(id=task_id, status=await wait_for_terminal(task_id, timeout, _snapshot))
 
 
 @router.delete("/{task_id}", response_model=TaskRead, summary="Отменить задачу", description="Отменяет задачу, если она ещё не начала выполняться(IN_PROGRESS).")
@@ -15,13 +15,39 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str
     POSTGRES_PORT: int = 5432
     DATABASE_URL: str | None = None
+    DB_ASYNC: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
 
     RABBITMQ_URL: str
     RABBITMQ_ENABLED: bool = True
+    RABBITMQ_POOL_SIZE: int = 4
+    RABBITMQ_POOL_TIMEOUT: float = 5.0
+    RABBITMQ_PUBLISH_CONFIRMS: bool = False
+    RABBITMQ_CONTENT_TYPE: str = "application/json"
+
+    TASKS_BATCH_MAX_SIZE: int = 1000
+    TASKS_STATUS_BATCH_MAX_SIZE: int = 5000
+    STATUS_CACHE_ENABLED: bool = True
+    STATUS_CACHE_MAX_SIZE: int = 100_000
+    STATUS_CACHE_TTL_SECONDS: float = 1.0
+    TASKS_NOTIFY_ENABLED: bool = True
+    TASKS_WAIT_MAX_SECONDS: float = 60.0
+    TASKS_EVENTS_KEEPALIVE_SECONDS: float = 15.0
+    TASKS_EVENTS_MAX_IDS: int = 500
 
     WORKER_PREFETCH: int
+    WORKER_BATCH_SIZE: int = 1
+    WORKER_BATCH_WAIT_MS: int = 50
+    WORKER_POOL: str = "none"
+    WORKER_CONCURRENCY: int = 0
+    WORKER_SCHEDULER_WEIGHTS: str | None = None
+    WORKER_SCHEDULER_STATS_INTERVAL: float = 30.0
     MAX_RETRIES: int
     RETRY_DELAYS_SECONDS: str
+    RETRY_MODE: str = "queue"
+    TASK_RESULT_INLINE_MAX_BYTES: int = 2000
+    TASK_RESULT_COMPRESSION: str = "zlib"
 
     TASKS_QUEUE_HIGH: str = "tasks.high"
     TASKS_QUEUE_MEDIUM: str = "tasks.medium"
@@ -30,9 +56,21 @@ class Settings(BaseSettings):
     OUTBOX_POLL_INTERVAL: float
     OUTBOX_BATCH_SIZE: int
     OUTBOX_MAX_ATTEMPTS: int
+    OUTBOX_PUBLISH_MODE: str = "single"
+    OUTBOX_IMMEDIATE_DISPATCH: bool = False
+    OUTBOX_IMMEDIATE_GRACE_SECONDS: float = 5.0
+    OUTBOX_SHARD: str | None = None
+    OUTBOX_SCHEDULE_BATCH_SIZE: int = 1000
+    OUTBOX_PARTITIONS_AHEAD_DAYS: int = 3
+    OUTBOX_RETENTION_DAYS: int = 7
+    OUTBOX_RETENTION_MODE: str = "drop"
 
     WORKER_QUEUES: str | None = None
 
+    METRICS_ENABLED: bool = True
+    METRICS_PORT: int = 0
+    OUTBOX_METRICS_INTERVAL: float = 15.0
+
     @property
     def db_url(self) -> str:
         if self.DATABASE_URL:
@@ -1,5 +1,7 @@
 from enum import Enum
 
+DEFAULT_TASK_TYPE = "default"
+
 
 class Priority(str, Enum):
     LOW = "LOW"
@@ -9,6 +11,7 @@ class Priority(str, Enum):
 
 class TaskStatus(str, Enum):
     NEW = "NEW"
+    SCHEDULED = "SCHEDULED"
     PENDING = "PENDING"
     IN_PROGRESS = "IN_PROGRESS"
     COMPLETED = "COMPLETED"
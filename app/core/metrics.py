@@ -0,0 +1,70 @@
+import logging
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram, start_http_server
+from prometheus_client.core import GaugeMetricFamily
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# API
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Время обработки HTTP запроса", ["method", "route", "status"]
+)
+
+# outbox
+OUTBOX_BATCH_SIZE = Histogram(
+    "outbox_batch_size", "Размер пачки событий outbox", buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+)
+OUTBOX_PUBLISH_SECONDS = Histogram("outbox_publish_duration_seconds", "Время публикации пачки outbox", ["mode"])
+OUTBOX_EVENTS = Counter("outbox_events_total", "События outbox по результату публикации", ["result"])
+OUTBOX_BACKLOG = Gauge("outbox_backlog", "Количество событий outbox в статусе NEW", ["shard"])
+OUTBOX_OLDEST_NEW_AGE = Gauge("outbox_oldest_new_age_seconds", "Возраст самого старого события NEW", ["shard"])
+TASKS_PROMOTED = Counter("tasks_scheduled_promoted_total", "Отложенные задачи, переведенные в PENDING по run_at")
+
+# воркеры
+WORKER_MESSAGES = Counter(
+    "worker_messages_total", "Сообщения воркера по итогу: completed, failed, claim_miss, invalid, error", ["queue", "outcome"]
+)
+WORKER_RETRIES = Counter("worker_retries_total", "Повторные публикации сообщений", ["queue", "reason"])
+WORKER_DLQ = Counter("worker_dlq_total", "Сообщения, отправленные в dlq", ["queue", "reason"])
+WORKER_HANDLER_SECONDS = Histogram("worker_handler_duration_seconds", "Время выполнения обработчика задачи", ["type"])
+WORKER_QUEUE_WAIT_SECONDS = Histogram(
+    "worker_queue_wait_seconds",
+    "Время ожидания сообщения в локальном буфере планировщика приоритетов",
+    ["priority"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+
+class PoolCollector:
+    # читает счетчики пула в момент scrape, на checkout/checkin ничего не навешивается
+    def collect(self):
+        from app.db.session import async_engine, engine
+
+        families = {
+            name: GaugeMetricFamily(f"db_pool_{name}", doc, labels=["engine"])
+            for name, doc in (
+                ("size", "Размер пула соединений"),
+                ("checked_out", "Соединения, выданные из пула"),
+                ("checked_in", "Свободные соединения в пуле"),
+                ("overflow", "Соединения сверх pool_size"),
+            )
+        }
+        for label, pool in (("sync", engine.pool), ("async", async_engine.sync_engine.pool)):
+            if not hasattr(pool, "checkedout"):
+                continue
+            families["size"].add_metric([label], pool.size())
+            families["checked_out"].add_metric([label], pool.checkedout())
+            families["checked_in"].add_metric([label], pool.checkedin())
+            families["overflow"].add_metric([label], max(0, pool.overflow()))
+        yield from families.values()
+
+
+REGISTRY.register(PoolCollector())
+
+
+def start_metrics_server() -> None:
+    if settings.METRICS_PORT:
+        start_http_server(settings.METRICS_PORT)
+        logger.info(f"Метрики доступны на порту {settings.METRICS_PORT}")
@@ -1,7 +1,8 @@
+import hashlib
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, Enum, Index, Integer, String, Text, func, JSON
+from sqlalchemy import DateTime, Enum, Index, Integer, SmallInteger, String, Text, func, JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -9,12 +10,26 @@ from app.core.enums import OutboxStatus
 from app.db.base import Base
 
 
+OUTBOX_SHARD_BUCKETS = 1024
+
+
+def outbox_shard_bucket(task_id: uuid.UUID) -> int:
+    # совпадает с выражением бэкфилла в миграции: md5(uuid_send(task_id)), первые 4 байта
+    return int.from_bytes(hashlib.md5(task_id.bytes).digest()[:4], "big") % OUTBOX_SHARD_BUCKETS
+
+
+def _default_shard_bucket(context) -> int:
+    return outbox_shard_bucket(context.get_current_parameters()["task_id"])
+
+
 class OutboxEvent(Base):
     __tablename__ = "outbox_events"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
     task_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    shard_bucket: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=_default_shard_bucket)
 
     routing_key: Mapped[str] = mapped_column(String(255), nullable=False)
     payload: Mapped[dict] = mapped_column(JSON, nullable=False)
@@ -36,11 +51,28 @@ class OutboxEvent(Base):
     last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        nullable=False,
+        primary_key=True,
+        default=lambda: datetime.now(timezone.utc),
         server_default=func.now(),
     )
     sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
 
-Index("ix_outbox_status_next_attempt", OutboxEvent.status, OutboxEvent.next_attempt_at)
-Index("ix_outbox_task_id", OutboxEvent.task_id)
\ No newline at end of file
+_PENDING = OutboxEvent.status == OutboxStatus.NEW
+
+Index(
+    "ix_outbox_pending_next_attempt",
+    OutboxEvent.next_attempt_at,
+    OutboxEvent.created_at,
+    postgresql_where=_PENDING,
+    sqlite_where=_PENDING,
+)
+Index("ix_outbox_task_id", OutboxEvent.task_id)
+Index(
+    "ix_outbox_pending_bucket_next_attempt",
+    OutboxEvent.shard_bucket,
+    OutboxEvent.next_attempt_at,
+    OutboxEvent.created_at,
+    postgresql_where=_PENDING,
+    sqlite_where=_PENDING,
+)
\ No newline at end of file
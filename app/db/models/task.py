@@ -1,12 +1,13 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Enum, Index, String, Text, func
+from sqlalchemy import DateTime, Enum, Index, Integer, String, Text, func
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.core.enums import Priority, TaskStatus
+from app.core.enums import DEFAULT_TASK_TYPE, Priority, TaskStatus
 from app.db.base import Base
+from app.db.models.task_result import TaskResult
 
 
 class Task(Base):
@@ -20,6 +21,12 @@ class Task(Base):
 
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    type: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False,
+        default=DEFAULT_TASK_TYPE,
+        server_default=DEFAULT_TASK_TYPE,
+    )
 
     priority: Mapped[Priority] = mapped_column(
         Enum(Priority, name="task_priority"),
@@ -39,13 +46,41 @@ class Task(Base):
         server_default=func.now(),
     )
 
+    run_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
-    result: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # в строке tasks только короткий результат, длиннее TASK_RESULT_INLINE_MAX_BYTES лежит сжатым в task_results
+    result_inline: Mapped[str | None] = mapped_column("result", Text, nullable=True)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
 
+    stored_result: Mapped[TaskResult | None] = relationship(passive_deletes=True)
+
+    @property
+    def result_is_stored(self) -> bool:
+        return self.result_inline is None and self.status == TaskStatus.COMPLETED
+
+    @property
+    def result(self) -> str | None:
+        # task_results читается только при обращении к результату завершенной задачи
+        if not self.result_is_stored:
+            return self.result_inline
+        stored = self.stored_result
+        return stored.text if stored is not None else None
+
+
+Index("ix_tasks_status_created_at_id", Task.status, Task.created_at, Task.id)
+Index("ix_tasks_priority_created_at_id", Task.priority, Task.created_at, Task.id)
+Index("ix_tasks_created_at_id", Task.created_at, Task.id)
+
+_SCHEDULED = Task.status == TaskStatus.SCHEDULED
 
-Index("ix_tasks_status", Task.status)
-Index("ix_tasks_priority", Task.priority)
-Index("ix_tasks_created_at", Task.created_at)
\ No newline at end of file
+# в индекс попадают только отложенные задачи, выборка due читает лишь наступившие run_at
+Index(
+    "ix_tasks_scheduled_run_at",
+    Task.run_at,
+    Task.id,
+    postgresql_where=_SCHEDULED,
+    sqlite_where=_SCHEDULED,
+)
\ No newline at end of file
@@ -0,0 +1,19 @@
+from sqlalchemy import BigInteger, Enum, SmallInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.enums import Priority, TaskStatus
+from app.db.base import Base
+
+
+# совпадает с pg_backend_pid() % 16 в триггере миграции c3e8b5d1f047
+TASK_COUNTER_SHARDS = 16
+
+
+class TaskCounter(Base):
+    __tablename__ = "task_counters"
+
+    status: Mapped[TaskStatus] = mapped_column(Enum(TaskStatus, name="task_status"), primary_key=True)
+    priority: Mapped[Priority] = mapped_column(Enum(Priority, name="task_priority"), primary_key=True)
+    # строки пишет только триггер на tasks, каждое соединение попадает в свой шард и не ждет чужих блокировок
+    shard: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
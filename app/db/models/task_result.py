@@ -0,0 +1,26 @@
+import uuid
+
+from sqlalchemy import ForeignKey, Integer, LargeBinary, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+from app.utils.compression import decompress
+
+
+class TaskResult(Base):
+    __tablename__ = "task_results"
+
+    task_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("tasks.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    encoding: Mapped[str] = mapped_column(String(16), nullable=False)
+    # размер результата до сжатия, в байтах
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    @property
+    def text(self) -> str:
+        return decompress(self.data, self.encoding).decode("utf-8")
@@ -0,0 +1,39 @@
+from uuid import UUID
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.enums import TaskStatus
+
+TASK_STATUS_CHANNEL = "task_status"
+
+
+def status_payload(task_id: UUID, status: TaskStatus) -> str:
+    return f"{task_id}:{status.value}"
+
+
+def parse_status_payload(payload: str) -> tuple[UUID, TaskStatus]:
+    task_id, status = payload.split(":", 1)
+    return UUID(task_id), TaskStatus(status)
+
+
+def _notify_stmt(db, statuses: dict[UUID, TaskStatus]):
+    if not statuses or not settings.TASKS_NOTIFY_ENABLED or db.get_bind().dialect.name != "postgresql":
+        return None
+    # NOTIFY транзакционный: слушатели получат событие только после commit
+    return text("SELECT pg_notify(:channel, p) FROM unnest(CAST(:payloads AS text[])) AS p").bindparams(
+        channel=TASK_STATUS_CHANNEL,
+        payloads=[status_payload(task_id, status) for task_id, status in statuses.items()],
+    )
+
+
+def notify_task_status(db, statuses: dict[UUID, TaskStatus]) -> None:
+    stmt = _notify_stmt(db, statuses)
+    if stmt is not None:
+        db.execute(stmt)
+
+
+async def notify_task_status_async(db, statuses: dict[UUID, TaskStatus]) -> None:
+    stmt = _notify_stmt(db, statuses)
+    if stmt is not None:
+        await db.execute(stmt)
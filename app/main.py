@@ -1,14 +1,47 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
-from app.api.v1.router import router as v1_router
+from app.api.metrics import MetricsMiddleware, route_labels
+from app.api.metrics import router as metrics_router
+from app.api.responses import ORJSONResponse
+from app.api.v1.router import API_V1_PREFIX, build_router, v1_routers
 from app.core.config import settings
-from app.utils.exceptions import NotFoundError, ConflictError, ExternalServiceError
-
-
-def create_app() -> FastAPI:
-    app = FastAPI(title="Task-api-manager")
-    app.include_router(v1_router)
+from app.db.session import async_engine
+from app.services.immediate_dispatch import immediate_dispatcher
+from app.services.task_events import task_listener
+from app.utils.exceptions import BadRequestError, NotFoundError, ConflictError, ExternalServiceError
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    try:
+        yield
+    finally:
+        await task_listener.stop()
+        # неотправленное за время остановки дошлет поллер outbox
+        await asyncio.to_thread(immediate_dispatcher.stop)
+        await async_engine.dispose()
+
+
+def create_app(async_db: bool | None = None) -> FastAPI:
+    if async_db is None:
+        async_db = settings.DB_ASYNC
+
+    app = FastAPI(title="Task-api-manager", lifespan=lifespan, default_response_class=ORJSONResponse)
+    app.include_router(build_router(async_db))
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics_router)
+        labels = route_labels(app.routes) | route_labels(metrics_router.routes)
+        for sub_router in v1_routers(async_db):
+            labels |= route_labels(sub_router.routes, API_V1_PREFIX)
+        app.add_middleware(MetricsMiddleware, labels=labels)
+
+    @app.exception_handler(BadRequestError)
+    async def bad_request_handler(_: Request, exc: BadRequestError) -> JSONResponse:
+        return JSONResponse(status_code=400, content={"detail": str(exc)})
 
     @app.exception_handler(NotFoundError)
     async def not_found_handler(_: Request, exc: NotFoundError) -> JSONResponse:
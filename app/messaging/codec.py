@@ -0,0 +1,31 @@
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import msgpack
+import orjson
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+
+
+@dataclass(frozen=True)
+class Codec:
+    content_type: str
+    encode: Callable[[Any], bytes]
+    decode: Callable[[bytes], Any]
+
+
+CODECS: dict[str, Codec] = {
+    JSON: Codec(JSON, orjson.dumps, orjson.loads),
+    MSGPACK: Codec(MSGPACK, msgpack.packb, msgpack.unpackb),
+}
+
+
+def get_codec(content_type: str | None) -> Codec:
+    # сообщения без content_type (старые издатели) считаются JSON, поэтому консьюмер читает оба формата во время перехода
+    if not content_type:
+        return CODECS[JSON]
+    try:
+        return CODECS[content_type]
+    except KeyError:
+        raise ValueError(f"Неизвестный content_type={content_type}") from None
@@ -1,14 +1,16 @@
-import json
 import logging
-import threading
+import queue
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Mapping
+from typing import Any, Iterator, Mapping, Sequence
 
 import pika
 import time
 from pika.adapters.blocking_connection import BlockingChannel
 
 from app.core.config import settings
+from app.messaging.codec import get_codec
+from app.utils.exceptions import ExternalServiceError
 
 logger = logging.getLogger(__name__)
 
@@ -44,48 +46,133 @@ def _declare_queues(channel: BlockingChannel) -> None:
     channel.queue_declare(queue=QUEUES.low, durable=True)
 
 
-class RabbitMQPublisher:
-    def __init__(self) -> None:
-        self._lock = threading.Lock()
+class _PooledChannel:
+    # одно соединение на слот: BlockingConnection не потокобезопасен, слот в каждый момент держит один поток
+    def __init__(self, confirms: bool) -> None:
+        self._confirms = confirms
         self._connection: pika.BlockingConnection | None = None
         self._channel: BlockingChannel | None = None
+        self._tx_channel: BlockingChannel | None = None
 
-    def _ensure(self) -> BlockingChannel:
-        if self._connection and self._channel and self._connection.is_open and self._channel.is_open:
+    def _healthy(self) -> bool:
+        if not (self._connection and self._channel and self._connection.is_open and self._channel.is_open):
+            return False
+        try:
+            # обрабатывает heartbeat простаивающего соединения и замечает, что брокер его закрыл
+            self._connection.process_data_events(time_limit=0)
+        except Exception:
+            return False
+        return self._connection.is_open and self._channel.is_open
+
+    def channel(self) -> BlockingChannel:
+        if self._healthy():
             return self._channel
 
+        self.reset()
         self._connection = _connect()
         self._channel = self._connection.channel()
+        if self._confirms:
+            self._channel.confirm_delivery()
         _declare_queues(self._channel)
         return self._channel
 
+    def tx_channel(self) -> BlockingChannel:
+        self.channel()
+        if self._tx_channel and self._tx_channel.is_open:
+            return self._tx_channel
+
+        self._tx_channel = self._connection.channel()
+        self._tx_channel.tx_select()
+        return self._tx_channel
+
+    def reset(self) -> None:
+        try:
+            if self._connection and self._connection.is_open:
+                self._connection.close()
+        except Exception:
+            pass
+        finally:
+            self._connection = None
+            self._channel = None
+            self._tx_channel = None
+
+
+class ChannelPool:
+    def __init__(self, size: int, *, confirms: bool = False, timeout: float = 5.0) -> None:
+        self._timeout = timeout
+        # SimpleQueue: get/put без общего Lock издателя, слоты соединяются лениво и по очереди прогреваются
+        self._free: queue.SimpleQueue[_PooledChannel] = queue.SimpleQueue()
+        self._slots = [_PooledChannel(confirms) for _ in range(size)]
+        for slot in self._slots:
+            self._free.put(slot)
+
+    @contextmanager
+    def slot(self) -> Iterator[_PooledChannel]:
+        try:
+            slot = self._free.get(timeout=self._timeout)
+        except queue.Empty:
+            raise ExternalServiceError(f"Нет свободного канала RabbitMQ за {self._timeout}сек.") from None
+        try:
+            yield slot
+        except Exception:
+            # переподключится следующий, кто возьмет слот, остальные слоты продолжают публиковать
+            slot.reset()
+            raise
+        finally:
+            self._free.put(slot)
+
+    def close(self) -> None:
+        for slot in self._slots:
+            slot.reset()
+
+
+class RabbitMQPublisher:
+    def __init__(self, pool_size: int | None = None) -> None:
+        self._pool = ChannelPool(
+            pool_size or settings.RABBITMQ_POOL_SIZE,
+            confirms=settings.RABBITMQ_PUBLISH_CONFIRMS,
+            timeout=settings.RABBITMQ_POOL_TIMEOUT,
+        )
+
     def publish(self, *, queue_name: str, payload: Mapping[str, Any]) -> None:
         if not settings.RABBITMQ_ENABLED:
             return
 
-        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-
-        with self._lock:
-            ch = self._ensure()
-            try:
-                ch.basic_publish(
-                    exchange="",
-                    routing_key=queue_name,
-                    body=body,
-                    properties=pika.BasicProperties(delivery_mode=2, content_type="application/json"),
-                )
-            except Exception:
-                try:
-                    if self._connection and self._connection.is_open:
-                        self._connection.close()
-                finally:
-                    self._connection = None
-                    self._channel = None
-                raise
+        codec = get_codec(settings.RABBITMQ_CONTENT_TYPE)
+        body = codec.encode(payload)
+
+        with self._pool.slot() as slot:
+            slot.channel().basic_publish(
+                exchange="",
+                routing_key=queue_name,
+                body=body,
+                properties=pika.BasicProperties(delivery_mode=2, content_type=codec.content_type),
+            )
+
+    def publish_batch(self, messages: Sequence[tuple[str, Mapping[str, Any]]]) -> None:
+        if not settings.RABBITMQ_ENABLED or not messages:
+            return
+
+        codec = get_codec(settings.RABBITMQ_CONTENT_TYPE)
+        bodies = [(queue_name, codec.encode(payload)) for queue_name, payload in messages]
+        properties = pika.BasicProperties(delivery_mode=2, content_type=codec.content_type)
+
+        with self._pool.slot() as slot:
+            ch = slot.tx_channel()
+            for queue_name, body in bodies:
+                ch.basic_publish(exchange="", routing_key=queue_name, body=body, properties=properties)
+            ch.tx_commit()
+
+    def close(self) -> None:
+        self._pool.close()
 
 
 _publisher = RabbitMQPublisher()
 
 
 def publish(queue_name: str, payload: Mapping[str, Any]) -> None:
-    _publisher.publish(queue_name=queue_name, payload=payload)
\ No newline at end of file
+    _publisher.publish(queue_name=queue_name, payload=payload)
+
+
+def publish_batch(messages: Sequence[tuple[str, Mapping[str, Any]]]) -> None:
+    _publisher.publish_batch(messages)
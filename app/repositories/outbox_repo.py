@@ -1,17 +1,55 @@
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import case, cast, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.enums import OutboxStatus
-from app.db.models.outbox import OutboxEvent
+from app.db.models.outbox import OUTBOX_SHARD_BUCKETS, OutboxEvent
 
 
 def utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
+@dataclass(frozen=True)
+class OutboxShard:
+    index: int
+    total: int
+
+    def __post_init__(self) -> None:
+        if self.total < 1 or self.total > OUTBOX_SHARD_BUCKETS:
+            raise ValueError(f"shard total must be between 1 and {OUTBOX_SHARD_BUCKETS}")
+        if self.index < 0 or self.index >= self.total:
+            raise ValueError("shard index must be between 0 and total - 1")
+
+    @classmethod
+    def parse(cls, value: str) -> "OutboxShard":
+        index, _, total = value.partition("/")
+        return cls(index=int(index), total=int(total))
+
+    @property
+    def buckets(self) -> tuple[int, int]:
+        return (
+            self.index * OUTBOX_SHARD_BUCKETS // self.total,
+            (self.index + 1) * OUTBOX_SHARD_BUCKETS // self.total,
+        )
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.total}"
+
+
+def _events_filter(events: list[OutboxEvent]):
+    # границы created_at нужны, чтобы Postgres отсек лишние партиции
+    created = [ev.created_at for ev in events]
+    return (
+        OutboxEvent.id.in_([ev.id for ev in events]),
+        OutboxEvent.created_at.between(min(created), max(created)),
+    )
+
+
 @dataclass
 class OutboxRepository:
     db: Session
@@ -19,7 +57,10 @@ class OutboxRepository:
     def add(self, event: OutboxEvent) -> None:
         self.db.add(event)
 
-    def fetch_batch_for_publish(self, *, limit: int) -> list[OutboxEvent]:
+    def add_many(self, rows: list[dict[str, Any]]) -> None:
+        self.db.execute(insert(OutboxEvent), rows)
+
+    def fetch_batch_for_publish(self, *, limit: int, shard: OutboxShard | None = None) -> list[OutboxEvent]:
         stmt = (
             select(OutboxEvent)
             .where(
@@ -30,4 +71,57 @@ class OutboxRepository:
             .limit(limit)
             .with_for_update(skip_locked=True)
         )
-        return list(self.db.scalars(stmt).all())
\ No newline at end of file
+        if shard is not None:
+            lo, hi = shard.buckets
+            stmt = stmt.where(OutboxEvent.shard_bucket >= lo, OutboxEvent.shard_bucket < hi)
+        return list(self.db.scalars(stmt).all())
+
+    def backlog(self, shard: OutboxShard | None = None) -> tuple[int, datetime | None]:
+        # count и min по частичному индексу status='NEW', отправленные события не читаются
+        stmt = select(func.count(), func.min(OutboxEvent.created_at)).where(OutboxEvent.status == OutboxStatus.NEW)
+        if shard is not None:
+            lo, hi = shard.buckets
+            stmt = stmt.where(OutboxEvent.shard_bucket >= lo, OutboxEvent.shard_bucket < hi)
+        count, oldest = self.db.execute(stmt).one()
+        return count, oldest
+
+    def mark_sent(self, events: list[OutboxEvent]) -> None:
+        self.db.execute(
+            update(OutboxEvent)
+            .where(*_events_filter(events), OutboxEvent.status == OutboxStatus.NEW)
+            .values(status=OutboxStatus.SENT, sent_at=utcnow(), last_error=None)
+        )
+
+    def mark_retry(
+        self,
+        events: list[OutboxEvent],
+        *,
+        next_attempt_at: dict[int, datetime],
+        max_attempts: int,
+        error: str,
+    ) -> None:
+        # next_attempt_at: текущее значение attempts -> время следующей попытки
+        self.db.execute(
+            update(OutboxEvent)
+            .where(*_events_filter(events))
+            .values(
+                attempts=OutboxEvent.attempts + 1,
+                next_attempt_at=case(next_attempt_at, value=OutboxEvent.attempts, else_=OutboxEvent.next_attempt_at),
+                status=case(
+                    (OutboxEvent.attempts + 1 >= max_attempts, cast(OutboxStatus.FAILED, OutboxEvent.status.type)),
+                    else_=cast(OutboxStatus.NEW, OutboxEvent.status.type),
+                ),
+                last_error=error,
+            )
+        )
+
+
+@dataclass
+class AsyncOutboxRepository:
+    db: AsyncSession
+
+    def add(self, event: OutboxEvent) -> None:
+        self.db.add(event)
+
+    async def add_many(self, rows: list[dict[str, Any]]) -> None:
+        await self.db.execute(insert(OutboxEvent), rows)
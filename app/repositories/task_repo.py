@@ -1,10 +1,126 @@
+from datetime import datetime
+from typing import Any, Sequence
 from uuid import UUID
 
-from sqlalchemy import Select, select, update
+from sqlalchemy import BigInteger, Row, Select, any_, bindparam, cast, delete, func, insert, literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.core.enums import Priority, TaskStatus
+from app.core.enums import OutboxStatus, Priority, TaskStatus
+from app.db.models.outbox import OutboxEvent
 from app.db.models.task import Task
+from app.db.models.task_counter import TaskCounter
+from app.db.models.task_result import TaskResult
+from app.utils.pagination import Cursor
+
+
+def _list_stmt(
+    *,
+    limit: int,
+    offset: int,
+    status: TaskStatus | None,
+    priority: Priority | None,
+    cursor: Cursor | None,
+    columns: Sequence[Any] = (),
+) -> Select:
+    stmt: Select = select(*columns) if columns else select(Task)
+    stmt = stmt.order_by(Task.created_at.desc(), Task.id.desc()).limit(limit)
+    if cursor is not None:
+        stmt = stmt.where(tuple_(Task.created_at, Task.id) < tuple_(cursor.created_at, cursor.id))
+    else:
+        stmt = stmt.offset(offset)
+    if status is not None:
+        stmt = stmt.where(Task.status == status)
+    if priority is not None:
+        stmt = stmt.where(Task.priority == priority)
+    return stmt
+
+
+def _statuses_stmt(dialect: str, task_ids: list[UUID]) -> Select:
+    stmt = select(Task.id, Task.status)
+    if dialect == "postgresql":
+        # один параметр-массив вместо IN на тысячи параметров
+        return stmt.where(Task.id == any_(bindparam("task_ids", task_ids, type_=ARRAY(Task.id.type))))
+    return stmt.where(Task.id.in_(task_ids))
+
+
+def _stored_results_stmt(task_ids: list[UUID]) -> Select:
+    return select(TaskResult).where(TaskResult.task_id.in_(task_ids))
+
+
+def _stored_result_ids(tasks: Sequence[Task]) -> list[UUID]:
+    return [task.id for task in tasks if task.result_is_stored]
+
+
+def _attach_stored_results(tasks: Sequence[Task], stored: dict[UUID, TaskResult]) -> None:
+    # большие результаты страницы одним запросом по task_results и только для задач, у которых они есть
+    for task in tasks:
+        if task.result_is_stored:
+            set_committed_value(task, "stored_result", stored.get(task.id))
+
+
+def _promote_due_stmt(now: datetime, limit: int):
+    # частичный индекс по run_at: читаются только наступившие SCHEDULED, будущие задачи не сканируются
+    due = (
+        select(Task.id)
+        .where(Task.status == TaskStatus.SCHEDULED, Task.run_at <= now)
+        .order_by(Task.run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .cte("due")
+    )
+    return (
+        update(Task)
+        .where(Task.id.in_(select(due.c.id)), Task.status == TaskStatus.SCHEDULED)
+        .values(status=TaskStatus.PENDING)
+        .returning(Task.id, Task.priority, Task.type)
+    )
+
+
+def _stats_stmt(dialect: str) -> Select:
+    if dialect == "postgresql":
+        # сумма шардов счетчиков вместо count(*) по всей tasks
+        total = cast(func.sum(TaskCounter.count), BigInteger)
+        return (
+            select(TaskCounter.status, TaskCounter.priority, total)
+            .group_by(TaskCounter.status, TaskCounter.priority)
+            .having(total != 0)
+            .order_by(TaskCounter.status, TaskCounter.priority)
+        )
+    # в sqlite триггеров нет, счет точный по таблице
+    return select(Task.status, Task.priority, func.count()).group_by(Task.status, Task.priority).order_by(Task.status, Task.priority)
+
+
+def _compact_counters_stmt() -> Select:
+    moved = (
+        delete(TaskCounter)
+        .where(TaskCounter.shard != 0)
+        .returning(TaskCounter.status, TaskCounter.priority, TaskCounter.count)
+        .cte("moved")
+    )
+    merge = pg_insert(TaskCounter).from_select(
+        ["status", "priority", "shard", "count"],
+        select(moved.c.status, moved.c.priority, literal(0), func.sum(moved.c.count)).group_by(
+            moved.c.status, moved.c.priority
+        ),
+    )
+    merge = merge.on_conflict_do_update(
+        index_elements=[TaskCounter.status, TaskCounter.priority, TaskCounter.shard],
+        set_={"count": TaskCounter.count + merge.excluded.count},
+    )
+    # число свернутых строк шардов
+    return select(func.count()).select_from(moved).add_cte(merge.cte("merged"))
+
+
+def _create_with_outbox_stmt(task_row: dict[str, Any], outbox_row: dict[str, Any]):
+    columns = OutboxEvent.__table__.c
+    values = {"status": OutboxStatus.NEW, "attempts": 0, **outbox_row}
+    outbox = insert(OutboxEvent).values({k: literal(v, columns[k].type) for k, v in values.items()}).cte("new_outbox")
+    return insert(Task).values(**task_row).returning(Task).add_cte(outbox)
+
 
 class TaskRepository:
     def __init__(self, db: Session) -> None:
@@ -15,9 +131,42 @@ class TaskRepository:
         self._db.flush()
         return task
 
+    def create_with_outbox(self, task_row: dict[str, Any], outbox_row: dict[str, Any]) -> Task:
+        if self._db.get_bind().dialect.name == "postgresql":
+            return self._db.scalars(_create_with_outbox_stmt(task_row, outbox_row)).one()
+
+        task = self._db.scalars(insert(Task).returning(Task), [task_row]).one()
+        self._db.execute(insert(OutboxEvent), [outbox_row])
+        return task
+
+    def create_many(self, rows: list[dict[str, Any]]) -> list[Task]:
+        stmt = insert(Task).returning(Task, sort_by_parameter_order=True)
+        return list(self._db.scalars(stmt, rows).all())
+
     def get(self, task_id: UUID) -> Task | None:
         return self._db.get(Task, task_id)
 
+    def get_status(self, task_id: UUID) -> TaskStatus | None:
+        return self._db.scalar(select(Task.status).where(Task.id == task_id))
+
+    def get_stored_results(self, task_ids: list[UUID]) -> dict[UUID, TaskResult]:
+        return {x.task_id: x for x in self._db.scalars(_stored_results_stmt(task_ids))}
+
+    def get_statuses(self, task_ids: list[UUID]) -> dict[UUID, TaskStatus]:
+        return dict(self._db.execute(_statuses_stmt(self._db.get_bind().dialect.name, task_ids)).all())
+
+    def promote_due(self, *, now: datetime, limit: int) -> list[tuple[UUID, Priority, str]]:
+        return [tuple(row) for row in self._db.execute(_promote_due_stmt(now, limit)).all()]
+
+    def stats(self) -> Sequence[Row]:
+        return self._db.execute(_stats_stmt(self._db.get_bind().dialect.name)).all()
+
+    def compact_counters(self) -> int:
+        # шарды сворачиваются в shard=0; конкурентный триггер после DELETE просто создаст строку шарда заново
+        moved = self._db.scalar(_compact_counters_stmt())
+        self._db.execute(delete(TaskCounter).where(TaskCounter.shard == 0, TaskCounter.count == 0))
+        return moved
+
     def list(
         self,
         *,
@@ -25,13 +174,28 @@ class TaskRepository:
         offset: int,
         status: TaskStatus | None = None,
         priority: Priority | None = None,
+        cursor: Cursor | None = None,
     ) -> list[Task]:
-        stmt: Select = select(Task).order_by(Task.created_at.desc()).limit(limit).offset(offset)
-        if status is not None:
-            stmt = stmt.where(Task.status == status)
-        if priority is not None:
-            stmt = stmt.where(Task.priority == priority)
-        return list(self._db.execute(stmt).scalars().all())
+        stmt = _list_stmt(limit=limit, offset=offset, status=status, priority=priority, cursor=cursor)
+        tasks = list(self._db.execute(stmt).scalars().all())
+        task_ids = _stored_result_ids(tasks)
+        if task_ids:
+            _attach_stored_results(tasks, self.get_stored_results(task_ids))
+        return tasks
+
+    def list_rows(
+        self,
+        *,
+        columns: Sequence[Any],
+        limit: int,
+        offset: int,
+        status: TaskStatus | None = None,
+        priority: Priority | None = None,
+        cursor: Cursor | None = None,
+    ) -> Sequence[Row]:
+        # только выбранные колонки, строки-кортежи без ORM-объектов и identity map
+        stmt = _list_stmt(limit=limit, offset=offset, status=status, priority=priority, cursor=cursor, columns=columns)
+        return self._db.execute(stmt).all()
 
     def set_status(self, task_id: UUID, new_status: TaskStatus) -> int:
         stmt = (
@@ -40,4 +204,84 @@ class TaskRepository:
             .values(status=new_status)
         )
         res = self._db.execute(stmt)
-        return res.rowcount or 0
\ No newline at end of file
+        return res.rowcount or 0
+
+
+class AsyncTaskRepository:
+    def __init__(self, db: AsyncSession) -> None:
+        self._db = db
+
+    async def create(self, task: Task) -> Task:
+        self._db.add(task)
+        await self._db.flush()
+        return task
+
+    async def create_with_outbox(self, task_row: dict[str, Any], outbox_row: dict[str, Any]) -> Task:
+        if self._db.get_bind().dialect.name == "postgresql":
+            return (await self._db.scalars(_create_with_outbox_stmt(task_row, outbox_row))).one()
+
+        task = (await self._db.scalars(insert(Task).returning(Task), [task_row])).one()
+        await self._db.execute(insert(OutboxEvent), [outbox_row])
+        return task
+
+    async def create_many(self, rows: list[dict[str, Any]]) -> list[Task]:
+        stmt = insert(Task).returning(Task, sort_by_parameter_order=True)
+        return list((await self._db.scalars(stmt, rows)).all())
+
+    async def get(self, task_id: UUID) -> Task | None:
+        task = await self._db.get(Task, task_id)
+        if task is not None and task.result_is_stored:
+            # ленивая загрузка в async недоступна, результат дочитывается только у завершенной задачи
+            await self._db.refresh(task, ["stored_result"])
+        return task
+
+    async def get_status(self, task_id: UUID) -> TaskStatus | None:
+        return await self._db.scalar(select(Task.status).where(Task.id == task_id))
+
+    async def get_stored_results(self, task_ids: list[UUID]) -> dict[UUID, TaskResult]:
+        return {x.task_id: x for x in await self._db.scalars(_stored_results_stmt(task_ids))}
+
+    async def get_statuses(self, task_ids: list[UUID]) -> dict[UUID, TaskStatus]:
+        return dict((await self._db.execute(_statuses_stmt(self._db.get_bind().dialect.name, task_ids))).all())
+
+    async def stats(self) -> Sequence[Row]:
+        return (await self._db.execute(_stats_stmt(self._db.get_bind().dialect.name))).all()
+
+    async def list(
+        self,
+        *,
+        limit: int,
+        offset: int,
+        status: TaskStatus | None = None,
+        priority: Priority | None = None,
+        cursor: Cursor | None = None,
+    ) -> list[Task]:
+        stmt = _list_stmt(limit=limit, offset=offset, status=status, priority=priority, cursor=cursor)
+        tasks = list((await self._db.execute(stmt)).scalars().all())
+        task_ids = _stored_result_ids(tasks)
+        if task_ids:
+            _attach_stored_results(tasks, await self.get_stored_results(task_ids))
+        return tasks
+
+    async def list_rows(
+        self,
+        *,
+        columns: Sequence[Any],
+        limit: int,
+        offset: int,
+        status: TaskStatus | None = None,
+        priority: Priority | None = None,
+        cursor: Cursor | None = None,
+    ) -> Sequence[Row]:
+        # только выбранные колонки, строки-кортежи без ORM-объектов и identity map
+        stmt = _list_stmt(limit=limit, offset=offset, status=status, priority=priority, cursor=cursor, columns=columns)
+        return (await self._db.execute(stmt)).all()
+
+    async def set_status(self, task_id: UUID, new_status: TaskStatus) -> int:
+        stmt = (
+            update(Task)
+            .where(Task.id == task_id)
+            .values(status=new_status)
+        )
+        res = await self._db.execute(stmt)
+        return res.rowcount or 0
@@ -0,0 +1,15 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class StatusCacheStatsRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    hit_rate: float
+    hit_avg_ms: float
+    miss_avg_ms: float
@@ -1,15 +1,30 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from uuid import UUID
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator
 
-from app.core.enums import Priority, TaskStatus
+from app.core.config import settings
+from app.core.enums import DEFAULT_TASK_TYPE, Priority, TaskStatus
 
 
 class TaskCreate(BaseModel):
     title: str = Field(min_length=1, max_length=255)
     description: str | None = Field(default=None, max_length=10_000)
     priority: Priority = Priority.MEDIUM
+    type: str = Field(default=DEFAULT_TASK_TYPE, min_length=1, max_length=64)
+    run_at: datetime | None = None
+
+    @field_validator("run_at")
+    @classmethod
+    def _run_at_utc(cls, value: datetime | None) -> datetime | None:
+        # время без зоны считается UTC
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
+
+class TaskBatchCreate(BaseModel):
+    items: list[TaskCreate] = Field(min_length=1, max_length=settings.TASKS_BATCH_MAX_SIZE)
 
 
 class TaskRead(BaseModel):
@@ -18,9 +33,12 @@ class TaskRead(BaseModel):
     id: UUID
     title: str
     description: str | None
+    type: str
     priority: Priority
     status: TaskStatus
     created_at: datetime
+    run_at: datetime | None
+    attempts: int
     started_at: datetime | None
     finished_at: datetime | None
     result: str | None
@@ -31,7 +49,30 @@ class TaskStatusRead(BaseModel):
     id: UUID
     status: TaskStatus
 
+
+class TaskStatusBatchRequest(BaseModel):
+    ids: list[UUID] = Field(min_length=1, max_length=settings.TASKS_STATUS_BATCH_MAX_SIZE)
+
+
+class TaskStatusBatchRead(BaseModel):
+    statuses: dict[UUID, TaskStatus]
+    not_found: list[UUID]
+
 class TaskListRead(BaseModel):
     items: list[TaskRead]
     limit: int
-    offset: int
\ No newline at end of file
+    offset: int
+    next_cursor: str | None = None
+    total: int | None = None
+
+
+class TaskCountRead(BaseModel):
+    status: TaskStatus
+    priority: Priority
+    count: int
+
+
+class TaskStatsRead(BaseModel):
+    items: list[TaskCountRead]
+    by_status: dict[TaskStatus, int]
+    total: int
\ No newline at end of file
@@ -0,0 +1,105 @@
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.metrics import OUTBOX_EVENTS
+from app.db.session import SessionLocal
+from app.messaging.rabbitmq import RabbitMQPublisher
+from app.repositories.outbox_repo import OutboxRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PendingEvent:
+    id: UUID
+    created_at: datetime
+    routing_key: str
+    payload: dict
+
+    @classmethod
+    def from_row(cls, row: dict[str, Any]) -> "PendingEvent":
+        return cls(id=row["id"], created_at=row["created_at"], routing_key=row["routing_key"], payload=row["payload"])
+
+
+class ImmediateDispatcher:
+    # публикует события сразу после commit в фоновом потоке; что не подтвердилось, отправит поллер outbox
+    def __init__(
+        self,
+        *,
+        publisher: RabbitMQPublisher | None = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_batch: int = 100,
+    ) -> None:
+        # публикует один поток диспетчера, больше одного слота ему не нужно
+        self._publisher = publisher or RabbitMQPublisher(pool_size=1)
+        self._session_factory = session_factory
+        self._max_batch = max_batch
+        self._queue: queue.Queue[PendingEvent | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, events: list[PendingEvent]) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="outbox-immediate", daemon=True)
+                self._thread.start()
+        for ev in events:
+            self._queue.put(ev)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            ev = self._queue.get()
+            if ev is None:
+                return
+            batch = [ev]
+            stop = False
+            while len(batch) < self._max_batch:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+            self.flush(batch)
+            if stop:
+                return
+
+    def flush(self, batch: list[PendingEvent]) -> None:
+        try:
+            # tx_commit возвращается после того, как брокер принял всю пачку
+            self._publisher.publish_batch([(ev.routing_key, ev.payload) for ev in batch])
+        except Exception:
+            OUTBOX_EVENTS.labels("immediate_error").inc(len(batch))
+            logger.exception(f"Быстрая отправка не удалась, события отправит поллер outbox. size={len(batch)}")
+            return
+
+        db = self._session_factory()
+        try:
+            OutboxRepository(db).mark_sent(batch)
+            db.commit()
+            OUTBOX_EVENTS.labels("immediate_sent").inc(len(batch))
+        except Exception:
+            db.rollback()
+            # сообщения уже в брокере: поллер отправит их повторно, дубль отсечет claim в воркере
+            logger.exception(f"Не удалось отметить отправленные события. size={len(batch)}")
+        finally:
+            db.close()
+
+
+immediate_dispatcher = ImmediateDispatcher()
@@ -1,15 +1,15 @@
 from dataclasses import dataclass
 from uuid import UUID
 
-from app.core.enums import Priority
+from app.core.enums import DEFAULT_TASK_TYPE, Priority
 from app.messaging.rabbitmq import QUEUES, publish
 
 
 @dataclass(frozen=True)
 class TaskPublisher:
-    def build_task_created(self, task_id: UUID, priority: Priority) -> tuple[str, dict]:
+    def build_task_created(self, task_id: UUID, priority: Priority, task_type: str = DEFAULT_TASK_TYPE) -> tuple[str, dict]:
         routing_key = _queue_for_priority(priority)
-        payload = {"task_id": str(task_id), "priority": priority.value}
+        payload = {"task_id": str(task_id), "priority": priority.value, "type": task_type}
         return routing_key, payload
 
     def publish_task_created(self, task_id: UUID, priority: Priority) -> None:
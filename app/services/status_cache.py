@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.enums import TaskStatus
+
+TERMINAL_STATUSES = frozenset({TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED})
+
+
+@dataclass
+class StatusCacheStats:
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    hit_rate: float
+    hit_avg_ms: float
+    miss_avg_ms: float
+
+
+class StatusCache:
+    # терминальные статусы больше не меняются и живут до вытеснения по LRU,
+    # остальные - не дольше ttl, чтобы увидеть переход, сделанный воркером
+    def __init__(self, *, max_size: int, ttl: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self._max_size = max_size
+        self._ttl = ttl
+        self._clock = clock
+        self._items: OrderedDict[UUID, tuple[TaskStatus, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = self._expirations = 0
+        self._hit_seconds = self._miss_seconds = 0.0
+
+    def get(self, task_id: UUID) -> TaskStatus | None:
+        with self._lock:
+            item = self._items.get(task_id)
+            if item is None:
+                return None
+            status, expires_at = item
+            if expires_at is not None and expires_at <= self._clock():
+                del self._items[task_id]
+                self._expirations += 1
+                return None
+            self._items.move_to_end(task_id)
+            return status
+
+    def put(self, task_id: UUID, status: TaskStatus) -> None:
+        expires_at = None if status in TERMINAL_STATUSES else self._clock() + self._ttl
+        with self._lock:
+            self._items[task_id] = (status, expires_at)
+            self._items.move_to_end(task_id)
+            while len(self._items) > self._max_size:
+                self._items.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, task_id: UUID) -> None:
+        with self._lock:
+            self._items.pop(task_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def record(self, *, hit: bool, seconds: float, count: int = 1) -> None:
+        with self._lock:
+            if hit:
+                self._hits += count
+                self._hit_seconds += seconds
+            else:
+                self._misses += count
+                self._miss_seconds += seconds
+
+    def stats(self) -> StatusCacheStats:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return StatusCacheStats(
+                size=len(self._items),
+                max_size=self._max_size,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                hit_rate=self._hits / lookups if lookups else 0.0,
+                hit_avg_ms=self._hit_seconds / self._hits * 1000 if self._hits else 0.0,
+                miss_avg_ms=self._miss_seconds / self._misses * 1000 if self._misses else 0.0,
+            )
+
+
+status_cache = StatusCache(max_size=settings.STATUS_CACHE_MAX_SIZE, ttl=settings.STATUS_CACHE_TTL_SECONDS)
@@ -0,0 +1,170 @@
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Awaitable, Callable
+from uuid import UUID
+
+import psycopg
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.enums import TaskStatus
+from app.db.notify import TASK_STATUS_CHANNEL, parse_status_payload
+from app.services.status_cache import TERMINAL_STATUSES, status_cache
+
+logger = logging.getLogger(__name__)
+
+Snapshot = Callable[[list[UUID]], Awaitable[dict[UUID, TaskStatus]]]
+
+
+def _listen_dsn() -> str:
+    return make_url(settings.db_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class Subscription:
+    def __init__(self, listener: "TaskStatusListener", task_ids: list[UUID]) -> None:
+        self.task_ids = list(dict.fromkeys(task_ids))
+        self.queue: asyncio.Queue[tuple[UUID, TaskStatus]] = asyncio.Queue()
+        self._listener = listener
+
+    async def get(self, timeout: float) -> tuple[UUID, TaskStatus] | None:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self._listener.unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class TaskStatusListener:
+    # одно соединение LISTEN на процесс, события раздаются ожидающим из памяти
+    def __init__(self, dsn: Callable[[], str] = _listen_dsn, reconnect_delay: float = 1.0) -> None:
+        self._dsn = dsn
+        self._reconnect_delay = reconnect_delay
+        self._subscribers: dict[UUID, set[Subscription]] = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def waiters(self) -> int:
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    def subscribe(self, task_ids: list[UUID]) -> Subscription:
+        self._ensure_started()
+        sub = Subscription(self, task_ids)
+        for task_id in sub.task_ids:
+            self._subscribers.setdefault(task_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        for task_id in sub.task_ids:
+            subs = self._subscribers.get(task_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[task_id]
+
+    def dispatch(self, task_id: UUID, status: TaskStatus) -> None:
+        if settings.STATUS_CACHE_ENABLED:
+            status_cache.put(task_id, status)
+        for sub in self._subscribers.get(task_id, ()):
+            sub.queue.put_nowait((task_id, status))
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._subscribers.clear()
+            self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        self._subscribers.clear()
+
+    async def _resync(self, conn: psycopg.AsyncConnection) -> None:
+        # уведомления, пришедшие до LISTEN или во время переподключения, потеряны - перечитываем статусы ожидающих
+        task_ids = list(self._subscribers)
+        if not task_ids:
+            return
+        cur = await conn.execute("SELECT id, status FROM tasks WHERE id = ANY(%s)", (task_ids,))
+        for task_id, status in await cur.fetchall():
+            status = TaskStatus(status)
+            if status in TERMINAL_STATUSES:
+                self.dispatch(task_id, status)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self._dsn(), autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {TASK_STATUS_CHANNEL}")
+                    logger.info(f"Подписка на изменения статусов задач. channel={TASK_STATUS_CHANNEL}")
+                    await self._resync(conn)
+                    async for notify in conn.notifies():
+                        try:
+                            self.dispatch(*parse_status_payload(notify.payload))
+                        except ValueError:
+                            logger.warning(f"Невалидное уведомление. payload={notify.payload}")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"Соединение LISTEN потеряно, переподключение через {self._reconnect_delay}сек.")
+                await asyncio.sleep(self._reconnect_delay)
+
+
+task_listener = TaskStatusListener()
+
+
+async def wait_for_terminal(task_id: UUID, timeout: float, snapshot: Snapshot) -> TaskStatus:
+    # подписка до чтения статуса, чтобы не потерять завершение между ними
+    with task_listener.subscribe([task_id]) as sub:
+        status = (await snapshot([task_id]))[task_id]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while status not in TERMINAL_STATUSES:
+            event = await sub.get(deadline - loop.time())
+            if event is None:
+                break
+            status = event[1]
+        return status
+
+
+def _sse(task_id: UUID, status: TaskStatus) -> str:
+    return f"event: status\ndata: {json.dumps({'id': str(task_id), 'status': status.value})}\n\n"
+
+
+async def open_status_stream(task_ids: list[UUID], snapshot: Snapshot) -> tuple[Subscription, AsyncIterator[str]]:
+    # подписку закрывает вызывающий: генератор может так и не стартовать, если клиент ушел до первого чанка
+    sub = task_listener.subscribe(task_ids)
+    try:
+        current = await snapshot(sub.task_ids)
+    except BaseException:
+        sub.close()
+        raise
+    return sub, _status_stream(sub, current)
+
+
+async def _status_stream(sub: Subscription, current: dict[UUID, TaskStatus]) -> AsyncIterator[str]:
+    for task_id in sub.task_ids:
+        yield _sse(task_id, current[task_id])
+    pending = {task_id for task_id in sub.task_ids if current[task_id] not in TERMINAL_STATUSES}
+    while pending:
+        event = await sub.get(settings.TASKS_EVENTS_KEEPALIVE_SECONDS)
+        if event is None:
+            yield ": keepalive\n\n"
+            continue
+        task_id, status = event
+        if task_id in pending:
+            pending.discard(task_id)
+            yield _sse(task_id, status)
@@ -1,17 +1,28 @@
 import logging
-from datetime import datetime, timezone
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import Any, Sequence
 from uuid import UUID
 
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.enums import Priority, TaskStatus
+from app.core.enums import DEFAULT_TASK_TYPE, Priority, TaskStatus
+from app.db.models.outbox import outbox_shard_bucket
 from app.db.models.task import Task
-from app.repositories.outbox_repo import OutboxRepository
-from app.db.models.outbox import OutboxEvent
-from app.repositories.task_repo import TaskRepository
+from app.db.models.task_result import TaskResult
+from app.db.notify import notify_task_status, notify_task_status_async
+from app.repositories.outbox_repo import AsyncOutboxRepository, OutboxRepository
+from app.repositories.task_repo import AsyncTaskRepository, TaskRepository
+from app.services.immediate_dispatch import PendingEvent, immediate_dispatcher
 from app.services.publisher import TaskPublisher
-from app.utils.exceptions import ConflictError, NotFoundError
+from app.services.status_cache import status_cache
+from app.utils.exceptions import BadRequestError, ConflictError, NotFoundError
+from app.utils.pagination import Cursor
 
 logger = logging.getLogger(__name__)
 
@@ -19,32 +30,227 @@ logger = logging.getLogger(__name__)
 def utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
+
+def _decode_cursor(cursor: str | None) -> Cursor | None:
+    if cursor is None:
+        return None
+    try:
+        return Cursor.decode(cursor)
+    except ValueError:
+        raise BadRequestError(f"Невалидный cursor={cursor}")
+
+
+_TASK_COLUMNS = Task.__table__.columns
+
+
+def _list_columns(fields: str) -> tuple[list[str], list[Any]]:
+    names = list(dict.fromkeys(x.strip() for x in fields.split(",") if x.strip()))
+    unknown = [x for x in names if x not in _TASK_COLUMNS]
+    if not names or unknown:
+        raise BadRequestError(f"Невалидный fields={fields}. Допустимые поля: {','.join(_TASK_COLUMNS.keys())}")
+    # id и created_at нужны для next_cursor, status - для поиска результата в task_results,
+    # в ответ попадают только запрошенные поля (они идут первыми)
+    return names, [_TASK_COLUMNS[x] for x in dict.fromkeys([*names, "id", "created_at", "status"])]
+
+
+def _stored_result_ids(names: list[str], rows: Sequence[Row]) -> list[UUID]:
+    # NULL в tasks.result у завершенной задачи значит, что результат лежит в task_results
+    if "result" not in names:
+        return []
+    index = names.index("result")
+    return [row.id for row in rows if row[index] is None and row.status == TaskStatus.COMPLETED]
+
+
+def _with_stored_results(names: list[str], rows: Sequence[Row], stored: dict[UUID, TaskResult]) -> Sequence[Row]:
+    if not stored:
+        return rows
+    index = names.index("result")
+    row_type = namedtuple("TaskRow", rows[0]._fields)
+    return [
+        row_type(*row[:index], stored[row.id].text, *row[index + 1:]) if row.id in stored else row_type(*row)
+        for row in rows
+    ]
+
+
+def _task_rows(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    now = utcnow()
+    return [
+        {
+            "id": uuid.uuid4(),
+            "title": x["title"],
+            "description": x.get("description"),
+            "priority": x.get("priority", Priority.MEDIUM),
+            "type": x.get("type", DEFAULT_TASK_TYPE),
+            "run_at": x.get("run_at"),
+            "attempts": 0,
+            # событие outbox для отложенной задачи создаст promote_due_tasks, когда наступит run_at
+            "status": TaskStatus.SCHEDULED if x.get("run_at") and x["run_at"] > now else TaskStatus.PENDING,
+        }
+        for x in items
+    ]
+
+
+def _outbox_row(
+    task_id: UUID, priority: Priority, task_type: str = DEFAULT_TASK_TYPE, *, immediate: bool = True
+) -> dict[str, Any]:
+    routing_key, payload = TaskPublisher().build_task_created(task_id, priority, task_type)
+    now = utcnow()
+    row = {
+        "id": uuid.uuid4(),
+        "task_id": task_id,
+        "shard_bucket": outbox_shard_bucket(task_id),
+        "routing_key": routing_key,
+        "payload": payload,
+        "created_at": now,
+    }
+    if immediate and settings.OUTBOX_IMMEDIATE_DISPATCH:
+        # поллер не берет событие, пока его отправляет быстрый путь
+        row["next_attempt_at"] = now + timedelta(seconds=settings.OUTBOX_IMMEDIATE_GRACE_SECONDS)
+    return row
+
+
+def _outbox_rows(tasks: list[Task]) -> list[dict[str, Any]]:
+    return [_outbox_row(task.id, task.priority, task.type) for task in tasks if task.status != TaskStatus.SCHEDULED]
+
+
+def _dispatch_after_commit(rows: list[dict[str, Any]]) -> None:
+    if settings.OUTBOX_IMMEDIATE_DISPATCH and rows:
+        immediate_dispatcher.submit([PendingEvent.from_row(row) for row in rows])
+
+
+def promote_due_tasks(db: Session, limit: int) -> int:
+    # вызывается из цикла outbox: событие пишется в ту же транзакцию и уходит ближайшим опросом
+    due = TaskRepository(db).promote_due(now=utcnow(), limit=limit)
+    if due:
+        OutboxRepository(db).add_many(
+            [_outbox_row(task_id, priority, task_type, immediate=False) for task_id, priority, task_type in due]
+        )
+    return len(due)
+
+
+def _stats(rows: Sequence[Row]) -> dict[str, Any]:
+    by_status = {x: 0 for x in TaskStatus}
+    for task_status, _, count in rows:
+        by_status[task_status] += count
+    return {
+        "items": [{"status": task_status, "priority": priority, "count": count} for task_status, priority, count in rows],
+        "by_status": by_status,
+        "total": sum(by_status.values()),
+    }
+
+
+def _count(rows: Sequence[Row], status: TaskStatus | None, priority: Priority | None) -> int:
+    # фильтры списка - только статус и приоритет, поэтому total берется из тех же счетчиков
+    return sum(
+        count
+        for task_status, task_priority, count in rows
+        if (status is None or task_status == status) and (priority is None or task_priority == priority)
+    )
+
+
+def _cached_statuses(task_ids: list[UUID]) -> tuple[dict[UUID, TaskStatus], list[UUID]]:
+    if not settings.STATUS_CACHE_ENABLED:
+        return {}, list(dict.fromkeys(task_ids))
+
+    started = time.perf_counter()
+    found: dict[UUID, TaskStatus] = {}
+    missing: list[UUID] = []
+    for task_id in dict.fromkeys(task_ids):
+        cached = status_cache.get(task_id)
+        if cached is None:
+            missing.append(task_id)
+        else:
+            found[task_id] = cached
+    if found:
+        status_cache.record(hit=True, seconds=time.perf_counter() - started, count=len(found))
+    return found, missing
+
+
+def _merge_statuses(
+    found: dict[UUID, TaskStatus], loaded: dict[UUID, TaskStatus], seconds: float
+) -> dict[UUID, TaskStatus]:
+    if settings.STATUS_CACHE_ENABLED and loaded:
+        for task_id, task_status in loaded.items():
+            status_cache.put(task_id, task_status)
+        status_cache.record(hit=False, seconds=seconds, count=len(loaded))
+    return found | loaded
+
+
+def _require_statuses(statuses: dict[UUID, TaskStatus], task_ids: list[UUID]) -> dict[UUID, TaskStatus]:
+    not_found = [task_id for task_id in dict.fromkeys(task_ids) if task_id not in statuses]
+    if not_found:
+        raise NotFoundError(f"Задачи не найдены. task_ids={','.join(map(str, not_found))}")
+    return statuses
+
+
 class TaskService:
     def __init__(self, db: Session):
         self._db = db
         self._repo = TaskRepository(db)
         self._outbox = OutboxRepository(db)
 
-    def create_task(self, *, title: str, description: str | None, priority: Priority) -> Task:
-        publisher = TaskPublisher()
-        task = Task(title=title, description=description, priority=priority, status=TaskStatus.NEW)
-
-        self._db.add(task)
-        self._db.flush()
+    def create_task(
+        self,
+        *,
+        title: str,
+        description: str | None,
+        priority: Priority,
+        task_type: str = DEFAULT_TASK_TYPE,
+        run_at: datetime | None = None,
+    ) -> Task:
+        [row] = _task_rows(
+            [{"title": title, "description": description, "priority": priority, "type": task_type, "run_at": run_at}]
+        )
+        if row["status"] == TaskStatus.SCHEDULED:
+            [task] = self._repo.create_many([row])
+            self._db.commit()
+            return task
 
-        task.status = TaskStatus.PENDING
-        routing_key, payload = publisher.build_task_created(task.id, task.priority)
-        self._outbox.add(OutboxEvent(task_id=task.id, routing_key=routing_key, payload=payload))
+        outbox = _outbox_row(row["id"], priority, task_type)
+        task = self._repo.create_with_outbox(row, outbox)
         self._db.commit()
-        self._db.refresh(task)
+        _dispatch_after_commit([outbox])
         return task
 
+    def create_tasks(self, items: list[dict[str, Any]]) -> list[Task]:
+        tasks = self._repo.create_many(_task_rows(items))
+        outbox = _outbox_rows(tasks)
+        if outbox:
+            self._outbox.add_many(outbox)
+        self._db.commit()
+        _dispatch_after_commit(outbox)
+        return tasks
+
     def get_task(self, task_id: UUID) -> Task:
         task = self._repo.get(task_id)
         if not task:
             raise NotFoundError(f"Задача task_id={task_id} не найдена.")
         return task
 
+    def get_task_status(self, task_id: UUID) -> TaskStatus:
+        started = time.perf_counter()
+        if settings.STATUS_CACHE_ENABLED and (cached := status_cache.get(task_id)) is not None:
+            status_cache.record(hit=True, seconds=time.perf_counter() - started)
+            return cached
+
+        task_status = self._repo.get_status(task_id)
+        if task_status is None:
+            raise NotFoundError(f"Задача task_id={task_id} не найдена.")
+        if settings.STATUS_CACHE_ENABLED:
+            status_cache.put(task_id, task_status)
+            status_cache.record(hit=False, seconds=time.perf_counter() - started)
+        return task_status
+
+    def find_task_statuses(self, task_ids: list[UUID]) -> dict[UUID, TaskStatus]:
+        # статусы найденных задач, отсутствующие task_id в ответ не попадают
+        found, missing = _cached_statuses(task_ids)
+        started = time.perf_counter()
+        loaded = self._repo.get_statuses(missing) if missing else {}
+        return _merge_statuses(found, loaded, time.perf_counter() - started)
+
+    def get_task_statuses(self, task_ids: list[UUID]) -> dict[UUID, TaskStatus]:
+        return _require_statuses(self.find_task_statuses(task_ids), task_ids)
+
     def list_tasks(
         self,
         *,
@@ -52,18 +258,168 @@ class TaskService:
         offset: int,
         status: TaskStatus | None,
         priority: Priority | None,
+        cursor: str | None = None,
     ) -> list[Task]:
-        return self._repo.list(limit=limit, offset=offset, status=status, priority=priority)
+        return self._repo.list(
+            limit=limit, offset=offset, status=status, priority=priority, cursor=_decode_cursor(cursor)
+        )
+
+    def list_task_rows(
+        self,
+        *,
+        fields: str,
+        limit: int,
+        offset: int,
+        status: TaskStatus | None,
+        priority: Priority | None,
+        cursor: str | None = None,
+    ) -> tuple[list[str], Sequence[Row]]:
+        names, columns = _list_columns(fields)
+        rows = self._repo.list_rows(
+            columns=columns, limit=limit, offset=offset, status=status, priority=priority, cursor=_decode_cursor(cursor)
+        )
+        task_ids = _stored_result_ids(names, rows)
+        return names, _with_stored_results(names, rows, self._repo.get_stored_results(task_ids) if task_ids else {})
+
+    def get_stats(self) -> dict[str, Any]:
+        return _stats(self._repo.stats())
+
+    def count_tasks(self, *, status: TaskStatus | None, priority: Priority | None) -> int:
+        return _count(self._repo.stats(), status, priority)
 
     def cancel_task(self, task_id: UUID) -> Task:
         task = self.get_task(task_id)
 
-        if task.status not in (TaskStatus.NEW, TaskStatus.PENDING):
+        if task.status not in (TaskStatus.NEW, TaskStatus.SCHEDULED, TaskStatus.PENDING):
             raise ConflictError(f"Нельзя отменить задачу в статусе {task.status}. task_id={task_id}")
 
         task.status = TaskStatus.CANCELLED
         task.finished_at = utcnow()
+        notify_task_status(self._db, {task_id: TaskStatus.CANCELLED})
 
         self._db.commit()
+        if settings.STATUS_CACHE_ENABLED:
+            status_cache.put(task_id, TaskStatus.CANCELLED)
         self._db.refresh(task)
-        return task
\ No newline at end of file
+        return task
+
+
+class AsyncTaskService:
+    def __init__(self, db: AsyncSession):
+        self._db = db
+        self._repo = AsyncTaskRepository(db)
+        self._outbox = AsyncOutboxRepository(db)
+
+    async def create_task(
+        self,
+        *,
+        title: str,
+        description: str | None,
+        priority: Priority,
+        task_type: str = DEFAULT_TASK_TYPE,
+        run_at: datetime | None = None,
+    ) -> Task:
+        [row] = _task_rows(
+            [{"title": title, "description": description, "priority": priority, "type": task_type, "run_at": run_at}]
+        )
+        if row["status"] == TaskStatus.SCHEDULED:
+            [task] = await self._repo.create_many([row])
+            await self._db.commit()
+            return task
+
+        outbox = _outbox_row(row["id"], priority, task_type)
+        task = await self._repo.create_with_outbox(row, outbox)
+        await self._db.commit()
+        _dispatch_after_commit([outbox])
+        return task
+
+    async def create_tasks(self, items: list[dict[str, Any]]) -> list[Task]:
+        tasks = await self._repo.create_many(_task_rows(items))
+        outbox = _outbox_rows(tasks)
+        if outbox:
+            await self._outbox.add_many(outbox)
+        await self._db.commit()
+        _dispatch_after_commit(outbox)
+        return tasks
+
+    async def get_task(self, task_id: UUID) -> Task:
+        task = await self._repo.get(task_id)
+        if not task:
+            raise NotFoundError(f"Задача task_id={task_id} не найдена.")
+        return task
+
+    async def get_task_status(self, task_id: UUID) -> TaskStatus:
+        started = time.perf_counter()
+        if settings.STATUS_CACHE_ENABLED and (cached := status_cache.get(task_id)) is not None:
+            status_cache.record(hit=True, seconds=time.perf_counter() - started)
+            return cached
+
+        task_status = await self._repo.get_status(task_id)
+        if task_status is None:
+            raise NotFoundError(f"Задача task_id={task_id} не найдена.")
+        if settings.STATUS_CACHE_ENABLED:
+            status_cache.put(task_id, task_status)
+            status_cache.record(hit=False, seconds=time.perf_counter() - started)
+        return task_status
+
+    async def find_task_statuses(self, task_ids: list[UUID]) -> dict[UUID, TaskStatus]:
+        # статусы найденных задач, отсутствующие task_id в ответ не попадают
+        found, missing = _cached_statuses(task_ids)
+        started = time.perf_counter()
+        loaded = await self._repo.get_statuses(missing) if missing else {}
+        return _merge_statuses(found, loaded, time.perf_counter() - started)
+
+    async def get_task_statuses(self, task_ids: list[UUID]) -> dict[UUID, TaskStatus]:
+        return _require_statuses(await self.find_task_statuses(task_ids), task_ids)
+
+    async def list_tasks(
+        self,
+        *,
+        limit: int,
+        offset: int,
+        status: TaskStatus | None,
+        priority: Priority | None,
+        cursor: str | None = None,
+    ) -> list[Task]:
+        return await self._repo.list(
+            limit=limit, offset=offset, status=status, priority=priority, cursor=_decode_cursor(cursor)
+        )
+
+    async def list_task_rows(
+        self,
+        *,
+        fields: str,
+        limit: int,
+        offset: int,
+        status: TaskStatus | None,
+        priority: Priority | None,
+        cursor: str | None = None,
+    ) -> tuple[list[str], Sequence[Row]]:
+        names, columns = _list_columns(fields)
+        rows = await self._repo.list_rows(
+            columns=columns, limit=limit, offset=offset, status=status, priority=priority, cursor=_decode_cursor(cursor)
+        )
+        task_ids = _stored_result_ids(names, rows)
+        return names, _with_stored_results(names, rows, await self._repo.get_stored_results(task_ids) if task_ids else {})
+
+    async def get_stats(self) -> dict[str, Any]:
+        return _stats(await self._repo.stats())
+
+    async def count_tasks(self, *, status: TaskStatus | None, priority: Priority | None) -> int:
+        return _count(await self._repo.stats(), status, priority)
+
+    async def cancel_task(self, task_id: UUID) -> Task:
+        task = await self.get_task(task_id)
+
+        if task.status not in (TaskStatus.NEW, TaskStatus.SCHEDULED, TaskStatus.PENDING):
+            raise ConflictError(f"Нельзя отменить задачу в статусе {task.status}. task_id={task_id}")
+
+        task.status = TaskStatus.CANCELLED
+        task.finished_at = utcnow()
+        await notify_task_status_async(self._db, {task_id: TaskStatus.CANCELLED})
+
+        await self._db.commit()
+        if settings.STATUS_CACHE_ENABLED:
+            status_cache.put(task_id, TaskStatus.CANCELLED)
+        await self._db.refresh(task)
+        return task
@@ -10,5 +10,9 @@ class ConflictError(DomainError):
     pass
 
 
+class BadRequestError(DomainError):
+    pass
+
+
 class ExternalServiceError(RuntimeError):
     pass
\ No newline at end of file
@@ -1,4 +1,8 @@
+import base64
 from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Sequence
+from uuid import UUID
 
 
 @dataclass(frozen=True)
@@ -10,4 +14,30 @@ class Pagination:
         if self.limit < 1 or self.limit > 100:
             raise ValueError("limit must be between 1 and 100")
         if self.offset < 0:
-            raise ValueError("offset must be >= 0")
\ No newline at end of file
+            raise ValueError("offset must be >= 0")
+
+
+@dataclass(frozen=True)
+class Cursor:
+    created_at: datetime
+    id: UUID
+
+    def encode(self) -> str:
+        raw = f"{self.created_at.isoformat()}|{self.id}".encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, value: str) -> "Cursor":
+        try:
+            raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode("utf-8")
+            created_at, task_id = raw.split("|", 1)
+            return cls(created_at=datetime.fromisoformat(created_at), id=UUID(task_id))
+        except Exception as e:
+            raise ValueError("invalid cursor") from e
+
+
+def next_cursor(items: Sequence[Any], limit: int) -> str | None:
+    if len(items) < limit:
+        return None
+    last = items[-1]
+    return Cursor(created_at=last.created_at, id=last.id).encode()
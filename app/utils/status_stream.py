@@ -0,0 +1,17 @@
+import json
+from typing import Iterator
+from uuid import UUID
+
+from app.core.enums import TaskStatus
+
+
+def status_map_chunks(
+    statuses: dict[UUID, TaskStatus], not_found: list[UUID], chunk_size: int = 1000
+) -> Iterator[bytes]:
+    # uuid и значения статусов не требуют экранирования, поэтому JSON собирается строками без pydantic
+    yield b'{"statuses":{'
+    items = list(statuses.items())
+    for start in range(0, len(items), chunk_size):
+        part = ",".join(f'"{task_id}":"{status.value}"' for task_id, status in items[start:start + chunk_size])
+        yield f"{',' if start else ''}{part}".encode()
+    yield f'}},"not_found":{json.dumps([str(x) for x in not_found])}}}'.encode()
@@ -0,0 +1,156 @@
+import logging
+import time
+from uuid import UUID
+
+from aio_pika import DeliveryMode, Message
+from aio_pika.abc import AbstractChannel, AbstractIncomingMessage
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.core.enums import TaskStatus
+from app.core.metrics import WORKER_DLQ, WORKER_HANDLER_SECONDS, WORKER_MESSAGES, WORKER_RETRIES
+from app.db.models.task import Task
+from app.db.notify import notify_task_status_async
+from app.db.session import AsyncSessionLocal
+from app.workers.consumer import (
+    _base_queues,
+    _claim_stmt,
+    _complete_stmts,
+    _fail_stmt,
+    _parse,
+    _retry_count,
+    _retry_delays,
+    _retry_queue_delays,
+    _retry_queue_name,
+    _split_retries,
+)
+from app.workers.handlers import registry
+
+logger = logging.getLogger(__name__)
+
+
+async def declare(channel: AbstractChannel) -> None:
+    for q in (*_base_queues(), "tasks.dlq"):
+        await channel.declare_queue(q, durable=True)
+
+    for q in _base_queues():
+        for delay in _retry_queue_delays():
+            await channel.declare_queue(
+                _retry_queue_name(q, delay),
+                durable=True,
+                arguments={
+                    "x-message-ttl": int(delay * 1000),
+                    "x-dead-letter-exchange": "",
+                    "x-dead-letter-routing-key": q,
+                },
+            )
+
+
+async def _publish(channel: AbstractChannel, routing_key: str, message: AbstractIncomingMessage, retry_count: int | None = None) -> None:
+    headers = dict(message.headers or {})
+    if retry_count is not None:
+        headers["x-retry-count"] = retry_count
+    await channel.default_exchange.publish(
+        Message(
+            message.body,
+            headers=headers,
+            content_type=message.content_type,
+            delivery_mode=message.delivery_mode or DeliveryMode.PERSISTENT,
+        ),
+        routing_key=routing_key,
+    )
+
+
+async def _execute(task: Task) -> str:
+    return await registry.execute_async(task)
+
+
+async def _on_execute_error(
+    channel, routing_key: str, message: AbstractIncomingMessage, task_id: UUID, exc: Exception, attempts: int = 0
+) -> None:
+    scheduled = settings.RETRY_MODE == "schedule"
+    n = (attempts if scheduled else _retry_count(message)) + 1
+    if n > settings.MAX_RETRIES:
+        await _publish(channel, "tasks.dlq", message)
+        WORKER_DLQ.labels(routing_key, "execute").inc()
+        logger.error(f"Не удалось обработать, экспорт в dlq. task_id={task_id} queue={routing_key} retries={n}", exc_info=exc)
+    else:
+        delay = _retry_delays()[min(n - 1, len(_retry_delays()) - 1)]
+        if not scheduled:
+            await _publish(channel, _retry_queue_name(routing_key, delay), message, n)
+        WORKER_RETRIES.labels(routing_key, "execute").inc()
+        logger.error(
+            f"Ошибка обработки, повтор через {delay}сек. task_id={task_id} queue={routing_key} retries={n}", exc_info=exc
+        )
+
+
+async def _on_external_error(channel, routing_key: str, message: AbstractIncomingMessage, task_id: UUID, exc: Exception) -> None:
+    n = _retry_count(message) + 1
+    WORKER_MESSAGES.labels(routing_key, "error").inc()
+    if n > settings.MAX_RETRIES:
+        await _publish(channel, "tasks.dlq", message)
+        WORKER_DLQ.labels(routing_key, "external").inc()
+        logger.error(f"Внешняя ошибка, экспорт в dlq. task_id={task_id} queue={routing_key} retries={n}", exc_info=exc)
+    else:
+        await _publish(channel, routing_key, message, n)
+        WORKER_RETRIES.labels(routing_key, "external").inc()
+        logger.error(f"Внешняя ошибка. task_id={task_id} queue={routing_key} retries={n}", exc_info=exc)
+
+
+async def on_message(channel: AbstractChannel, message: AbstractIncomingMessage) -> None:
+    routing_key = message.routing_key or "unknown"
+    try:
+        task_id = _parse(message.body, message.content_type)
+    except Exception:
+        logger.warning(f"Невалидное сообщение. queue={routing_key}")
+        await _publish(channel, "tasks.dlq", message)
+        WORKER_MESSAGES.labels(routing_key, "invalid").inc()
+        WORKER_DLQ.labels(routing_key, "invalid").inc()
+        await message.ack()
+        return
+
+    # сессия отдает соединение в пул после каждого commit, поэтому ожидание в _execute не держит соединение
+    try:
+        async with AsyncSessionLocal() as db:
+            try:
+                task = (await db.scalars(_claim_stmt(task_id).returning(Task))).one_or_none()
+                await db.commit()
+                if task is None:
+                    WORKER_MESSAGES.labels(routing_key, "claim_miss").inc()
+                    logger.info(f"Задача пропущена: нет статуса PENDING. task_id={task_id} queue={routing_key}")
+                    return
+
+                try:
+                    logger.info(f"Старт обработки задачи. task_id={task_id} queue={routing_key}")
+                    started = time.perf_counter()
+                    try:
+                        result = await _execute(task)
+                    finally:
+                        WORKER_HANDLER_SECONDS.labels(task.type).observe(time.perf_counter() - started)
+                    for stmt in _complete_stmts(task_id, result):
+                        await db.execute(stmt)
+                    await notify_task_status_async(db, {task_id: TaskStatus.COMPLETED})
+                    await db.commit()
+                    WORKER_MESSAGES.labels(routing_key, "completed").inc()
+                    logger.info(f"Задача завершена успешно. task_id={task_id}")
+                except Exception as e:
+                    attempts = task.attempts
+                    retries, _ = _split_retries([(task, str(e))])
+                    if retries:
+                        await db.execute(update(Task), retries)
+                    else:
+                        await db.execute(_fail_stmt(task_id, str(e)))
+                        await notify_task_status_async(db, {task_id: TaskStatus.FAILED})
+                    await db.commit()
+                    WORKER_MESSAGES.labels(routing_key, "failed").inc()
+                    await _on_execute_error(channel, routing_key, message, task_id, e, attempts)
+
+            except Exception as e:
+                try:
+                    await db.rollback()
+                except Exception:
+                    pass
+                await _on_external_error(channel, routing_key, message, task_id, e)
+
+    finally:
+        await message.ack()
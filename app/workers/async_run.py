@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from functools import partial
+
+import aio_pika
+
+from app.core.config import settings
+from app.core.metrics import start_metrics_server
+from app.db.session import async_engine
+from app.utils.compression import compress
+from app.workers.async_consumer import declare, on_message
+from app.workers.consumer import _worker_queues
+
+logger = logging.getLogger(__name__)
+
+
+async def _connect() -> aio_pika.abc.AbstractRobustConnection:
+    last = None
+    for _ in range(120):
+        try:
+            return await aio_pika.connect_robust(settings.RABBITMQ_URL)
+        except Exception as e:
+            last = e
+            await asyncio.sleep(1)
+    raise last
+
+
+async def _run() -> None:
+    conn = await _connect()
+    try:
+        ch = await conn.channel()
+        await ch.set_qos(prefetch_count=settings.WORKER_PREFETCH)
+        await declare(ch)
+
+        queues = _worker_queues()
+        for q in queues:
+            queue = await ch.get_queue(q)
+            await queue.consume(partial(on_message, ch))
+
+        logger.info(f"Async воркер запущен. prefetch={settings.WORKER_PREFETCH} queues={queues}")
+        await asyncio.Future()
+    finally:
+        await conn.close()
+        await async_engine.dispose()
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=getattr(logging, str(getattr(settings, "LOG_LEVEL", "INFO")).upper(), logging.INFO), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    # недоступное сжатие иначе проявится только на первом большом результате: задача выполнится и уйдет в FAILED
+    compress(b"", settings.TASK_RESULT_COMPRESSION)
+    start_metrics_server()
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
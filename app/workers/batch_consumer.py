@@ -0,0 +1,141 @@
+import logging
+from dataclasses import dataclass
+from uuid import UUID
+
+import pika
+
+from app.core.metrics import WORKER_DLQ, WORKER_MESSAGES
+from app.db.models.task import Task
+from app.db.session import SessionLocal
+from app.workers.consumer import (
+    _claim_many,
+    _complete_many,
+    _execute_many,
+    _fail_or_reschedule,
+    _on_execute_error,
+    _on_external_error,
+    _parse,
+    _publish_dlq,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Delivery:
+    method: object
+    props: pika.BasicProperties
+    body: bytes
+    task_id: UUID | None = None
+
+    @property
+    def routing_key(self) -> str:
+        return getattr(self.method, "routing_key", "unknown")
+
+
+def _process(channel, deliveries: list[Delivery]) -> None:
+    db = SessionLocal()
+    try:
+        try:
+            claimed = _claim_many(db, [d.task_id for d in deliveries])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            for d in deliveries:
+                _on_external_error(channel, d.routing_key, d.body, d.props, d.task_id, e)
+            return
+
+        todo: list[Delivery] = []
+        tasks = []
+        for d in deliveries:
+            task = claimed.pop(d.task_id, None)
+            if task is not None:
+                todo.append(d)
+                tasks.append(task)
+            else:
+                WORKER_MESSAGES.labels(d.routing_key, "claim_miss").inc()
+                logger.info(f"Задача пропущена: нет статуса PENDING. task_id={d.task_id} queue={d.routing_key}")
+
+        # задачи одного типа с пакетным обработчиком уходят в него одним вызовом
+        results: dict[UUID, str] = {}
+        errors: list[tuple[Delivery, int, Exception]] = []
+        failed_tasks: list[tuple[Task, str]] = []
+        for d, task, outcome in zip(todo, tasks, _execute_many(tasks) if tasks else []):
+            if isinstance(outcome, Exception):
+                errors.append((d, task.attempts, outcome))
+                failed_tasks.append((task, str(outcome)))
+            else:
+                results[d.task_id] = outcome
+
+        try:
+            _complete_many(db, results)
+            _fail_or_reschedule(db, failed_tasks)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            for d in todo:
+                _on_external_error(channel, d.routing_key, d.body, d.props, d.task_id, e)
+            return
+
+        for d in todo:
+            WORKER_MESSAGES.labels(d.routing_key, "failed" if d.task_id not in results else "completed").inc()
+        for d, attempts, e in errors:
+            _on_execute_error(channel, d.routing_key, d.body, d.props, d.task_id, e, attempts)
+
+        logger.info(
+            f"Пачка задач обработана. size={len(deliveries)} completed={len(results)} "
+            f"failed={len(errors)} skipped={len(deliveries) - len(todo)}"
+        )
+    finally:
+        db.close()
+
+
+def process_batch(channel, deliveries: list[Delivery]) -> None:
+    if not deliveries:
+        return
+
+    valid: list[Delivery] = []
+    for d in deliveries:
+        try:
+            d.task_id = _parse(d.body, getattr(d.props, "content_type", None))
+            valid.append(d)
+        except Exception:
+            logger.warning(f"Невалидное сообщение. queue={d.routing_key}")
+            _publish_dlq(channel, d.body, d.props)
+            WORKER_MESSAGES.labels(d.routing_key, "invalid").inc()
+            WORKER_DLQ.labels(d.routing_key, "invalid").inc()
+
+    try:
+        if valid:
+            _process(channel, valid)
+    finally:
+        # все доставки канала проходят через один буфер по порядку, поэтому multiple ack закрывает ровно эту пачку
+        channel.basic_ack(deliveries[-1].method.delivery_tag, multiple=True)
+
+
+class BatchConsumer:
+    def __init__(self, connection, channel, *, size: int, wait_ms: int) -> None:
+        self._connection = connection
+        self._channel = channel
+        self._size = size
+        self._wait = wait_ms / 1000
+        self._buffer: list[Delivery] = []
+        self._timer = None
+
+    def on_message(self, channel, method, props: pika.BasicProperties, body: bytes) -> None:
+        self._buffer.append(Delivery(method=method, props=props, body=body))
+        if len(self._buffer) >= self._size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = self._connection.call_later(self._wait, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self.flush()
+
+    def flush(self) -> None:
+        if self._timer is not None:
+            self._connection.remove_timeout(self._timer)
+            self._timer = None
+        batch, self._buffer = self._buffer, []
+        process_batch(self._channel, batch)
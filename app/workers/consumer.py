@@ -1,15 +1,21 @@
-import json
 import logging
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
 import pika
-from sqlalchemy import update
+from sqlalchemy import insert, update
 
 from app.core.config import settings
 from app.core.enums import TaskStatus
+from app.core.metrics import WORKER_DLQ, WORKER_HANDLER_SECONDS, WORKER_MESSAGES, WORKER_RETRIES
 from app.db.models.task import Task
+from app.db.models.task_result import TaskResult
+from app.db.notify import notify_task_status
 from app.db.session import SessionLocal
+from app.messaging.codec import get_codec
+from app.utils.compression import compress
+from app.workers.handlers import registry
 
 logger = logging.getLogger(__name__)
 
@@ -22,17 +28,32 @@ def _now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _retry_queue_delays() -> list[int]:
+    # в режиме schedule задержка хранится в tasks.run_at, TTL-очереди не объявляются
+    return [] if settings.RETRY_MODE == "schedule" else _retry_delays()
+
+
 def _retry_queue_name(routing_key: str, delay_seconds: int) -> str:
     return f"{routing_key}.retry.{delay_seconds}s"
 
 
+def _base_queues() -> tuple[str, str, str]:
+    return settings.TASKS_QUEUE_HIGH, settings.TASKS_QUEUE_MEDIUM, settings.TASKS_QUEUE_LOW
+
+
+def _worker_queues() -> list[str]:
+    if settings.WORKER_QUEUES:
+        return [q.strip() for q in settings.WORKER_QUEUES.split(",") if q.strip()]
+    return list(_base_queues())
+
+
 def _declare(channel: pika.adapters.blocking_connection.BlockingChannel) -> None:
-    base = (settings.TASKS_QUEUE_HIGH, settings.TASKS_QUEUE_MEDIUM, settings.TASKS_QUEUE_LOW)
+    base = _base_queues()
     for q in (*base, "tasks.dlq"):
         channel.queue_declare(queue=q, durable=True)
 
     for q in base:
-        for delay in _retry_delays():
+        for delay in _retry_queue_delays():
             channel.queue_declare(
                 queue=_retry_queue_name(q, delay),
                 durable=True,
@@ -62,8 +83,8 @@ def _with_retry(props: pika.BasicProperties, retry_count: int) -> pika.BasicProp
     )
 
 
-def _parse(body: bytes) -> UUID:
-    payload = json.loads(body.decode("utf-8"))
+def _parse(body: bytes, content_type: str | None = None) -> UUID:
+    payload = get_codec(content_type).decode(body)
     return UUID(str(payload["task_id"]))
 
 
@@ -90,97 +111,232 @@ def _publish_dlq(channel, body: bytes, props: pika.BasicProperties) -> None:
     channel.basic_publish(exchange="", routing_key="tasks.dlq", body=body, properties=props)
 
 
-def _claim(db, task_id: UUID) -> bool:
-    res = db.execute(
+def _claim_stmt(task_id: UUID):
+    return (
         update(Task)
         .where(Task.id == task_id, Task.status == TaskStatus.PENDING)
         .values(status=TaskStatus.IN_PROGRESS, started_at=_now())
     )
-    return (res.rowcount or 0) > 0
 
 
-def _complete(db, task_id: UUID, result: str) -> None:
-    db.execute(
+def _split_results(results: dict[UUID, str]) -> tuple[dict[UUID, str | None], list[dict]]:
+    # длинный результат уходит сжатым в task_results, строка tasks остается узкой и не тянет его при каждом чтении
+    inline: dict[UUID, str | None] = {}
+    stored: list[dict] = []
+    for task_id, result in results.items():
+        raw = result.encode("utf-8")
+        if len(raw) <= settings.TASK_RESULT_INLINE_MAX_BYTES:
+            inline[task_id] = result
+            continue
+        inline[task_id] = None
+        method = settings.TASK_RESULT_COMPRESSION
+        stored.append({"task_id": task_id, "encoding": method, "size": len(raw), "data": compress(raw, method)})
+    return inline, stored
+
+
+def _complete_stmt(task_id: UUID, result: str | None):
+    return (
         update(Task)
         .where(Task.id == task_id)
-        .values(status=TaskStatus.COMPLETED, result=result, error=None, finished_at=_now())
+        .values(status=TaskStatus.COMPLETED, result_inline=result, error=None, finished_at=_now())
     )
 
 
-def _fail(db, task_id: UUID, error: str) -> None:
-    db.execute(
+def _complete_stmts(task_id: UUID, result: str) -> list:
+    inline, stored = _split_results({task_id: result})
+    stmts = [_complete_stmt(task_id, inline[task_id])]
+    if stored:
+        stmts.append(insert(TaskResult).values(stored))
+    return stmts
+
+
+def _fail_stmt(task_id: UUID, error: str):
+    return (
         update(Task)
         .where(Task.id == task_id)
         .values(status=TaskStatus.FAILED, error=error, finished_at=_now())
     )
 
 
-def _execute(task_id: UUID) -> str:
-    return f"ok:{task_id}"
+def _claim(db, task_id: UUID) -> Task | None:
+    return db.scalars(_claim_stmt(task_id).returning(Task)).one_or_none()
+
+
+def _complete(db, task_id: UUID, result: str) -> None:
+    for stmt in _complete_stmts(task_id, result):
+        db.execute(stmt)
+    notify_task_status(db, {task_id: TaskStatus.COMPLETED})
+
+
+def _fail(db, task_id: UUID, error: str) -> None:
+    db.execute(_fail_stmt(task_id, error))
+    notify_task_status(db, {task_id: TaskStatus.FAILED})
+
+
+def _claim_many(db, task_ids: list[UUID]) -> dict[UUID, Task]:
+    res = db.scalars(
+        update(Task)
+        .where(Task.id.in_(task_ids), Task.status == TaskStatus.PENDING)
+        .values(status=TaskStatus.IN_PROGRESS, started_at=_now())
+        .returning(Task)
+        .execution_options(synchronize_session=False)
+    )
+    return {task.id: task for task in res}
+
+
+def _complete_many(db, results: dict[UUID, str]) -> None:
+    if not results:
+        return
+    now = _now()
+    inline, stored = _split_results(results)
+    db.execute(
+        update(Task),
+        [
+            {"id": task_id, "status": TaskStatus.COMPLETED, "result_inline": result, "error": None, "finished_at": now}
+            for task_id, result in inline.items()
+        ],
+    )
+    if stored:
+        db.execute(insert(TaskResult), stored)
+    notify_task_status(db, dict.fromkeys(results, TaskStatus.COMPLETED))
+
+
+def _fail_many(db, errors: dict[UUID, str]) -> None:
+    if not errors:
+        return
+    now = _now()
+    db.execute(
+        update(Task),
+        [
+            {"id": task_id, "status": TaskStatus.FAILED, "error": error, "finished_at": now}
+            for task_id, error in errors.items()
+        ],
+    )
+    notify_task_status(db, dict.fromkeys(errors, TaskStatus.FAILED))
+
+
+def _scheduled_retry_at(attempts: int) -> datetime | None:
+    if settings.RETRY_MODE != "schedule" or attempts >= settings.MAX_RETRIES:
+        return None
+    delays = _retry_delays()
+    return _now() + timedelta(seconds=delays[min(attempts, len(delays) - 1)])
+
+
+def _split_retries(errors: list[tuple[Task, str]]) -> tuple[list[dict], dict[UUID, str]]:
+    # задачи с оставшимися попытками возвращаются в SCHEDULED, их поднимет promote_due_tasks в цикле outbox
+    retries: list[dict] = []
+    failed: dict[UUID, str] = {}
+    for task, error in errors:
+        run_at = _scheduled_retry_at(task.attempts)
+        if run_at is None:
+            failed[task.id] = error
+        else:
+            retries.append(
+                {
+                    "id": task.id,
+                    "status": TaskStatus.SCHEDULED,
+                    "run_at": run_at,
+                    "attempts": task.attempts + 1,
+                    "error": error,
+                    "started_at": None,
+                }
+            )
+    return retries, failed
+
+
+def _fail_or_reschedule(db, errors: list[tuple[Task, str]]) -> None:
+    retries, failed = _split_retries(errors)
+    if retries:
+        db.execute(update(Task), retries)
+    _fail_many(db, failed)
+
+
+def _execute(task: Task) -> str:
+    return registry.execute(task)
+
+
+def _execute_many(tasks: list[Task]) -> list[str | Exception]:
+    return registry.execute_many(tasks)
 
 
-def on_message(channel, method, props: pika.BasicProperties, body: bytes) -> None:
+def _on_execute_error(
+    channel, routing_key: str, body: bytes, props: pika.BasicProperties, task_id: UUID, exc: Exception, attempts: int = 0
+) -> None:
+    scheduled = settings.RETRY_MODE == "schedule"
+    n = (attempts if scheduled else _retry_count(props)) + 1
+    if n > settings.MAX_RETRIES:
+        _publish_dlq(channel, body, props)
+        WORKER_DLQ.labels(routing_key, "execute").inc()
+        logger.error(f"Не удалось обработать, экспорт в dlq. task_id={task_id} queue={routing_key} retries={n}", exc_info=exc)
+    else:
+        if not scheduled:
+            _republish_delayed(channel, routing_key, body, props, n)
+        WORKER_RETRIES.labels(routing_key, "execute").inc()
+        delay = _retry_delays()[min(n - 1, len(_retry_delays()) - 1)]
+        logger.error(
+            f"Ошибка обработки, повтор через {delay}сек. task_id={task_id} queue={routing_key} retries={n}", exc_info=exc
+        )
+
+
+def _on_external_error(channel, routing_key: str, body: bytes, props: pika.BasicProperties, task_id: UUID, exc: Exception) -> None:
+    n = _retry_count(props) + 1
+    WORKER_MESSAGES.labels(routing_key, "error").inc()
+    if n > settings.MAX_RETRIES:
+        _publish_dlq(channel, body, props)
+        WORKER_DLQ.labels(routing_key, "external").inc()
+        logger.error(f"Внешняя ошибка, экспорт в dlq. task_id={task_id} queue={routing_key} retries={n}", exc_info=exc)
+    else:
+        _republish_same_queue(channel, routing_key, body, props, n)
+        WORKER_RETRIES.labels(routing_key, "external").inc()
+        logger.error(f"Внешняя ошибка. task_id={task_id} queue={routing_key} retries={n}", exc_info=exc)
+
+
+def on_message(channel, method, props: pika.BasicProperties, body: bytes, execute=None) -> None:
     routing_key = getattr(method, "routing_key", "unknown")
     try:
-        task_id = _parse(body)
+        task_id = _parse(body, getattr(props, "content_type", None))
     except Exception:
         logger.warning(f"Невалидное сообщение. queue={routing_key}")
         _publish_dlq(channel, body, props)
+        WORKER_MESSAGES.labels(routing_key, "invalid").inc()
+        WORKER_DLQ.labels(routing_key, "invalid").inc()
         channel.basic_ack(method.delivery_tag)
         return
 
     db = SessionLocal()
     try:
         try:
-            if not _claim(db, task_id):
+            task = _claim(db, task_id)
+            if task is None:
                 db.commit()
+                WORKER_MESSAGES.labels(routing_key, "claim_miss").inc()
                 logger.info(f"Задача пропущена: нет статуса PENDING. task_id={task_id} queue={routing_key}")
                 return
 
             try:
                 logger.info(f"Старт обработки задачи. task_id={task_id} queue={routing_key}")
-                result = _execute(task_id)
+                started = time.perf_counter()
+                try:
+                    result = (execute or _execute)(task)
+                finally:
+                    WORKER_HANDLER_SECONDS.labels(task.type).observe(time.perf_counter() - started)
                 _complete(db, task_id, result)
                 db.commit()
+                WORKER_MESSAGES.labels(routing_key, "completed").inc()
                 logger.info(f"Задача завершена успешно. task_id={task_id}")
             except Exception as e:
-                n = _retry_count(props) + 1
-                max_retries = settings.MAX_RETRIES
-
-                _fail(db, task_id, str(e))
+                attempts = task.attempts
+                _fail_or_reschedule(db, [(task, str(e))])
                 db.commit()
+                WORKER_MESSAGES.labels(routing_key, "failed").inc()
+                _on_execute_error(channel, routing_key, body, props, task_id, e, attempts)
 
-                if n > max_retries:
-                    _publish_dlq(channel, body, props)
-                    logger.exception(
-                        f"Не удалось обработать, экспорт в dlq. task_id={task_id} queue={routing_key} retries={n}"
-                    )
-                else:
-                    _republish_delayed(channel, routing_key, body, props, n)
-                    delay = _retry_delays()[min(n - 1, len(_retry_delays()) - 1)]
-                    logger.exception(
-                        f"Ошибка обработки, повтор через {delay}сек. task_id={task_id} queue={routing_key} retries={n}"
-                    )
-
-        except Exception:
+        except Exception as e:
             try:
                 db.rollback()
             except Exception:
                 pass
-
-            n = _retry_count(props) + 1
-            max_retries = settings.MAX_RETRIES
-
-            if n > max_retries:
-                _publish_dlq(channel, body, props)
-                logger.exception(
-                    f"Внешняя ошибка, экспорт в dlq. task_id={task_id} queue={routing_key} retries={n}"
-                )
-            else:
-                _republish_same_queue(channel, routing_key, body, props, n)
-                logger.exception(
-                    f"Внешняя ошибка. task_id={task_id} queue={routing_key} retries={n}"
-                )
+            _on_external_error(channel, routing_key, body, props, task_id, e)
 
         finally:
             channel.basic_ack(method.delivery_tag)
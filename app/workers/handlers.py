@@ -0,0 +1,130 @@
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from app.core.enums import DEFAULT_TASK_TYPE
+from app.core.metrics import WORKER_HANDLER_SECONDS
+from app.db.models.task import Task
+
+
+class UnknownTaskTypeError(LookupError):
+    pass
+
+
+@dataclass(frozen=True)
+class Handler:
+    func: Callable[..., Any]
+    batch: bool = False
+    max_batch: int = 1
+
+
+def _call(func: Callable[..., Any], arg: Any) -> Any:
+    if inspect.iscoroutinefunction(func):
+        return asyncio.run(func(arg))
+    return func(arg)
+
+
+async def _call_async(func: Callable[..., Any], arg: Any) -> Any:
+    if inspect.iscoroutinefunction(func):
+        return await func(arg)
+    return await asyncio.to_thread(func, arg)
+
+
+def _outcomes(handler: Handler, tasks: list[Task], results: Any) -> list[str | Exception]:
+    results = list(results)
+    if len(results) != len(tasks):
+        error = ValueError(f"batch handler returned {len(results)} results for {len(tasks)} tasks")
+        return [error] * len(tasks)
+    return results
+
+
+class HandlerRegistry:
+    def __init__(self) -> None:
+        self._handlers: dict[str, Handler] = {}
+
+    def register(self, task_type: str) -> Callable:
+        # обычный обработчик: получает одну задачу, возвращает результат строкой
+        def decorator(func: Callable[[Task], str]) -> Callable[[Task], str]:
+            self._handlers[task_type] = Handler(func=func)
+            return func
+        return decorator
+
+    def register_batch(self, task_type: str, *, max_batch: int = 100) -> Callable:
+        # пакетный обработчик: получает до max_batch задач одного типа и возвращает по результату
+        # на каждую задачу в том же порядке, строку или исключение (задача уйдет в FAILED и retry)
+        def decorator(func: Callable[[list[Task]], list[str | Exception]]) -> Callable:
+            self._handlers[task_type] = Handler(func=func, batch=True, max_batch=max_batch)
+            return func
+        return decorator
+
+    def get(self, task_type: str) -> Handler:
+        try:
+            return self._handlers[task_type]
+        except KeyError:
+            raise UnknownTaskTypeError(f"Нет обработчика для типа задачи type={task_type}") from None
+
+    def execute(self, task: Task) -> str:
+        handler = self.get(task.type)
+        if not handler.batch:
+            return _call(handler.func, task)
+        [outcome] = _outcomes(handler, [task], _call(handler.func, [task]))
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def execute_async(self, task: Task) -> str:
+        handler = self.get(task.type)
+        if not handler.batch:
+            return await _call_async(handler.func, task)
+        [outcome] = _outcomes(handler, [task], await _call_async(handler.func, [task]))
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def execute_many(self, tasks: list[Task]) -> list[str | Exception]:
+        outcomes: dict[int, str | Exception] = {}
+        groups: dict[str, list[int]] = {}
+        for i, task in enumerate(tasks):
+            groups.setdefault(task.type, []).append(i)
+
+        for task_type, indexes in groups.items():
+            try:
+                handler = self.get(task_type)
+            except UnknownTaskTypeError as e:
+                outcomes.update((i, e) for i in indexes)
+                continue
+
+            seconds = WORKER_HANDLER_SECONDS.labels(task_type)
+            if not handler.batch:
+                for i in indexes:
+                    started = time.perf_counter()
+                    try:
+                        outcomes[i] = _call(handler.func, tasks[i])
+                    except Exception as e:
+                        outcomes[i] = e
+                    seconds.observe(time.perf_counter() - started)
+                continue
+
+            # у пакетного обработчика наблюдение одно на вызов, а не на задачу
+            for start in range(0, len(indexes), handler.max_batch):
+                chunk = indexes[start:start + handler.max_batch]
+                group = [tasks[i] for i in chunk]
+                started = time.perf_counter()
+                try:
+                    results = _outcomes(handler, group, _call(handler.func, group))
+                except Exception as e:
+                    results = [e] * len(group)
+                seconds.observe(time.perf_counter() - started)
+                outcomes.update(zip(chunk, results))
+
+        return [outcomes[i] for i in range(len(tasks))]
+
+
+registry = HandlerRegistry()
+
+
+@registry.register(DEFAULT_TASK_TYPE)
+def default_handler(task: Task) -> str:
+    return f"ok:{task.id}"
@@ -0,0 +1,149 @@
+import logging
+import re
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.outbox import OutboxEvent
+from app.db.session import SessionLocal
+from app.repositories.outbox_repo import utcnow
+from app.repositories.task_repo import TaskRepository
+
+logger = logging.getLogger(__name__)
+
+PARENT = OutboxEvent.__tablename__
+DEFAULT_PARTITION = f"{PARENT}_default"
+ARCHIVE_PREFIX = f"{PARENT}_archive_"
+RETENTION_MODES = ("drop", "detach")
+
+_PARTITION_RE = re.compile(rf"^{PARENT}_p(\d{{8}})$")
+
+
+def partition_name(day: date) -> str:
+    return f"{PARENT}_p{day:%Y%m%d}"
+
+
+def _bound(day: date) -> str:
+    return f"{day.isoformat()} 00:00:00+00"
+
+
+def list_partitions(db: Session) -> dict[date, str]:
+    names = db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :parent"
+        ),
+        {"parent": PARENT},
+    ).scalars()
+
+    partitions: dict[date, str] = {}
+    for name in names:
+        m = _PARTITION_RE.match(name)
+        if m:
+            partitions[datetime.strptime(m.group(1), "%Y%m%d").date()] = name
+    return partitions
+
+
+def _create_partition(db: Session, day: date) -> None:
+    name = partition_name(day)
+    bounds = {"lo": _bound(day), "hi": _bound(day + timedelta(days=1))}
+    ddl = text(f"CREATE TABLE {name} PARTITION OF {PARENT} FOR VALUES FROM ('{bounds['lo']}') TO ('{bounds['hi']}')")
+
+    stray = db.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE created_at >= :lo AND created_at < :hi)"),
+        bounds,
+    ).scalar()
+    if not stray:
+        db.execute(ddl)
+        return
+
+    # строки этого дня уже попали в default-партицию - переносим их в новую
+    db.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {DEFAULT_PARTITION}"))
+    db.execute(ddl)
+    db.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :lo AND created_at < :hi RETURNING *) "
+            f"INSERT INTO {PARENT} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    db.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    logger.warning(f"Outbox: события из default-партиции перенесены в новую. partition={name}")
+
+
+def ensure_partitions(db: Session, *, today: date, ahead_days: int) -> list[str]:
+    existing = list_partitions(db)
+    created: list[str] = []
+    for offset in range(ahead_days + 1):
+        day = today + timedelta(days=offset)
+        if day in existing:
+            continue
+        _create_partition(db, day)
+        created.append(partition_name(day))
+    return created
+
+
+def apply_retention(db: Session, *, today: date, retention_days: int, mode: str) -> list[str]:
+    if mode not in RETENTION_MODES:
+        raise ValueError(f"retention mode must be one of {RETENTION_MODES}")
+
+    cutoff = today - timedelta(days=retention_days)
+    removed: list[str] = []
+    for day, name in sorted(list_partitions(db).items()):
+        if day >= cutoff:
+            break
+
+        # проверка идет по частичному индексу status='NEW', а не по всей партиции
+        pending = db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name} WHERE status = 'NEW')")).scalar()
+        if pending:
+            logger.warning(f"Outbox: в партиции есть неотправленные события, пропускаем. partition={name}")
+            continue
+
+        if mode == "detach":
+            db.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+            db.execute(text(f"ALTER TABLE {name} RENAME TO {ARCHIVE_PREFIX}{day:%Y%m%d}"))
+        else:
+            db.execute(text(f"DROP TABLE {name}"))
+        removed.append(name)
+    return removed
+
+
+def run_once(db: Session, today: date | None = None) -> tuple[list[str], list[str]]:
+    today = today or utcnow().date()
+    db.execute(text("SET LOCAL lock_timeout = '5s'"))
+
+    created = ensure_partitions(db, today=today, ahead_days=settings.OUTBOX_PARTITIONS_AHEAD_DAYS)
+    removed = apply_retention(
+        db,
+        today=today,
+        retention_days=settings.OUTBOX_RETENTION_DAYS,
+        mode=settings.OUTBOX_RETENTION_MODE,
+    )
+    # шарды счетчиков задач сворачиваются тем же периодическим заданием
+    compacted = TaskRepository(db).compact_counters()
+    db.commit()
+
+    logger.info(
+        f"Outbox обслуживание завершено. created={created} {settings.OUTBOX_RETENTION_MODE}={removed} "
+        f"retention={settings.OUTBOX_RETENTION_DAYS}d ahead={settings.OUTBOX_PARTITIONS_AHEAD_DAYS}d "
+        f"task_counters_compacted={compacted}"
+    )
+    return created, removed
+
+
+def run_forever(interval: float) -> None:
+    while True:
+        db = SessionLocal()
+        try:
+            run_once(db)
+        except Exception:
+            db.rollback()
+            logger.exception("Ошибка обслуживания outbox")
+        finally:
+            db.close()
+        time.sleep(interval)
@@ -0,0 +1,23 @@
+import argparse
+import logging
+
+from app.db.session import SessionLocal
+from app.workers.outbox_maintenance import run_forever, run_once
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--interval", type=float, default=0.0, help="Запускать обслуживание каждые N секунд, 0 - один раз и выйти")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    if args.interval > 0:
+        run_forever(args.interval)
+        return
+
+    with SessionLocal() as db:
+        run_once(db)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,23 @@ import time
 from datetime import timedelta
 
 from sqlalchemy import update
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.enums import OutboxStatus
+from app.core.metrics import (
+    OUTBOX_BACKLOG,
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_EVENTS,
+    OUTBOX_OLDEST_NEW_AGE,
+    OUTBOX_PUBLISH_SECONDS,
+    TASKS_PROMOTED,
+)
 from app.db.models.outbox import OutboxEvent
 from app.db.session import SessionLocal
-from app.messaging.rabbitmq import publish
-from app.repositories.outbox_repo import OutboxRepository, utcnow
+from app.messaging.rabbitmq import publish, publish_batch
+from app.repositories.outbox_repo import OutboxRepository, OutboxShard, utcnow
+from app.services.task_service import promote_due_tasks
 
 logger = logging.getLogger(__name__)
 
@@ -18,54 +28,123 @@ def _backoff(attempt: int) -> timedelta:
     return timedelta(seconds=min(60.0, 0.5 * (2 ** max(0, attempt - 1))))
 
 
-def run_forever() -> None:
-    logger.info(f"Outbox запущен. interval={settings.OUTBOX_POLL_INTERVAL}s batch={settings.OUTBOX_BATCH_SIZE}")
+def _publish_one_by_one(db: Session, events: list[OutboxEvent]) -> int:
+    sent = 0
+    for ev in events:
+        try:
+            publish(queue_name=ev.routing_key, payload=ev.payload)
+            db.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.id == ev.id, OutboxEvent.created_at == ev.created_at)
+                .values(status=OutboxStatus.SENT, sent_at=utcnow(), last_error=None)
+            )
+            sent += 1
+            logger.info(f"Outbox отправил сообщение. outbox_id={ev.id} task_id={ev.task_id} queue={ev.routing_key}")
+        except Exception as exc:
+            attempts = int(ev.attempts or 0) + 1
+            next_at = utcnow() + _backoff(attempts)
+            status = OutboxStatus.FAILED if attempts >= settings.OUTBOX_MAX_ATTEMPTS else OutboxStatus.NEW
+
+            db.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.id == ev.id, OutboxEvent.created_at == ev.created_at)
+                .values(status=status, attempts=attempts, next_attempt_at=next_at, last_error=str(exc))
+            )
+
+            if status == OutboxStatus.FAILED:
+                logger.exception(
+                    f"Outbox не смог отправить сообщение, попытки исчерпаны. outbox_id={ev.id} task_id={ev.task_id} queue={ev.routing_key} attempts={attempts}"
+                )
+            else:
+                logger.exception(
+                    f"Outbox не смог отправить сообщение. outbox_id={ev.id} task_id={ev.task_id} queue={ev.routing_key} attempts={attempts} next={next_at.isoformat()}"
+                )
+    return sent
+
+
+def _publish_batch(db: Session, events: list[OutboxEvent]) -> int:
+    repo = OutboxRepository(db)
+    try:
+        publish_batch([(ev.routing_key, ev.payload) for ev in events])
+    except Exception as exc:
+        now = utcnow()
+        attempts = {int(ev.attempts or 0) for ev in events}
+        repo.mark_retry(
+            events,
+            next_attempt_at={a: now + _backoff(a + 1) for a in attempts},
+            max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+            error=str(exc),
+        )
+        logger.exception(f"Outbox не смог отправить пачку. size={len(events)} attempts={sorted(a + 1 for a in attempts)}")
+        return 0
+
+    repo.mark_sent(events)
+    return len(events)
+
+
+def run_once(db: Session, shard: OutboxShard | None = None) -> int:
+    events = OutboxRepository(db).fetch_batch_for_publish(limit=settings.OUTBOX_BATCH_SIZE, shard=shard)
+    if not events:
+        db.commit()
+        return 0
+
+    started = time.perf_counter()
+    if settings.OUTBOX_PUBLISH_MODE == "batch":
+        sent = _publish_batch(db, events)
+    else:
+        sent = _publish_one_by_one(db, events)
+    db.commit()
 
+    elapsed = time.perf_counter() - started
+    rate = sent / elapsed if elapsed > 0 else 0.0
+    OUTBOX_BATCH_SIZE.observe(len(events))
+    OUTBOX_PUBLISH_SECONDS.labels(settings.OUTBOX_PUBLISH_MODE).observe(elapsed)
+    OUTBOX_EVENTS.labels("sent").inc(sent)
+    OUTBOX_EVENTS.labels("error").inc(len(events) - sent)
+    logger.info(
+        f"Outbox пачка обработана. shard={shard or '-'} mode={settings.OUTBOX_PUBLISH_MODE} size={len(events)} sent={sent} "
+        f"failed={len(events) - sent} elapsed={elapsed * 1000:.1f}ms rate={rate:.1f} events/s"
+    )
+    return len(events)
+
+
+def promote_due(db: Session) -> int:
+    promoted = promote_due_tasks(db, settings.OUTBOX_SCHEDULE_BATCH_SIZE)
+    db.commit()
+    if promoted:
+        TASKS_PROMOTED.inc(promoted)
+        logger.info(f"Отложенные задачи переведены в PENDING. count={promoted}")
+    return promoted
+
+
+def report_backlog(db: Session, shard: OutboxShard | None = None) -> None:
+    count, oldest = OutboxRepository(db).backlog(shard)
+    db.commit()
+    label = str(shard) if shard is not None else "all"
+    OUTBOX_BACKLOG.labels(label).set(count)
+    OUTBOX_OLDEST_NEW_AGE.labels(label).set((utcnow() - oldest).total_seconds() if oldest is not None else 0)
+
+
+def run_forever(shard: OutboxShard | None = None) -> None:
+    logger.info(
+        f"Outbox запущен. interval={settings.OUTBOX_POLL_INTERVAL}s batch={settings.OUTBOX_BATCH_SIZE} "
+        f"mode={settings.OUTBOX_PUBLISH_MODE} shard={shard or '-'}"
+    )
+
+    reported_at = 0.0
     while True:
         db = SessionLocal()
         try:
-            repo = OutboxRepository(db)
-            events = repo.fetch_batch_for_publish(limit=settings.OUTBOX_BATCH_SIZE)
-
-            if not events:
-                db.commit()
+            # backlog считается отдельным запросом не чаще OUTBOX_METRICS_INTERVAL, а не на каждый опрос
+            if time.monotonic() - reported_at >= settings.OUTBOX_METRICS_INTERVAL:
+                reported_at = time.monotonic()
+                report_backlog(db, shard)
+            promoted = promote_due(db)
+            if not run_once(db, shard) and not promoted:
                 time.sleep(settings.OUTBOX_POLL_INTERVAL)
-                continue
-
-            for ev in events:
-                try:
-                    publish(queue_name=ev.routing_key, payload=ev.payload)
-                    db.execute(
-                        update(OutboxEvent)
-                        .where(OutboxEvent.id == ev.id)
-                        .values(status=OutboxStatus.SENT, sent_at=utcnow(), last_error=None)
-                    )
-                    logger.info(f"Outbox отправил сообщение. outbox_id={ev.id} task_id={ev.task_id} queue={ev.routing_key}")
-                except Exception as exc:
-                    attempts = int(ev.attempts or 0) + 1
-                    next_at = utcnow() + _backoff(attempts)
-                    status = OutboxStatus.FAILED if attempts >= settings.OUTBOX_MAX_ATTEMPTS else OutboxStatus.NEW
-
-                    db.execute(
-                        update(OutboxEvent)
-                        .where(OutboxEvent.id == ev.id)
-                        .values(status=status, attempts=attempts, next_attempt_at=next_at, last_error=str(exc))
-                    )
-
-                    if status == OutboxStatus.FAILED:
-                        logger.exception(
-                            f"Outbox не смог отправить сообщение, попытки исчерпаны. outbox_id={ev.id} task_id={ev.task_id} queue={ev.routing_key} attempts={attempts}"
-                        )
-                    else:
-                        logger.exception(
-                            f"Outbox не смог отправить сообщение. outbox_id={ev.id} task_id={ev.task_id} queue={ev.routing_key} attempts={attempts} next={next_at.isoformat()}"
-                        )
-
-            db.commit()
-
         except Exception:
             db.rollback()
             logger.exception("Ошибка в цикле")
             time.sleep(1.0)
         finally:
-            db.close()
\ No newline at end of file
+            db.close()
@@ -1,12 +1,21 @@
+import argparse
 import logging
 
+from app.core.config import settings
+from app.core.metrics import start_metrics_server
+from app.repositories.outbox_repo import OutboxShard
 from app.workers.outbox_publisher import run_forever
 
 
 def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--shard", type=OutboxShard.parse, default=settings.OUTBOX_SHARD or None, help="Шард вида i/N: публиковать только события своей доли task_id")
+    args = ap.parse_args()
+
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
-    run_forever()
+    start_metrics_server()
+    run_forever(args.shard)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,87 @@
+import logging
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any
+
+import pika
+from sqlalchemy import inspect
+
+from app.db.models.task import Task
+from app.workers.consumer import _execute, on_message
+
+logger = logging.getLogger(__name__)
+
+POOL_MODES = ("none", "thread", "process")
+
+
+def pool_concurrency(value: int) -> int:
+    return value if value > 0 else (os.cpu_count() or 1)
+
+
+def task_values(task: Task) -> dict[str, Any]:
+    # в дочерний процесс уходят только значения колонок, без состояния сессии и связей ORM
+    return {attr.key: getattr(task, attr.key) for attr in inspect(Task).column_attrs}
+
+
+def _execute_values(values: dict[str, Any]) -> str:
+    # выполняется в дочернем процессе: обработчик получает отдельный Task, не привязанный к сессии
+    return _execute(Task(**values))
+
+
+# BlockingChannel не потокобезопасен: publish/ack из потоков пула выполняются в потоке соединения
+class ThreadsafeChannel:
+    def __init__(self, connection, channel) -> None:
+        self._connection = connection
+        self._channel = channel
+
+    def basic_publish(self, exchange, routing_key, body, properties=None) -> None:
+        self._connection.add_callback_threadsafe(
+            partial(self._channel.basic_publish, exchange=exchange, routing_key=routing_key, body=body, properties=properties)
+        )
+
+    def basic_ack(self, delivery_tag, multiple=False) -> None:
+        self._connection.add_callback_threadsafe(partial(self._channel.basic_ack, delivery_tag, multiple=multiple))
+
+
+class PooledConsumer:
+    def __init__(self, connection, channel, *, mode: str, concurrency: int) -> None:
+        if mode not in ("thread", "process"):
+            raise ValueError(f"pool mode must be thread or process, got {mode!r}")
+        self._channel = ThreadsafeChannel(connection, channel)
+        self._concurrency = concurrency
+        self._inflight = 0
+        self._lock = threading.Lock()
+        self._threads = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="task")
+        self._processes = None
+        if mode == "process":
+            self._processes = ProcessPoolExecutor(max_workers=concurrency, mp_context=mp.get_context("spawn"))
+
+    @property
+    def free_slots(self) -> int:
+        with self._lock:
+            return self._concurrency - self._inflight
+
+    def on_message(self, channel, method, props: pika.BasicProperties, body: bytes) -> None:
+        with self._lock:
+            self._inflight += 1
+        self._threads.submit(self._handle, method, props, body)
+
+    def _handle(self, method, props: pika.BasicProperties, body: bytes) -> None:
+        try:
+            on_message(self._channel, method, props, body, execute=self._execute if self._processes else None)
+        except Exception:
+            logger.exception(f"Ошибка обработки в пуле. delivery_tag={getattr(method, 'delivery_tag', None)}")
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+    def _execute(self, task: Task) -> str:
+        return self._processes.submit(_execute_values, task_values(task)).result()
+
+    def shutdown(self) -> None:
+        self._threads.shutdown(wait=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=True)
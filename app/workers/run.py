@@ -4,7 +4,12 @@ import time
 import pika
 
 from app.core.config import settings
-from app.workers.consumer import _declare, on_message
+from app.core.metrics import start_metrics_server
+from app.utils.compression import compress
+from app.workers.batch_consumer import BatchConsumer
+from app.workers.consumer import _base_queues, _declare, _worker_queues, on_message
+from app.workers.pool import POOL_MODES, PooledConsumer, pool_concurrency
+from app.workers.scheduler import PRIORITIES, PriorityScheduler, parse_weights
 
 logger = logging.getLogger(__name__)
 
@@ -23,31 +28,79 @@ def _connect() -> pika.BlockingConnection:
 def main() -> None:
     logging.basicConfig(
         level=getattr(logging, str(getattr(settings, "LOG_LEVEL", "INFO")).upper(), logging.INFO), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    # недоступное сжатие иначе проявится только на первом большом результате: задача выполнится и уйдет в FAILED
+    compress(b"", settings.TASK_RESULT_COMPRESSION)
+    start_metrics_server()
     conn = _connect()
     ch = conn.channel()
 
     _declare(ch)
 
-    prefetch = settings.WORKER_PREFETCH
+    batch_size = settings.WORKER_BATCH_SIZE
+    pool_mode = settings.WORKER_POOL
+    if pool_mode not in POOL_MODES:
+        raise ValueError(f"WORKER_POOL must be one of {POOL_MODES}")
+    if pool_mode != "none" and batch_size > 1:
+        # ack multiple из параллельных пачек подтвердил бы чужие, еще не обработанные доставки
+        raise ValueError("WORKER_POOL нельзя совмещать с WORKER_BATCH_SIZE > 1")
+    weights = parse_weights(settings.WORKER_SCHEDULER_WEIGHTS) if settings.WORKER_SCHEDULER_WEIGHTS else None
+    if weights and batch_size > 1:
+        raise ValueError("WORKER_SCHEDULER_WEIGHTS нельзя совмещать с WORKER_BATCH_SIZE > 1")
+    concurrency = pool_concurrency(settings.WORKER_CONCURRENCY) if pool_mode != "none" else 1
+
+    # пачка не наберется, если брокер отдает меньше сообщений, чем ее размер; пул простаивает при prefetch меньше потоков
+    prefetch = max(settings.WORKER_PREFETCH, batch_size, concurrency)
+    if weights:
+        # prefetch действует на каждого consumer'а: буфер приоритета должен вмещать его долю за цикл весов
+        prefetch = max(prefetch, sum(weights.values()))
     ch.basic_qos(prefetch_count=prefetch)
 
-    if settings.WORKER_QUEUES:
-        queues = [q.strip() for q in settings.WORKER_QUEUES.split(",") if q.strip()]
-    else:
-        queues = [settings.TASKS_QUEUE_HIGH, settings.TASKS_QUEUE_MEDIUM, settings.TASKS_QUEUE_LOW]
+    callback = on_message
+    pooled = None
+    if batch_size > 1:
+        callback = BatchConsumer(conn, ch, size=batch_size, wait_ms=settings.WORKER_BATCH_WAIT_MS).on_message
+    elif pool_mode != "none":
+        pooled = PooledConsumer(conn, ch, mode=pool_mode, concurrency=concurrency)
+        callback = pooled.on_message
 
-    logger.info(f"Воркер запущен. prefetch={prefetch} queues={queues}")
+    # в режиме планировщика воркер слушает все три очереди, WORKER_QUEUES не используется
+    queues = list(_base_queues()) if weights else _worker_queues()
 
-    for q in queues:
-        ch.basic_consume(queue=q, on_message_callback=on_message, auto_ack=False)
+    logger.info(
+        f"Воркер запущен. prefetch={prefetch} batch={batch_size} wait={settings.WORKER_BATCH_WAIT_MS}ms "
+        f"pool={pool_mode} concurrency={concurrency} scheduler={settings.WORKER_SCHEDULER_WEIGHTS or '-'} queues={queues}"
+    )
+
+    scheduler = None
+    if weights:
+        scheduler = PriorityScheduler(
+            conn,
+            ch,
+            queues=dict(zip(PRIORITIES, queues)),
+            weights=weights,
+            dispatch=callback,
+            capacity=(lambda: pooled.free_slots) if pooled is not None else (lambda: 1),
+            stats_interval=settings.WORKER_SCHEDULER_STATS_INTERVAL,
+        )
+        scheduler.consume()
+    else:
+        for q in queues:
+            ch.basic_consume(queue=q, on_message_callback=callback, auto_ack=False)
 
     try:
-        ch.start_consuming()
+        if scheduler is not None:
+            scheduler.run_forever()
+        else:
+            ch.start_consuming()
     finally:
         try:
             ch.stop_consuming()
         except Exception:
             pass
+        if pooled is not None:
+            # дожидаемся задач в пуле и отправляем их ack/publish до закрытия соединения
+            pooled.shutdown()
+            conn.process_data_events(time_limit=0)
         conn.close()
 
 
@@ -0,0 +1,139 @@
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable
+
+import pika
+
+from app.core.enums import Priority
+from app.core.metrics import WORKER_QUEUE_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = (Priority.HIGH, Priority.MEDIUM, Priority.LOW)
+
+
+def parse_weights(value: str) -> dict[Priority, int]:
+    parts = [p.strip() for p in value.split(",") if p.strip()]
+    if len(parts) != len(PRIORITIES):
+        raise ValueError("scheduler weights must be three comma separated integers: high,medium,low")
+    weights = dict(zip(PRIORITIES, (int(p) for p in parts)))
+    if any(w < 1 for w in weights.values()):
+        raise ValueError("scheduler weights must be positive")
+    return weights
+
+
+class SmoothWeightedRoundRobin:
+    # smooth WRR (как в nginx): 6:3:1 дает H M H H M H L H M H без серий одного приоритета;
+    # в выборе участвуют только непустые очереди, поэтому простаивающий приоритет не копит кредит
+    def __init__(self, weights: dict[Priority, int]) -> None:
+        self._weights = weights
+        self._current = {p: 0 for p in weights}
+
+    def pick(self, ready: list[Priority]) -> Priority | None:
+        if not ready:
+            return None
+        total = 0
+        for p in ready:
+            self._current[p] += self._weights[p]
+            total += self._weights[p]
+        best = max(ready, key=lambda p: self._current[p])
+        self._current[best] -= total
+        return best
+
+
+@dataclass
+class WaitStats:
+    samples: deque = field(default_factory=lambda: deque(maxlen=1000))
+    dispatched: int = 0
+    max_ms: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.samples.append(ms)
+        self.dispatched += 1
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+    def __str__(self) -> str:
+        return f"dispatched={self.dispatched} wait_p50={self.percentile(50):.1f}ms wait_p99={self.percentile(99):.1f}ms wait_max={self.max_ms:.1f}ms"
+
+
+class PriorityScheduler:
+    def __init__(
+        self,
+        connection,
+        channel,
+        *,
+        queues: dict[Priority, str],
+        weights: dict[Priority, int],
+        dispatch: Callable,
+        capacity: Callable[[], int] = lambda: 1,
+        stats_interval: float = 30.0,
+    ) -> None:
+        self._connection = connection
+        self._channel = channel
+        self._queues = queues
+        self._dispatch = dispatch
+        self._capacity = capacity
+        self._wrr = SmoothWeightedRoundRobin(weights)
+        self._buffers: dict[Priority, deque] = {p: deque() for p in queues}
+        self.stats: dict[Priority, WaitStats] = {p: WaitStats() for p in queues}
+        self._stats_interval = stats_interval
+        self._stats_at = time.monotonic()
+
+    def consume(self) -> None:
+        for priority, queue in self._queues.items():
+            self._channel.basic_consume(queue=queue, on_message_callback=partial(self._enqueue, priority), auto_ack=False)
+
+    def _enqueue(self, priority: Priority, channel, method, props: pika.BasicProperties, body: bytes) -> None:
+        self._buffers[priority].append((time.monotonic(), method, props, body))
+
+    def dispatch_ready(self) -> int:
+        # слоты считаются один раз: без пула это одна задача, после нее снова забираем новые доставки из сокета
+        dispatched = 0
+        for _ in range(self._capacity()):
+            priority = self._wrr.pick([p for p, buf in self._buffers.items() if buf])
+            if priority is None:
+                break
+            enqueued, method, props, body = self._buffers[priority].popleft()
+            waited = time.monotonic() - enqueued
+            WORKER_QUEUE_WAIT_SECONDS.labels(priority.value).observe(waited)
+            self.stats[priority].observe(waited)
+            self._dispatch(self._channel, method, props, body)
+            dispatched += 1
+        return dispatched
+
+    def run_once(self) -> None:
+        # без очереди ждем доставку до секунды; с очередью, но без свободного слота - коротко ждем ack из пула
+        if not any(self._buffers.values()):
+            time_limit = 1.0
+        elif self._capacity() > 0:
+            time_limit = 0
+        else:
+            time_limit = 0.05
+        self._connection.process_data_events(time_limit=time_limit)
+        self.dispatch_ready()
+        self._log_stats()
+
+    def run_forever(self) -> None:
+        while True:
+            self.run_once()
+
+    def _log_stats(self) -> None:
+        now = time.monotonic()
+        if now - self._stats_at < self._stats_interval:
+            return
+        self._stats_at = now
+        logger.info(
+            "Планировщик: " + " | ".join(
+                f"{p.value.lower()} {self.stats[p]} buffered={len(self._buffers[p])}" for p in self._queues
+            )
+        )
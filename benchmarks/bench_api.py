@@ -0,0 +1,70 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.api.responses import ORJSONResponse, orm_rows
+from app.core.config import settings
+from app.core.enums import Priority, TaskStatus
+from app.db.models.outbox import OutboxEvent
+from app.db.models.task import Task
+from app.schemas.tasks import TaskRead
+from app.services.task_service import TaskService
+
+
+@pytest.fixture(scope="module")
+def pg():
+    engine = create_engine(settings.db_url)
+    try:
+        with engine.connect():
+            pass
+    except OperationalError as e:
+        pytest.skip(f"Postgres недоступен: {e}")
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    title = f"bench-suite-{uuid.uuid4().hex[:8]}"
+    yield factory, title
+    with factory() as db:
+        task_ids = select(Task.id).where(Task.title == title)
+        db.execute(delete(OutboxEvent).where(OutboxEvent.task_id.in_(task_ids)))
+        db.execute(delete(Task).where(Task.title == title))
+        db.commit()
+    engine.dispose()
+
+
+def bench_task_service_create_task(bench, pg):
+    factory, title = pg
+    with factory() as db:
+        svc = TaskService(db)
+        bench(lambda: svc.create_task(title=title, description=None, priority=Priority.MEDIUM), number=50)
+
+
+def bench_task_service_list_tasks(bench, pg):
+    factory, title = pg
+    with factory() as db:
+        db.execute(insert(Task), [{"title": title, "priority": Priority.LOW, "status": TaskStatus.COMPLETED, "result_inline": "OK", "attempts": 0}] * 1000)
+        db.commit()
+        svc = TaskService(db)
+
+        def page() -> None:
+            svc.list_tasks(limit=100, offset=0, status=TaskStatus.COMPLETED, priority=Priority.LOW)
+            # без identity map каждая итерация строит объекты заново, как новый запрос API
+            db.expunge_all()
+
+        bench(page, number=10)
+
+
+def bench_task_read_page_100(bench):
+    now = datetime.now(timezone.utc)
+    tasks = [
+        Task(
+            id=uuid.uuid4(), title=f"task {i}", description="d" * 64, type="default", priority=Priority.MEDIUM,
+            status=TaskStatus.COMPLETED, created_at=now, run_at=None, attempts=0, started_at=now, finished_at=now,
+            result_inline="OK", error=None,
+        )
+        for i in range(100)
+    ]
+    # тот же путь, что у GET /api/v1/tasks
+    bench(lambda: ORJSONResponse({"items": orm_rows(tasks, TaskRead), "limit": 100, "offset": 0, "next_cursor": None}).body, number=100)
@@ -0,0 +1,36 @@
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.core.enums import Priority
+from app.messaging import rabbitmq
+from app.messaging.codec import JSON, MSGPACK
+from app.messaging.rabbitmq import RabbitMQPublisher
+from app.services.publisher import TaskPublisher
+
+
+class Channel:
+    is_open = True
+    def queue_declare(self, queue, durable): pass
+    def basic_publish(self, exchange, routing_key, body, properties=None): pass
+
+
+class Connection:
+    is_open = True
+    def channel(self): return Channel()
+    def process_data_events(self, time_limit=0): pass
+    def close(self): pass
+
+
+@pytest.mark.parametrize("content_type", [JSON, MSGPACK])
+def bench_rabbitmq_publish(bench, monkeypatch, content_type):
+    monkeypatch.setattr(settings, "RABBITMQ_ENABLED", True)
+    monkeypatch.setattr(settings, "RABBITMQ_CONTENT_TYPE", content_type)
+    monkeypatch.setattr(rabbitmq, "_connect", Connection)
+    routing_key, payload = TaskPublisher().build_task_created(uuid.uuid4(), Priority.HIGH)
+    publisher = RabbitMQPublisher(pool_size=1)
+    try:
+        bench(lambda: publisher.publish(queue_name=routing_key, payload=payload), number=1000)
+    finally:
+        publisher.close()
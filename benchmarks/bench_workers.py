@@ -0,0 +1,87 @@
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.enums import OutboxStatus, Priority, TaskStatus
+from app.db.base import Base
+from app.db.models.outbox import OutboxEvent, outbox_shard_bucket
+from app.db.models.task import Task
+from app.repositories.outbox_repo import utcnow
+from app.workers import consumer, outbox_publisher
+
+
+@compiles(UUID, "sqlite")
+def _uuid_sqlite(type_, compiler, **kw) -> str:
+    # тип UUID в sqlite получает NUMERIC affinity: hex из цифр с одной "e" читается обратно как float
+    return "CHAR(32)"
+
+
+class Channel:
+    def basic_publish(self, exchange, routing_key, body, properties=None): pass
+    def basic_ack(self, delivery_tag): pass
+
+
+class Method:
+    delivery_tag = 1
+    routing_key = "tasks.high"
+
+
+class Props:
+    headers = {}
+    content_type = "application/json"
+
+
+@pytest.fixture
+def session_factory():
+    # sqlite в памяти: измеряется код воркера, а не сеть до БД
+    engine = create_engine("sqlite+pysqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def bench_consumer_on_message(bench, monkeypatch, session_factory):
+    number = 100
+    ids = [uuid4() for _ in range(number * bench.rounds)]
+    with session_factory() as db:
+        db.execute(insert(Task), [{"id": x, "title": "t", "priority": Priority.HIGH, "status": TaskStatus.PENDING, "attempts": 0} for x in ids])
+        db.commit()
+    monkeypatch.setattr(consumer, "SessionLocal", session_factory)
+    monkeypatch.setattr(consumer, "_execute", lambda task: "OK")
+
+    bodies = iter([f'{{"task_id": "{x}"}}'.encode() for x in ids])
+    channel, method, props = Channel(), Method(), Props()
+    bench(lambda: consumer.on_message(channel, method, props, next(bodies)), number=number)
+
+
+def bench_outbox_run_once_batch(bench, monkeypatch, session_factory):
+    number, size = 5, 100
+    monkeypatch.setattr(settings, "OUTBOX_PUBLISH_MODE", "batch")
+    monkeypatch.setattr(settings, "OUTBOX_BATCH_SIZE", size)
+    monkeypatch.setattr(outbox_publisher, "publish_batch", lambda messages: None)
+    past = utcnow() - timedelta(seconds=1)
+    rows = []
+    for _ in range(number * bench.rounds * size):
+        task_id = uuid4()
+        rows.append(
+            {
+                "id": uuid4(), "task_id": task_id, "shard_bucket": outbox_shard_bucket(task_id), "routing_key": "tasks.high",
+                "payload": {"task_id": str(task_id)}, "status": OutboxStatus.NEW, "attempts": 0, "next_attempt_at": past,
+                "created_at": past,
+            }
+        )
+    with session_factory() as db:
+        db.execute(insert(OutboxEvent), rows)
+        db.commit()
+
+    def run_once() -> None:
+        with session_factory() as db:
+            assert outbox_publisher.run_once(db) == size
+
+    bench(run_once, number=number)
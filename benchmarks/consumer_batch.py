@@ -0,0 +1,75 @@
+import argparse
+import json
+import time
+import uuid
+from types import SimpleNamespace
+
+from sqlalchemy import text
+
+from app.db.session import SessionLocal
+from app.workers.batch_consumer import Delivery, process_batch
+from app.workers.consumer import on_message
+
+
+SEED_SQL = text(
+    """
+    INSERT INTO tasks (id, title, priority, status)
+    SELECT gen_random_uuid(), :title, 'MEDIUM', 'PENDING' FROM generate_series(1, :n)
+    RETURNING id
+    """
+)
+
+
+class _Channel:
+    def __init__(self) -> None:
+        self.acked = 0
+
+    def basic_publish(self, exchange, routing_key, body, properties=None) -> None:
+        pass
+
+    def basic_ack(self, delivery_tag, multiple=False) -> None:
+        self.acked += 1
+
+
+def _seed(n: int, title: str) -> list[tuple]:
+    with SessionLocal() as db:
+        db.execute(text("DELETE FROM tasks WHERE title = :title"), {"title": title})
+        ids = list(db.execute(SEED_SQL, {"n": n, "title": title}).scalars())
+        db.commit()
+    return [
+        (SimpleNamespace(delivery_tag=i + 1, routing_key="tasks.medium"), SimpleNamespace(headers={}), json.dumps({"task_id": str(task_id)}).encode())
+        for i, task_id in enumerate(ids)
+    ]
+
+
+def _run(batch: int, messages: list[tuple]) -> tuple[float, int]:
+    ch = _Channel()
+    t0 = time.perf_counter()
+    if batch <= 1:
+        for method, props, body in messages:
+            on_message(ch, method, props, body)
+    else:
+        for i in range(0, len(messages), batch):
+            process_batch(ch, [Delivery(method=m, props=p, body=b) for m, p, b in messages[i:i + batch]])
+    return time.perf_counter() - t0, ch.acked
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Worker DB throughput: per-message vs batched claim/complete/ack. Use a scratch database.")
+    ap.add_argument("--messages", type=int, default=5000, help="Tasks seeded per run")
+    ap.add_argument("--batch", default="1,10,50,200", help="Comma separated batch sizes, 1 = per-message on_message")
+    ap.add_argument("--title", default=f"bench-{uuid.uuid4().hex[:8]}", help="Title of seeded tasks")
+    args = ap.parse_args()
+
+    for batch in [int(x) for x in args.batch.split(",") if x.strip()]:
+        messages = _seed(args.messages, args.title)
+        dt, acks = _run(batch, messages)
+        print(f"batch={batch:<4} messages={len(messages)} in {dt:.2f}s rate={len(messages) / dt:.0f} msg/s acks={acks}")
+
+    with SessionLocal() as db:
+        db.execute(text("DELETE FROM tasks WHERE title = :title"), {"title": args.title})
+        db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import statistics
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.db.session import SessionLocal
+from app.main import create_app
+
+
+SEED_SQL = text(
+    """
+    INSERT INTO tasks (id, title, description, priority, status, result, created_at, finished_at)
+    SELECT gen_random_uuid(), :title, repeat('d', :desc_size), 'MEDIUM', 'COMPLETED', repeat('r', :result_size),
+           now() - (g || ' ms')::interval, now()
+    FROM generate_series(1, :n) g
+    """
+)
+
+
+def _measure(client: TestClient, params: dict, requests: int) -> tuple[float, float, int]:
+    timings = []
+    size = 0
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        resp = client.get("/api/v1/tasks", params=params)
+        timings.append((time.perf_counter() - t0) * 1000)
+        resp.raise_for_status()
+        size = len(resp.content)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1], size
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="GET /tasks full rows vs fields= projection on pages with large results. Use a scratch database.")
+    ap.add_argument("--tasks", type=int, default=1000, help="Tasks seeded")
+    ap.add_argument("--result-size", type=int, default=20000, help="Bytes in result of each task")
+    ap.add_argument("--desc-size", type=int, default=2000, help="Bytes in description of each task")
+    ap.add_argument("--requests", type=int, default=50, help="Requests per variant")
+    ap.add_argument("--fields", default="id,title,status,created_at,finished_at", help="Projection to compare with full rows")
+    args = ap.parse_args()
+
+    title = f"bench-{uuid.uuid4().hex[:8]}"
+    with SessionLocal() as db:
+        db.execute(SEED_SQL, {"title": title, "n": args.tasks, "result_size": args.result_size, "desc_size": args.desc_size})
+        db.commit()
+
+    try:
+        with TestClient(create_app(async_db=False)) as client:
+            base = {"limit": 100, "status": "COMPLETED"}
+            _measure(client, base, 3)
+            for name, params in (("full", base), (f"fields={args.fields}", {**base, "fields": args.fields})):
+                p50, p95, size = _measure(client, params, args.requests)
+                print(f"{name:<50} p50={p50:.1f}ms p95={p95:.1f}ms body={size / 1024:.1f}KiB")
+    finally:
+        with SessionLocal() as db:
+            db.execute(text("DELETE FROM tasks WHERE title = :title"), {"title": title})
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
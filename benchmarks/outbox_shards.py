@@ -0,0 +1,83 @@
+import argparse
+import multiprocessing as mp
+import time
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.repositories.outbox_repo import OutboxShard
+from app.workers.outbox_publisher import run_once
+
+
+SEED_SQL = text(
+    """
+    INSERT INTO outbox_events (id, task_id, shard_bucket, routing_key, payload)
+    SELECT gen_random_uuid(), t.id,
+           (('x' || substr(md5(uuid_send(t.id)), 1, 8))::bit(32)::bigint % 1024)::smallint,
+           :routing_key, '{}'::jsonb
+    FROM (SELECT gen_random_uuid() AS id FROM generate_series(1, :n)) t
+    """
+)
+
+
+def _seed(n: int, routing_key: str) -> None:
+    with SessionLocal() as db:
+        db.execute(text("DELETE FROM outbox_events WHERE routing_key = :routing_key"), {"routing_key": routing_key})
+        db.execute(SEED_SQL, {"n": n, "routing_key": routing_key})
+        db.commit()
+
+
+def _drain(shard: str | None, start, done) -> None:
+    engine.dispose(close=False)
+    start.wait()
+    parsed = OutboxShard.parse(shard) if shard else None
+    sent = 0
+    while True:
+        with SessionLocal() as db:
+            n = run_once(db, parsed)
+        if not n:
+            break
+        sent += n
+    done.put(sent)
+
+
+def _run(workers: int, sharded: bool, n: int, routing_key: str) -> tuple[float, int]:
+    _seed(n, routing_key)
+    start, done = mp.Event(), mp.Queue()
+    procs = [
+        mp.Process(target=_drain, args=(f"{i}/{workers}" if sharded else None, start, done))
+        for i in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    time.sleep(0.5)
+
+    t0 = time.perf_counter()
+    start.set()
+    total = sum(done.get() for _ in procs)
+    dt = time.perf_counter() - t0
+    for p in procs:
+        p.join()
+    return dt, total
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Outbox publisher scaling: sharded vs competing runners. Use a scratch database.")
+    ap.add_argument("--events", type=int, default=50_000, help="Events seeded per run")
+    ap.add_argument("--workers", default="1,2,4,8", help="Comma separated runner counts")
+    ap.add_argument("--routing-key", default="outbox.bench", help="Routing key of seeded events")
+    ap.add_argument("--competing", action="store_true", help="Also run unsharded runners competing via SKIP LOCKED")
+    args = ap.parse_args()
+
+    print(f"events={args.events} batch={settings.OUTBOX_BATCH_SIZE} mode={settings.OUTBOX_PUBLISH_MODE} rabbitmq={settings.RABBITMQ_ENABLED}")
+    for workers in [int(x) for x in args.workers.split(",") if x.strip()]:
+        modes = [True, False] if args.competing and workers > 1 else [True]
+        for sharded in modes:
+            dt, total = _run(workers, sharded, args.events, args.routing_key)
+            label = "sharded" if sharded else "competing"
+            print(f"workers={workers} {label:<9} sent={total} in {dt:.2f}s rate={total / dt:.0f} events/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import threading
+import time
+
+from app.core.config import settings
+from app.messaging import rabbitmq
+from app.messaging.rabbitmq import QUEUES, RabbitMQPublisher
+
+
+class _SimChannel:
+    def __init__(self, rtt: float) -> None:
+        self.is_open = True
+        self._rtt = rtt
+
+    def basic_publish(self, exchange, routing_key, body, properties=None) -> None:
+        time.sleep(self._rtt)
+
+    def tx_commit(self) -> None:
+        time.sleep(self._rtt)
+
+    def confirm_delivery(self) -> None: pass
+    def queue_declare(self, queue, durable) -> None: pass
+    def tx_select(self) -> None: pass
+
+
+class _SimConnection:
+    def __init__(self, rtt: float) -> None:
+        self.is_open = True
+        self._rtt = rtt
+
+    def channel(self) -> _SimChannel:
+        return _SimChannel(self._rtt)
+
+    def process_data_events(self, time_limit=0) -> None: pass
+
+    def close(self) -> None:
+        self.is_open = False
+
+
+def _run(pool_size: int, threads: int, messages: int, batch: int) -> float:
+    publisher = RabbitMQPublisher(pool_size=pool_size)
+    payload = {"task_id": "00000000-0000-0000-0000-000000000000", "priority": "MEDIUM"}
+    per_thread = messages // threads
+    # прогрев: соединения открываются лениво и не должны попадать в замер
+    for _ in range(pool_size):
+        publisher.publish(queue_name=QUEUES.medium, payload=payload)
+
+    def worker() -> None:
+        if batch <= 1:
+            for _ in range(per_thread):
+                publisher.publish(queue_name=QUEUES.medium, payload=payload)
+        else:
+            for _ in range(0, per_thread, batch):
+                publisher.publish_batch([(QUEUES.medium, payload)] * batch)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    t0 = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    dt = time.perf_counter() - t0
+    publisher.close()
+    return per_thread * threads / dt
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Multi-threaded publish throughput by channel pool size. Needs RabbitMQ unless --simulate-rtt-ms is set.")
+    ap.add_argument("--messages", type=int, default=20000, help="Messages per run, split between threads")
+    ap.add_argument("--threads", default="1,4,16", help="Comma separated publisher thread counts")
+    ap.add_argument("--pool", default="1,4,8", help="Comma separated pool sizes, 1 = single shared connection")
+    ap.add_argument("--batch", type=int, default=1, help="Messages per publish_batch call, 1 = publish()")
+    ap.add_argument("--confirms", action="store_true", help="Enable publisher confirms on pooled channels")
+    ap.add_argument("--simulate-rtt-ms", type=float, default=0.0, help="Replace the broker with a fake connection that sleeps per call")
+    args = ap.parse_args()
+
+    settings.RABBITMQ_ENABLED = True
+    settings.RABBITMQ_PUBLISH_CONFIRMS = args.confirms
+    if args.simulate_rtt_ms:
+        rtt = args.simulate_rtt_ms / 1000
+        rabbitmq._connect = lambda: _SimConnection(rtt)
+
+    for threads in [int(x) for x in args.threads.split(",") if x.strip()]:
+        for pool_size in [int(x) for x in args.pool.split(",") if x.strip()]:
+            rate = _run(pool_size, threads, args.messages, args.batch)
+            print(f"threads={threads:<3} pool={pool_size:<3} batch={args.batch:<4} rate={rate:.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import json
+import timeit
+import uuid
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+
+from app.api.responses import ORJSONResponse, orm_rows
+from app.core.enums import Priority, TaskStatus
+from app.db.models.task import Task
+from app.messaging.codec import CODECS
+from app.schemas.tasks import TaskListRead, TaskRead
+from app.services.publisher import TaskPublisher
+
+
+def _bench(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e6
+
+
+def _messages(number: int) -> None:
+    _, payload = TaskPublisher().build_task_created(uuid.uuid4(), Priority.MEDIUM)
+    stdlib = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    print(f"stdlib json          size={len(stdlib):<4} encode={_bench(lambda: json.dumps(payload, ensure_ascii=False).encode('utf-8'), number):.2f}us "
+          f"decode={_bench(lambda: json.loads(stdlib.decode('utf-8')), number):.2f}us")
+    for content_type, codec in CODECS.items():
+        body = codec.encode(payload)
+        print(f"{content_type:<20} size={len(body):<4} encode={_bench(lambda: codec.encode(payload), number):.2f}us "
+              f"decode={_bench(lambda: codec.decode(body), number):.2f}us")
+
+
+def _list_endpoint(rows: int, number: int) -> None:
+    now = datetime.now(timezone.utc)
+    tasks = [
+        Task(
+            id=uuid.uuid4(), title=f"task {i}", description="d" * 64, type="default", priority=Priority.MEDIUM,
+            status=TaskStatus.COMPLETED, created_at=now, run_at=None, attempts=0, started_at=now, finished_at=now,
+            result_inline="OK", error=None,
+        )
+        for i in range(rows)
+    ]
+
+    def models() -> TaskListRead:
+        return TaskListRead(items=[TaskRead.model_validate(x) for x in tasks], limit=rows, offset=0, next_cursor=None)
+
+    def jsonable() -> bytes:
+        # путь FastAPI 0.127 для response_model: модели -> jsonable_encoder -> json.dumps
+        return json.dumps(jsonable_encoder(models()), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def pydantic_json() -> bytes:
+        return models().model_dump_json().encode()
+
+    def orjson_rows() -> bytes:
+        return ORJSONResponse({"items": orm_rows(tasks, TaskRead), "limit": rows, "offset": 0, "next_cursor": None}).body
+
+    for name, fn in (("models+jsonable+json", jsonable), ("models+dump_json", pydantic_json), ("orm_rows+orjson", orjson_rows)):
+        print(f"list rows={rows:<4} {name:<22} {_bench(fn, number):.0f}us")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Serialization microbenchmarks: message codecs and list endpoint bodies. No DB or broker needed.")
+    ap.add_argument("--rows", default="20,100", help="Comma separated list page sizes")
+    ap.add_argument("--number", type=int, default=2000, help="Iterations per measurement")
+    args = ap.parse_args()
+
+    _messages(args.number * 10)
+    for rows in [int(x) for x in args.rows.split(",") if x.strip()]:
+        _list_endpoint(rows, max(1, args.number // rows))
+
+
+if __name__ == "__main__":
+    main()
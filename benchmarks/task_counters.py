@@ -0,0 +1,77 @@
+import argparse
+import statistics
+import time
+import uuid
+
+from sqlalchemy import text
+
+from app.db.session import SessionLocal
+from app.repositories.task_repo import TaskRepository
+
+
+SEED_SQL = text(
+    """
+    INSERT INTO tasks (id, title, priority, status, created_at)
+    SELECT gen_random_uuid(), :title,
+           (ARRAY['LOW', 'MEDIUM', 'HIGH'])[1 + g % 3]::task_priority,
+           (ARRAY['PENDING', 'IN_PROGRESS', 'COMPLETED', 'FAILED'])[1 + g % 4]::task_status,
+           now()
+    FROM generate_series(1, :n) g
+    """
+)
+GROUP_BY_SQL = text("SELECT status, priority, count(*) FROM tasks GROUP BY status, priority")
+
+
+def _p50(fn, requests: int) -> float:
+    timings = []
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings)
+
+
+def _insert_ms(title: str, rows: int, triggers: bool) -> float:
+    # вставка откатывается, таблица не растет между прогонами
+    with SessionLocal() as db:
+        if not triggers:
+            db.execute(text("ALTER TABLE tasks DISABLE TRIGGER USER"))
+        t0 = time.perf_counter()
+        db.execute(SEED_SQL, {"title": title, "n": rows})
+        elapsed = (time.perf_counter() - t0) * 1000
+        db.rollback()
+    return elapsed
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Task counters: /tasks/stats read vs count(*) GROUP BY, and trigger cost on inserts. Use a scratch database.")
+    ap.add_argument("--tasks", type=int, default=200_000, help="Tasks seeded")
+    ap.add_argument("--requests", type=int, default=20, help="Reads per variant")
+    ap.add_argument("--insert-rows", default="1,100,10000", help="Comma separated insert sizes for trigger overhead")
+    args = ap.parse_args()
+
+    title = f"bench-{uuid.uuid4().hex[:8]}"
+    with SessionLocal() as db:
+        db.execute(SEED_SQL, {"title": title, "n": args.tasks})
+        db.commit()
+        db.execute(text("ANALYZE tasks"))
+        db.commit()
+
+    try:
+        with SessionLocal() as db:
+            repo = TaskRepository(db)
+            print(f"count(*) GROUP BY    p50={_p50(lambda: db.execute(GROUP_BY_SQL).all(), args.requests):.2f}ms")
+            print(f"task_counters        p50={_p50(repo.stats, args.requests):.2f}ms")
+
+        for rows in [int(x) for x in args.insert_rows.split(",") if x.strip()]:
+            off = statistics.median(_insert_ms(title, rows, False) for _ in range(5))
+            on = statistics.median(_insert_ms(title, rows, True) for _ in range(5))
+            print(f"insert rows={rows:<6} triggers off={off:.2f}ms on={on:.2f}ms")
+    finally:
+        with SessionLocal() as db:
+            db.execute(text("DELETE FROM tasks WHERE title = :title"), {"title": title})
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
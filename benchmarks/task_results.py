@@ -0,0 +1,110 @@
+import argparse
+import hashlib
+import statistics
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, text
+
+from app.core.config import settings
+from app.core.enums import Priority, TaskStatus
+from app.db.models.task import Task
+from app.db.session import SessionLocal
+from app.main import create_app
+from app.utils.compression import compress
+from app.workers import consumer
+
+
+def _payload(size: int) -> str:
+    # похоже на реальный вывод: повторяющаяся структура с уникальными значениями
+    lines, i = [], 0
+    while sum(map(len, lines)) < size:
+        lines.append(f'{{"row": {i}, "hash": "{hashlib.md5(str(i).encode()).hexdigest()}", "status": "ok"}}\n')
+        i += 1
+    return "".join(lines)[:size]
+
+
+def _p50(fn, requests: int) -> float:
+    timings = []
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings)
+
+
+def _seed(title: str, tasks: int, result: str, method: str | None) -> list[uuid.UUID]:
+    ids = [uuid.uuid4() for _ in range(tasks)]
+    rows = [{"id": x, "title": title, "priority": Priority.LOW, "status": TaskStatus.COMPLETED, "attempts": 0} for x in ids]
+    with SessionLocal() as db:
+        db.execute(insert(Task), rows)
+        for task_id in ids:
+            if method is None:
+                # как было до task_results: весь результат в строке tasks
+                db.execute(consumer._complete_stmt(task_id, result))
+            else:
+                settings.TASK_RESULT_COMPRESSION = method
+                for stmt in consumer._complete_stmts(task_id, result):
+                    db.execute(stmt)
+        db.commit()
+    return ids
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Task results inline in tasks vs compressed in task_results. Use a scratch database.")
+    ap.add_argument("--tasks", type=int, default=50, help="Tasks per variant")
+    ap.add_argument("--result-size", type=int, default=1_000_000, help="Bytes in result of each task")
+    ap.add_argument("--requests", type=int, default=50, help="Reads per measurement")
+    ap.add_argument("--methods", default="plain,zlib,zstd", help="Compression methods for task_results")
+    args = ap.parse_args()
+
+    result = _payload(args.result_size)
+    settings.TASK_RESULT_INLINE_MAX_BYTES = 0
+    title = f"bench-{uuid.uuid4().hex[:8]}"
+    variants: list[tuple[str, str | None]] = [("tasks.result", None)]
+    for method in [x.strip() for x in args.methods.split(",") if x.strip()]:
+        try:
+            compress(b"", method)
+        except ValueError as e:
+            print(f"skip {method}: {e}")
+            continue
+        variants.append((f"task_results/{method}", method))
+
+    try:
+        with TestClient(create_app(async_db=False)) as client:
+            for name, method in variants:
+                t0 = time.perf_counter()
+                ids = _seed(title, args.tasks, result, method)
+                write_ms = (time.perf_counter() - t0) * 1000 / args.tasks
+                task_id = ids[len(ids) // 2]
+
+                def orm_get() -> None:
+                    # как cancel_task и проверки статуса: ORM-объект без обращения к result
+                    with SessionLocal() as db:
+                        db.get(Task, task_id).status
+
+                get_ms = _p50(orm_get, args.requests)
+                api_ms = _p50(lambda: client.get(f"/api/v1/tasks/{task_id}").raise_for_status(), args.requests)
+                with SessionLocal() as db:
+                    size = db.execute(
+                        text(
+                            "SELECT coalesce(sum(pg_column_size(t.result)), 0) + coalesce(sum(pg_column_size(r.data)), 0) "
+                            "FROM tasks t LEFT JOIN task_results r ON r.task_id = t.id WHERE t.id = ANY(:ids)"
+                        ),
+                        {"ids": ids},
+                    ).scalar_one()
+                    db.execute(text("DELETE FROM tasks WHERE title = :title"), {"title": title})
+                    db.commit()
+                print(
+                    f"{name:<20} write={write_ms:.1f}ms/task orm_get p50={get_ms:.2f}ms "
+                    f"GET /tasks/id p50={api_ms:.1f}ms stored={size / args.tasks / 1024:.0f}KiB/task"
+                )
+    finally:
+        with SessionLocal() as db:
+            db.execute(text("DELETE FROM tasks WHERE title = :title"), {"title": title})
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,17 @@
 import argparse
 import asyncio
+import json
 import random
 import time
-from collections import Counter
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
 
 import httpx
 
 
 PRIORITIES = ["LOW", "MEDIUM", "HIGH"]
+OPERATIONS = ("create", "get", "list", "status", "cancel")
+PERCENTILES = (50, 90, 99, 99.9)
 
 
 def _make_payload(i: int) -> dict:
@@ -19,6 +23,36 @@ def _make_payload(i: int) -> dict:
     }
 
 
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def _percentiles_ms(values: list[float]) -> dict[str, float]:
+    # точные перцентили по всем замерам, без округления бакетов гистограммы
+    ordered = sorted(values)
+    result = {f"p{q:g}".replace(".", ""): round(_percentile(ordered, q) * 1000, 2) for q in PERCENTILES}
+    result["max"] = round(ordered[-1] * 1000, 2) if ordered else 0.0
+    return result
+
+
+def _parse_mix(value: str) -> tuple[list[str], list[float]]:
+    weights: dict[str, float] = {}
+    for part in value.split(","):
+        if not part.strip():
+            continue
+        op, _, weight = part.partition("=")
+        op = op.strip()
+        if op not in OPERATIONS:
+            raise SystemExit(f"unknown operation in --mix: {op}, expected one of {','.join(OPERATIONS)}")
+        weights[op] = float(weight or 1)
+    if not weights or sum(weights.values()) <= 0:
+        raise SystemExit("--mix must contain at least one operation with positive weight")
+    return list(weights), list(weights.values())
+
+
 async def _post_one(client: httpx.AsyncClient, url: str, i: int) -> tuple[int, str | None]:
     try:
         r = await client.post(url, json=_make_payload(i))
@@ -30,85 +64,277 @@ async def _post_one(client: httpx.AsyncClient, url: str, i: int) -> tuple[int, s
         return 0, None
 
 
-async def _get_status_one(client: httpx.AsyncClient, url: str, task_id: str) -> str | None:
+async def _post_batch(client: httpx.AsyncClient, url: str, start: int, size: int) -> tuple[int, list[str]]:
     try:
-        r = await client.get(url)
+        r = await client.post(url, json={"items": [_make_payload(start + i) for i in range(size)]})
         if r.status_code >= 400:
-            return None
-        data = r.json()
-        return data.get("status")
+            return r.status_code, []
+        return r.status_code, [x["id"] for x in r.json()]
+    except Exception:
+        return 0, []
+
+
+async def _get_statuses(client: httpx.AsyncClient, url: str, task_ids: list[str]) -> dict[str, str]:
+    try:
+        r = await client.post(url, json={"ids": task_ids})
+        if r.status_code >= 400:
+            return {}
+        return r.json()["statuses"]
     except Exception:
-        return None
+        return {}
+
+
+async def _request(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> int:
+    try:
+        return (await client.request(method, url, **kwargs)).status_code
+    except Exception:
+        return 0
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.codes: dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, op: str, seconds: float, code: int) -> None:
+        self.latencies[op].append(seconds)
+        self.codes[op][code] += 1
+
+    def summary(self, elapsed: float) -> dict[str, dict]:
+        return {
+            op: {
+                "count": len(values),
+                "errors": sum(v for k, v in self.codes[op].items() if k == 0 or k >= 500),
+                "rps": round(len(values) / elapsed, 1) if elapsed > 0 else 0.0,
+                "latency_ms": _percentiles_ms(values),
+                "codes": {str(k): v for k, v in sorted(self.codes[op].items())},
+            }
+            for op, values in sorted(self.latencies.items())
+        }
+
+
+class Operations:
+    def __init__(self, client: httpx.AsyncClient, base_url: str) -> None:
+        self._client = client
+        self._tasks_url = f"{base_url}/api/v1/tasks"
+        self.ids: list[str] = []
+        # задачи, которые еще не пытались отменить
+        self._cancellable: list[str] = []
+
+    async def run(self, op: str, i: int) -> tuple[str, int]:
+        # пока ни одной задачи не создано, операции над task_id заменяются на create
+        if op in ("get", "status", "cancel") and not (self._cancellable if op == "cancel" else self.ids):
+            op = "create"
+
+        if op == "create":
+            code, tid = await _post_one(self._client, self._tasks_url, i)
+            if tid:
+                self.ids.append(tid)
+                self._cancellable.append(tid)
+            return op, code
+        if op == "get":
+            return op, await _request(self._client, "GET", f"{self._tasks_url}/{random.choice(self.ids)}")
+        if op == "status":
+            return op, await _request(self._client, "GET", f"{self._tasks_url}/{random.choice(self.ids)}/status")
+        if op == "list":
+            return op, await _request(self._client, "GET", self._tasks_url, params={"limit": 20})
+        tid = self._cancellable.pop(random.randrange(len(self._cancellable)))
+        return op, await _request(self._client, "DELETE", f"{self._tasks_url}/{tid}")
+
+
+async def _closed_loop(ops: Operations, rec: Recorder, mix: tuple[list[str], list[float]], n: int, c: int) -> None:
+    sem = asyncio.Semaphore(c)
+
+    async def run_one(i: int) -> None:
+        async with sem:
+            started = time.perf_counter()
+            op, code = await ops.run(random.choices(*mix)[0], i)
+            rec.record(op, time.perf_counter() - started, code)
+
+    await asyncio.gather(*(run_one(i) for i in range(n)))
+
+
+async def _open_loop(ops: Operations, rec: Recorder, mix: tuple[list[str], list[float]], rate: float, duration: float) -> float:
+    # запросы отправляются по расписанию независимо от ответов; задержка считается от запланированного момента,
+    # поэтому ожидание свободного соединения и отставание генератора попадают в перцентили (coordinated omission)
+    start = time.perf_counter()
+    lag = 0.0
+    running: list[asyncio.Task] = []
+
+    async def fire(i: int, scheduled: float) -> None:
+        op, code = await ops.run(random.choices(*mix)[0], i)
+        rec.record(op, time.perf_counter() - scheduled, code)
+
+    for i in range(int(rate * duration)):
+        scheduled = start + i / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            lag = max(lag, -delay)
+        running.append(asyncio.create_task(fire(i, scheduled)))
+    await asyncio.gather(*running)
+    return lag
+
+
+def _parse_ts(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+async def _end_to_end(client: httpx.AsyncClient, tasks_url: str, task_ids: list[str], c: int) -> dict[str, dict]:
+    # серверные created_at/started_at/finished_at: ожидание в очереди, выполнение и полный путь create -> COMPLETED
+    sem = asyncio.Semaphore(c)
+    queue_wait, run, total = [], [], []
+
+    async def fetch(tid: str) -> None:
+        async with sem:
+            try:
+                r = await client.get(f"{tasks_url}/{tid}")
+                r.raise_for_status()
+                data = r.json()
+            except Exception:
+                return
+        created, started, finished = (_parse_ts(data.get(k)) for k in ("created_at", "started_at", "finished_at"))
+        if created and started and finished:
+            queue_wait.append((started - created).total_seconds())
+            run.append((finished - started).total_seconds())
+            total.append((finished - created).total_seconds())
+
+    await asyncio.gather(*(fetch(tid) for tid in task_ids))
+    return {
+        "count": len(total),
+        "queue_wait_ms": _percentiles_ms(queue_wait),
+        "run_ms": _percentiles_ms(run),
+        "total_ms": _percentiles_ms(total),
+    }
+
+
+def _print_summary(summary: dict[str, dict]) -> None:
+    for op, s in summary.items():
+        lat = " ".join(f"{k}={v:.1f}" for k, v in s["latency_ms"].items())
+        print(f"{op:<8} count={s['count']} errors={s['errors']} rps={s['rps']:.1f} latency ms: {lat} codes={s['codes']}")
 
 
 async def main() -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--base-url", default="http://localhost:8000", help="API base URL")
-    ap.add_argument("--n", type=int, default=1000, help="Number of tasks")
-    ap.add_argument("--c", type=int, default=50, help="Concurrency")
+    ap.add_argument("--n", type=int, default=1000, help="Number of tasks (operations with --mix) in closed-loop mode")
+    ap.add_argument("--c", type=int, default=50, help="Concurrency (closed-loop) or connection pool size (open-loop)")
     ap.add_argument("--timeout", type=float, default=10.0, help="HTTP timeout seconds")
+    ap.add_argument("--batch", type=int, default=0, help="Create tasks via POST /tasks:batch with this many items per request")
+    ap.add_argument("--rate", type=float, default=0.0, help="Open-loop: requests per second at a constant arrival rate, 0 - closed-loop")
+    ap.add_argument("--duration", type=float, default=30.0, help="Open-loop: seconds to generate load")
+    ap.add_argument("--mix", default="create=1", help="Weighted operations, e.g. create=4,get=3,list=1,status=3,cancel=1")
     ap.add_argument("--check", action="store_true", help="Poll statuses after creation")
     ap.add_argument("--check-interval", type=float, default=0.5, help="Seconds between polls")
     ap.add_argument("--check-timeout", type=float, default=30.0, help="Max seconds to wait for completion")
+    ap.add_argument("--status-batch", type=int, default=1000, help="Task ids per POST /tasks/status:batch request while polling")
+    ap.add_argument("--e2e-sample", type=int, default=1000, help="With --check: completed tasks fetched for create->COMPLETED latency")
+    ap.add_argument("--report", default=None, help="Write a JSON report to this path")
     args = ap.parse_args()
+    mix = _parse_mix(args.mix)
+    if args.batch > 0 and (args.rate > 0 or mix[0] != ["create"]):
+        raise SystemExit("--batch works only in closed-loop create mode")
 
-    create_url = f"{args.base_url}/api/v1/tasks"
-    status_url_tpl = f"{args.base_url}/api/v1/tasks/{{task_id}}/status"
+    tasks_url = f"{args.base_url}/api/v1/tasks"
+    batch_url = f"{args.base_url}/api/v1/tasks:batch"
+    statuses_url = f"{args.base_url}/api/v1/tasks/status:batch"
 
     limits = httpx.Limits(max_connections=args.c * 2, max_keepalive_connections=args.c)
     timeout = httpx.Timeout(args.timeout)
 
-    sem = asyncio.Semaphore(args.c)
-    ids: list[str] = []
-    codes = Counter()
+    rec = Recorder()
+    report: dict = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "mode": "open" if args.rate > 0 else "closed",
+        "args": vars(args),
+    }
 
     t0 = time.perf_counter()
     async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        ops = Operations(client, args.base_url)
+
+        async def run_batch(start: int) -> None:
+            started = time.perf_counter()
+            code, tids = await _post_batch(client, batch_url, start, min(args.batch, args.n - start))
+            rec.record("batch", time.perf_counter() - started, code)
+            ops.ids.extend(tids)
+
+        if args.batch > 0:
+            sem = asyncio.Semaphore(args.c)
 
-        async def run_one(i: int) -> None:
-            async with sem:
-                code, tid = await _post_one(client, create_url, i)
-                codes[code] += 1
-                if tid:
-                    ids.append(tid)
+            async def limited(start: int) -> None:
+                async with sem:
+                    await run_batch(start)
 
-        await asyncio.gather(*(run_one(i) for i in range(args.n)))
+            await asyncio.gather(*(limited(i) for i in range(0, args.n, args.batch)))
+        elif args.rate > 0:
+            report["max_schedule_lag_ms"] = round(await _open_loop(ops, rec, mix, args.rate, args.duration) * 1000, 2)
+        else:
+            await _closed_loop(ops, rec, mix, args.n, args.c)
 
     dt = time.perf_counter() - t0
-    ok = sum(v for k, v in codes.items() if k and k < 400)
+    ids = ops.ids
+    summary = rec.summary(dt)
+    ok = sum(v for s in summary.values() for k, v in s["codes"].items() if 0 < int(k) < 400)
     rps = ok / dt if dt > 0 else 0.0
+    tps = len(ids) / dt if dt > 0 else 0.0
 
-    print(f"created: {len(ids)}/{args.n} ok={ok} in {dt:.2f}s rps={rps:.1f}")
-    print("codes:", dict(codes))
+    print(f"created: {len(ids)} ok={ok} in {dt:.2f}s rps={rps:.1f} tasks/s={tps:.1f}")
+    _print_summary(summary)
+    if args.rate > 0:
+        print(f"open-loop: rate={args.rate:g}/s duration={args.duration:g}s max schedule lag={report['max_schedule_lag_ms']:.1f}ms")
+    report.update({"elapsed_s": round(dt, 3), "created": len(ids), "rps": round(rps, 1), "operations": summary})
 
-    if not args.check or not ids:
-        return
+    if args.check and ids:
+        t1 = time.perf_counter()
+        pending = set(ids)
+        final = Counter()
+        completed: list[str] = []
+        requests = 0
 
-    t1 = time.perf_counter()
-    pending = set(ids)
-    final = Counter()
+        async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+            while pending and (time.perf_counter() - t1) < args.check_timeout:
+                batch = list(pending)
+                sem2 = asyncio.Semaphore(args.c)
 
-    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
-        while pending and (time.perf_counter() - t1) < args.check_timeout:
-            batch = list(pending)
-            sem2 = asyncio.Semaphore(args.c)
+                async def check_chunk(chunk: list[str]) -> None:
+                    nonlocal requests
+                    async with sem2:
+                        statuses = await _get_statuses(client, statuses_url, chunk)
+                        requests += 1
+                        for tid, s in statuses.items():
+                            if s in ("COMPLETED", "FAILED", "CANCELLED") and tid in pending:
+                                pending.discard(tid)
+                                final[s] += 1
+                                if s == "COMPLETED":
+                                    completed.append(tid)
+
+                await asyncio.gather(
+                    *(check_chunk(batch[i:i + args.status_batch]) for i in range(0, len(batch), args.status_batch))
+                )
+                print(f"final={dict(final)} pending={len(pending)} status_requests={requests}")
+                if pending:
+                    await asyncio.sleep(args.check_interval)
 
-            async def check_one(tid: str) -> None:
-                async with sem2:
-                    s = await _get_status_one(client, status_url_tpl.format(task_id=tid), tid)
-                    if s in ("COMPLETED", "FAILED", "CANCELLED"):
-                        pending.discard(tid)
-                        final[s] += 1
+            sample = random.sample(completed, min(args.e2e_sample, len(completed)))
+            e2e = await _end_to_end(client, tasks_url, sample, args.c) if sample else None
 
-            await asyncio.gather(*(check_one(tid) for tid in batch))
-            print(f"final={dict(final)} pending={len(pending)}")
-            if pending:
-                await asyncio.sleep(args.check_interval)
+        if pending:
+            final["NOT_FINISHED"] = len(pending)
+        print("result:", dict(final))
+        report["final"] = dict(final)
+        if e2e:
+            report["end_to_end"] = e2e
+            for name in ("queue_wait_ms", "run_ms", "total_ms"):
+                lat = " ".join(f"{k}={v:.1f}" for k, v in e2e[name].items())
+                print(f"create->COMPLETED {name[:-3]:<10} n={e2e['count']} {lat}")
 
-    if pending:
-        final["NOT_FINISHED"] = len(pending)
-    print("result:", dict(final))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"report: {args.report}")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -20,7 +20,7 @@ def _apply_test_env() -> None:
 
 _apply_test_env()
 
-from app.main import app
+from app.main import app, create_app
 from app.db.session import get_db
 
 
@@ -95,4 +95,10 @@ def client(db_session) -> Generator[TestClient, None, None]:
         with TestClient(app) as c:
             yield c
     finally:
-        app.dependency_overrides.clear()
\ No newline at end of file
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="function")
+def async_client(db_session) -> Generator[TestClient, None, None]:
+    with TestClient(create_app(async_db=True)) as c:
+        yield c
@@ -0,0 +1,84 @@
+import asyncio
+import json
+from uuid import uuid4
+
+from aio_pika import DeliveryMode
+
+from app.core.enums import Priority, TaskStatus
+from app.db.models.task import Task
+from app.db.session import async_engine
+from app.workers import async_consumer
+
+
+class Exchange:
+    def __init__(self): self.published = []
+    async def publish(self, message, routing_key): self.published.append((routing_key, message))
+
+
+class Ch:
+    def __init__(self): self.default_exchange = Exchange()
+
+
+class Msg:
+    def __init__(self, body, routing_key="tasks.high", headers=None):
+        self.body, self.routing_key, self.headers = body, routing_key, headers or {}
+        self.content_type, self.delivery_mode, self.acked = "application/json", DeliveryMode.PERSISTENT, False
+    async def ack(self): self.acked = True
+
+
+def body(task_id): return json.dumps({"task_id": str(task_id)}).encode()
+
+
+def handle(ch, msg):
+    async def go():
+        try:
+            await async_consumer.on_message(ch, msg)
+        finally:
+            await async_engine.dispose()
+    asyncio.run(go())
+
+
+def add_task(db_session, status=TaskStatus.PENDING):
+    t = Task(id=uuid4(), title="t", description=None, priority=Priority.HIGH, status=status)
+    db_session.add(t); db_session.commit()
+    return t.id
+
+
+def test_async_worker_completes_task(db_session):
+    tid = add_task(db_session)
+    ch, msg = Ch(), Msg(body(tid))
+
+    handle(ch, msg)
+
+    db_session.expire_all()
+    t = db_session.get(Task, tid)
+    assert msg.acked and ch.default_exchange.published == []
+    assert t.status == TaskStatus.COMPLETED and t.result == f"ok:{tid}" and t.started_at and t.finished_at
+
+
+def test_async_worker_execute_error_goes_to_retry_queue(db_session, monkeypatch):
+    async def boom(_): raise ValueError("boom")
+    monkeypatch.setattr(async_consumer, "_execute", boom)
+    tid = add_task(db_session)
+    ch, msg = Ch(), Msg(body(tid), routing_key="tasks.low", headers={"x-retry-count": 1})
+
+    handle(ch, msg)
+
+    db_session.expire_all()
+    t = db_session.get(Task, tid)
+    (routing_key, published), = ch.default_exchange.published
+    assert msg.acked and t.status == TaskStatus.FAILED and "boom" in t.error
+    assert routing_key.startswith("tasks.low.retry.") and published.headers["x-retry-count"] == 2
+
+
+def test_async_worker_bad_json_and_not_pending(db_session):
+    tid = add_task(db_session, status=TaskStatus.CANCELLED)
+    ch, bad, skipped = Ch(), Msg(b"nope"), Msg(body(tid))
+
+    handle(ch, bad)
+    handle(ch, skipped)
+
+    db_session.expire_all()
+    assert bad.acked and skipped.acked
+    assert [r for r, _ in ch.default_exchange.published] == ["tasks.dlq"]
+    assert db_session.get(Task, tid).status == TaskStatus.CANCELLED
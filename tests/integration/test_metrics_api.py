@@ -0,0 +1,27 @@
+from prometheus_client import REGISTRY
+
+from app.db.session import SessionLocal
+from app.workers.outbox_publisher import report_backlog
+
+
+def test_metrics_endpoint_has_route_histogram_and_pool_gauges(client):
+    client.post("/api/v1/tasks", json={"title": "m", "priority": "LOW"})
+    client.get("/api/v1/tasks/00000000-0000-0000-0000-000000000000")
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    text = resp.text
+    assert 'http_request_duration_seconds_count{method="POST",route="/api/v1/tasks",status="201"}' in text
+    assert 'route="/api/v1/tasks/{task_id}",status="404"' in text
+    assert 'db_pool_checked_out{engine="sync"}' in text
+
+
+def test_outbox_backlog_gauges(client):
+    for i in range(3):
+        client.post("/api/v1/tasks", json={"title": f"b{i}", "priority": "LOW"})
+
+    with SessionLocal() as db:
+        report_backlog(db)
+
+    assert REGISTRY.get_sample_value("outbox_backlog", {"shard": "all"}) == 3
+    assert REGISTRY.get_sample_value("outbox_oldest_new_age_seconds", {"shard": "all"}) >= 0
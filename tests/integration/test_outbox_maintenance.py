@@ -0,0 +1,43 @@
+from datetime import date, datetime, timezone
+from uuid import uuid4
+
+from sqlalchemy import text
+
+from app.core.enums import OutboxStatus
+from app.db.models.outbox import OutboxEvent
+from app.workers.outbox_maintenance import apply_retention, ensure_partitions, list_partitions, partition_name
+
+
+def _event(created_at: datetime, status: OutboxStatus) -> OutboxEvent:
+    return OutboxEvent(task_id=uuid4(), routing_key="tasks.low", payload={}, status=status, created_at=created_at)
+
+
+def test_retention_drops_old_partitions_without_pending_events(db_session):
+    created = ensure_partitions(db_session, today=date(2020, 1, 1), ahead_days=2)
+    assert created == [partition_name(date(2020, 1, d)) for d in (1, 2, 3)]
+    assert ensure_partitions(db_session, today=date(2020, 1, 1), ahead_days=2) == []
+
+    db_session.add(_event(datetime(2020, 1, 1, 12, tzinfo=timezone.utc), OutboxStatus.SENT))
+    db_session.add(_event(datetime(2020, 1, 2, 12, tzinfo=timezone.utc), OutboxStatus.NEW))
+    db_session.flush()
+
+    removed = apply_retention(db_session, today=date(2020, 1, 10), retention_days=7, mode="drop")
+
+    assert removed == [partition_name(date(2020, 1, 1))]
+    partitions = list_partitions(db_session)
+    assert date(2020, 1, 1) not in partitions
+    assert date(2020, 1, 2) in partitions
+    assert date(2020, 1, 3) in partitions
+
+
+def test_new_partition_takes_rows_from_default(db_session):
+    ev = _event(datetime(2020, 2, 1, 8, tzinfo=timezone.utc), OutboxStatus.NEW)
+    db_session.add(ev)
+    db_session.flush()
+
+    ensure_partitions(db_session, today=date(2020, 2, 1), ahead_days=0)
+
+    table = db_session.execute(
+        text("SELECT tableoid::regclass::text FROM outbox_events WHERE id = :id"), {"id": ev.id}
+    ).scalar_one()
+    assert table == partition_name(date(2020, 2, 1))
@@ -0,0 +1,59 @@
+import json
+import threading
+import time
+from uuid import UUID
+
+from app.db.session import SessionLocal
+from app.workers.consumer import _complete, _fail
+
+
+def finish_later(task_id, delay=0.3, fail=False):
+    def run():
+        time.sleep(delay)
+        with SessionLocal() as db:
+            (_fail if fail else _complete)(db, UUID(task_id), "boom" if fail else "done")
+            db.commit()
+    t = threading.Thread(target=run)
+    t.start()
+    return t
+
+
+def test_wait_returns_on_completion(client):
+    task_id = client.post("/api/v1/tasks", json={"title": "w", "priority": "HIGH"}).json()["id"]
+    worker = finish_later(task_id)
+
+    started = time.monotonic()
+    resp = client.get(f"/api/v1/tasks/{task_id}/wait", params={"timeout": 10})
+    worker.join()
+
+    assert resp.status_code == 200, resp.text
+    assert resp.json() == {"id": task_id, "status": "COMPLETED"}
+    assert time.monotonic() - started < 5
+    assert client.get(f"/api/v1/tasks/{task_id}/status").json()["status"] == "COMPLETED"
+
+
+def test_wait_timeout_and_not_found(client):
+    task_id = client.post("/api/v1/tasks", json={"title": "w", "priority": "LOW"}).json()["id"]
+    resp = client.get(f"/api/v1/tasks/{task_id}/wait", params={"timeout": 0.2})
+    assert resp.json() == {"id": task_id, "status": "PENDING"}
+
+    missing = client.get("/api/v1/tasks/00000000-0000-0000-0000-000000000000/wait", params={"timeout": 0.2})
+    assert missing.status_code == 404
+
+
+def test_async_event_stream_for_many_tasks(async_client):
+    cancelled = async_client.post("/api/v1/tasks", json={"title": "c", "priority": "LOW"}).json()["id"]
+    failed = async_client.post("/api/v1/tasks", json={"title": "f", "priority": "LOW"}).json()["id"]
+    assert async_client.delete(f"/api/v1/tasks/{cancelled}").status_code == 200
+
+    worker = finish_later(failed, fail=True)
+    with async_client.stream("GET", "/api/v1/tasks/events", params={"ids": [cancelled, failed]}) as resp:
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        events = [json.loads(line[len("data: "):]) for line in resp.iter_lines() if line.startswith("data: ")]
+    worker.join()
+
+    assert events == [
+        {"id": cancelled, "status": "CANCELLED"},
+        {"id": failed, "status": "PENDING"},
+        {"id": failed, "status": "FAILED"},
+    ]
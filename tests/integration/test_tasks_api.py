@@ -1,4 +1,12 @@
-from sqlalchemy import text
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import event, insert, text
+
+from app.db.models.task_result import TaskResult
+from app.repositories.task_repo import TaskRepository
+from app.workers import consumer
+from app.workers.outbox_publisher import promote_due
 
 
 def test_create_task_returns_pending(client):
@@ -17,6 +25,19 @@ def test_create_task_returns_pending(client):
     assert data["created_at"] is not None
 
 
+def test_create_task_with_type_puts_type_into_outbox_payload(client, db_session):
+    resp = client.post("/api/v1/tasks", json={"title": "typed", "priority": "LOW", "type": "score"})
+    assert resp.status_code == 201, resp.text
+    data = resp.json()
+    assert data["type"] == "score"
+
+    payload = db_session.execute(
+        text("SELECT payload FROM outbox_events WHERE task_id = :id"),
+        {"id": data["id"]},
+    ).scalar_one()
+    assert payload["type"] == "score"
+
+
 def test_create_task_creates_outbox_event(client, db_session):
     resp = client.post("/api/v1/tasks", json={"title": "t-outbox", "priority": "HIGH"})
     assert resp.status_code == 201, resp.text
@@ -55,6 +76,8 @@ def test_list_tasks_filters_and_pagination(client):
     assert data["offset"] == 0
     assert len(data["items"]) == 1
     assert data["items"][0]["title"] == "c"
+    # строки списка сериализуются в обход pydantic и должны совпадать с TaskRead
+    assert data["items"][0] == client.get(f"/api/v1/tasks/{data['items'][0]['id']}").json()
 
 
 def test_cancel_task_pending_to_cancelled(client):
@@ -78,4 +101,192 @@ def test_cancel_task_conflict_for_non_cancellable_status(client, db_session):
     db_session.commit()
 
     resp = client.delete(f"/api/v1/tasks/{task_id}")
-    assert resp.status_code == 409, resp.text
\ No newline at end of file
+    assert resp.status_code == 409, resp.text
+
+def test_list_tasks_cursor_pagination(client):
+    for i in range(5):
+        client.post("/api/v1/tasks", json={"title": f"p{i}", "priority": "HIGH"})
+    client.post("/api/v1/tasks", json={"title": "other", "priority": "LOW"})
+
+    seen, cursor = [], None
+    while True:
+        params = {"priority": "HIGH", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        data = client.get("/api/v1/tasks", params=params).json()
+        seen.extend(x["title"] for x in data["items"])
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+
+    assert sorted(seen) == ["p0", "p1", "p2", "p3", "p4"]
+    assert len(set(seen)) == 5
+
+    offset_page = client.get("/api/v1/tasks", params={"priority": "HIGH", "limit": 2, "offset": 2}).json()
+    assert [x["title"] for x in offset_page["items"]] == seen[2:4]
+
+
+def test_list_tasks_invalid_cursor(client):
+    resp = client.get("/api/v1/tasks", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400, resp.text
+
+
+def test_create_tasks_batch(client, db_session):
+    items = [{"title": f"b{i}", "priority": p} for i, p in enumerate(["LOW", "MEDIUM", "HIGH"])]
+    resp = client.post("/api/v1/tasks:batch", json={"items": items})
+    assert resp.status_code == 201, resp.text
+    data = resp.json()
+
+    assert [x["title"] for x in data] == ["b0", "b1", "b2"]
+    assert all(x["status"] == "PENDING" and x["created_at"] for x in data)
+
+    cnt = db_session.execute(text("SELECT COUNT(*) FROM outbox_events")).scalar_one()
+    assert cnt == 3
+
+
+def test_create_tasks_batch_rejects_empty(client):
+    resp = client.post("/api/v1/tasks:batch", json={"items": []})
+    assert resp.status_code == 422, resp.text
+
+
+def test_task_status_cached_after_cancel(client):
+    task_id = client.post("/api/v1/tasks", json={"title": "cached", "priority": "LOW"}).json()["id"]
+    before = client.get("/api/v1/cache/status").json()
+
+    assert client.get(f"/api/v1/tasks/{task_id}/status").json()["status"] == "PENDING"
+    assert client.delete(f"/api/v1/tasks/{task_id}").status_code == 200
+    assert client.get(f"/api/v1/tasks/{task_id}/status").json()["status"] == "CANCELLED"
+    assert client.get("/api/v1/tasks/00000000-0000-0000-0000-000000000000/status").status_code == 404
+
+    after = client.get("/api/v1/cache/status").json()
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 1
+
+
+def test_task_statuses_batch(client):
+    ids = [client.post("/api/v1/tasks", json={"title": f"s{i}", "priority": "LOW"}).json()["id"] for i in range(3)]
+    client.delete(f"/api/v1/tasks/{ids[0]}")
+    missing = "00000000-0000-0000-0000-000000000000"
+
+    resp = client.post("/api/v1/tasks/status:batch", json={"ids": [*ids, missing, ids[1]]})
+    assert resp.status_code == 200, resp.text
+    assert resp.json() == {
+        "statuses": {ids[0]: "CANCELLED", ids[1]: "PENDING", ids[2]: "PENDING"},
+        "not_found": [missing],
+    }
+    assert client.post("/api/v1/tasks/status:batch", json={"ids": []}).status_code == 422
+
+
+def test_scheduled_task_promoted_by_outbox_loop(client, db_session):
+    run_at = (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()
+    resp = client.post("/api/v1/tasks", json={"title": "later", "priority": "LOW", "run_at": run_at})
+    assert resp.status_code == 201, resp.text
+    data = resp.json()
+    assert data["status"] == "SCHEDULED" and data["run_at"] is not None
+
+    count_events = text("SELECT COUNT(*) FROM outbox_events WHERE task_id = :id")
+    assert db_session.execute(count_events, {"id": data["id"]}).scalar_one() == 0
+    assert promote_due(db_session) == 0
+
+    db_session.execute(text("UPDATE tasks SET run_at = now() - interval '1 second' WHERE id = :id"), {"id": data["id"]})
+    db_session.commit()
+    assert promote_due(db_session) == 1
+
+    assert client.get(f"/api/v1/tasks/{data['id']}/status").json()["status"] == "PENDING"
+    assert db_session.execute(count_events, {"id": data["id"]}).scalar_one() == 1
+
+
+def test_list_tasks_fields_projection(client):
+    for title in ("a", "b", "c"):
+        client.post("/api/v1/tasks", json={"title": title, "description": "x" * 1000, "priority": "LOW"})
+
+    resp = client.get("/api/v1/tasks", params={"fields": "title,status", "limit": 2})
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["items"] == [{"title": "c", "status": "PENDING"}, {"title": "b", "status": "PENDING"}]
+
+    resp = client.get("/api/v1/tasks", params={"fields": "id,title", "limit": 2, "cursor": data["next_cursor"]})
+    assert [x["title"] for x in resp.json()["items"]] == ["a"]
+
+    resp = client.get("/api/v1/tasks", params={"fields": "title,password"})
+    assert resp.status_code == 400
+
+
+def test_task_stats_follow_status_changes(client, db_session):
+    ids = [
+        client.post("/api/v1/tasks", json={"title": f"t{i}", "priority": priority}).json()["id"]
+        for i, priority in enumerate(("HIGH", "HIGH", "LOW"))
+    ]
+    client.post("/api/v1/tasks:batch", json={"items": [{"title": "b1", "priority": "LOW"}, {"title": "b2", "priority": "LOW"}]})
+    client.delete(f"/api/v1/tasks/{ids[0]}")
+    db_session.execute(text("UPDATE tasks SET status = 'COMPLETED' WHERE id = :id"), {"id": ids[2]})
+    db_session.execute(text("UPDATE tasks SET title = 'renamed'"))
+    db_session.execute(text("DELETE FROM tasks WHERE title = 'renamed' AND status = 'PENDING' AND priority = 'LOW'"))
+    db_session.commit()
+
+    expected = {("CANCELLED", "HIGH"): 1, ("PENDING", "HIGH"): 1, ("COMPLETED", "LOW"): 1}
+    data = client.get("/api/v1/tasks/stats").json()
+    assert {(x["status"], x["priority"]): x["count"] for x in data["items"]} == expected
+    assert data["by_status"]["PENDING"] == 1 and data["by_status"]["FAILED"] == 0
+    assert data["total"] == 3
+
+    resp = client.get("/api/v1/tasks", params={"priority": "HIGH", "with_total": True, "limit": 1})
+    assert resp.json()["total"] == 2
+    assert client.get("/api/v1/tasks").json()["total"] is None
+
+    # строки других шардов сворачиваются в shard=0, сумма не меняется
+    db_session.execute(text("INSERT INTO task_counters VALUES ('PENDING', 'HIGH', 99, 2), ('PENDING', 'HIGH', 98, -2)"))
+    assert TaskRepository(db_session).compact_counters() >= 2
+    db_session.commit()
+    shards = db_session.execute(text("SELECT DISTINCT shard FROM task_counters")).scalars().all()
+    assert shards == [0]
+    assert client.get("/api/v1/tasks/stats").json() == data
+
+
+def test_large_result_read_from_task_results(client, async_client, db_session):
+    task_id = client.post("/api/v1/tasks", json={"title": "big", "priority": "LOW"}).json()["id"]
+    client.post("/api/v1/tasks", json={"title": "small", "priority": "LOW"})
+    inline, stored = consumer._split_results({UUID(task_id): "r" * 1_000_000})
+    assert inline[UUID(task_id)] is None and len(stored[0]["data"]) < 10_000
+    db_session.execute(consumer._complete_stmt(UUID(task_id), None))
+    db_session.execute(insert(TaskResult), stored)
+    db_session.commit()
+
+    for c in (client, async_client):
+        assert c.get(f"/api/v1/tasks/{task_id}").json()["result"] == "r" * 1_000_000
+        items = c.get("/api/v1/tasks").json()["items"]
+        assert [len(x["result"] or "") for x in items] == [0, 1_000_000]
+        items = c.get("/api/v1/tasks", params={"fields": "title,result"}).json()["items"]
+        assert items == [{"title": "small", "result": None}, {"title": "big", "result": "r" * 1_000_000}]
+
+
+def test_list_reads_task_results_only_for_stored_rows(client, engine, db_session):
+    task_id = client.post("/api/v1/tasks", json={"title": "big", "priority": "LOW"}).json()["id"]
+    client.post("/api/v1/tasks", json={"title": "small", "priority": "LOW"})
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert client.get("/api/v1/tasks").status_code == 200
+        # на странице только PENDING задачи: NULL в result не повод читать task_results
+        items = client.get("/api/v1/tasks", params={"fields": "id,result"}).json()["items"]
+        assert [x["result"] for x in items] == [None, None]
+        assert not [x for x in statements if "task_results" in x]
+
+        inline, stored = consumer._split_results({UUID(task_id): "r" * 10_000})
+        db_session.execute(consumer._complete_stmt(UUID(task_id), None))
+        db_session.execute(insert(TaskResult), stored)
+        db_session.commit()
+        statements.clear()
+        items = client.get("/api/v1/tasks").json()["items"]
+        assert len([x for x in statements if "task_results" in x]) == 1
+        assert [len(x["result"] or "") for x in items] == [0, 10_000]
+        items = client.get("/api/v1/tasks", params={"fields": "id,result"}).json()["items"]
+        assert len([x for x in statements if "task_results" in x]) == 2
+        assert [len(x["result"] or "") for x in items] == [0, 10_000]
+        assert list(items[0]) == ["id", "result"]
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
@@ -0,0 +1,66 @@
+from sqlalchemy import text
+
+
+def test_async_create_task_creates_outbox_event(async_client, db_session):
+    resp = async_client.post("/api/v1/tasks", json={"title": "async", "description": "hello", "priority": "HIGH"})
+    assert resp.status_code == 201, resp.text
+    data = resp.json()
+    assert data["status"] == "PENDING"
+    assert data["created_at"] is not None
+
+    cnt = db_session.execute(
+        text("SELECT COUNT(*) FROM outbox_events WHERE task_id = :id"),
+        {"id": data["id"]},
+    ).scalar_one()
+    assert cnt == 1
+
+
+def test_async_get_list_and_status(async_client):
+    task_id = async_client.post("/api/v1/tasks", json={"title": "a", "priority": "LOW"}).json()["id"]
+    async_client.post("/api/v1/tasks", json={"title": "b", "priority": "MEDIUM"})
+
+    resp = async_client.get(f"/api/v1/tasks/{task_id}")
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["title"] == "a"
+
+    resp = async_client.get(f"/api/v1/tasks/{task_id}/status")
+    assert resp.json() == {"id": task_id, "status": "PENDING"}
+
+    resp = async_client.get("/api/v1/tasks", params={"priority": "LOW"})
+    assert [x["id"] for x in resp.json()["items"]] == [task_id]
+
+    resp = async_client.get("/api/v1/tasks", params={"priority": "LOW", "fields": "id,status"})
+    assert resp.json()["items"] == [{"id": task_id, "status": "PENDING"}]
+
+    resp = async_client.get("/api/v1/tasks", params={"with_total": True})
+    assert resp.json()["total"] == 2
+    assert async_client.get("/api/v1/tasks/stats").json()["by_status"]["PENDING"] == 2
+
+    assert async_client.get("/api/v1/tasks/00000000-0000-0000-0000-000000000000").status_code == 404
+
+
+def test_async_cancel_and_conflict(async_client, db_session):
+    task_id = async_client.post("/api/v1/tasks", json={"title": "c", "priority": "MEDIUM"}).json()["id"]
+
+    resp = async_client.delete(f"/api/v1/tasks/{task_id}")
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["status"] == "CANCELLED"
+
+    resp = async_client.delete(f"/api/v1/tasks/{task_id}")
+    assert resp.status_code == 409, resp.text
+
+
+def test_async_create_tasks_batch(async_client, db_session):
+    items = [{"title": f"b{i}", "priority": "MEDIUM"} for i in range(4)]
+    resp = async_client.post("/api/v1/tasks:batch", json={"items": items})
+    assert resp.status_code == 201, resp.text
+    assert [x["title"] for x in resp.json()] == ["b0", "b1", "b2", "b3"]
+
+    cnt = db_session.execute(text("SELECT COUNT(*) FROM outbox_events")).scalar_one()
+    assert cnt == 4
+
+
+def test_async_task_statuses_batch(async_client):
+    ids = [async_client.post("/api/v1/tasks", json={"title": f"s{i}", "priority": "LOW"}).json()["id"] for i in range(2)]
+    resp = async_client.post("/api/v1/tasks/status:batch", json={"ids": ids})
+    assert resp.json() == {"statuses": {ids[0]: "PENDING", ids[1]: "PENDING"}, "not_found": []}
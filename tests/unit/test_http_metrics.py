@@ -0,0 +1,33 @@
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.api.metrics import MetricsMiddleware, route_labels
+
+
+def count(route, status):
+    return REGISTRY.get_sample_value(
+        "http_request_duration_seconds_count", {"method": "GET", "route": route, "status": status}
+    ) or 0.0
+
+
+def test_route_label_uses_include_prefix_and_path_format():
+    files = APIRouter(prefix="/files")
+
+    @files.get("/{name:path}")
+    def read_file(name: str) -> dict:
+        return {"name": name}
+
+    outer = APIRouter(prefix="/labels")
+    outer.include_router(files)
+    app = FastAPI()
+    app.include_router(outer)
+    app.add_middleware(MetricsMiddleware, labels=route_labels(files.routes, "/labels"))
+
+    before = count("/labels/files/{name}", "200"), count("unmatched", "404")
+    with TestClient(app) as c:
+        assert c.get("/labels/files/a/b/c.txt").json() == {"name": "a/b/c.txt"}
+        assert c.get("/missing").status_code == 404
+
+    assert count("/labels/files/{name}", "200") - before[0] == 1
+    assert count("unmatched", "404") - before[1] == 1
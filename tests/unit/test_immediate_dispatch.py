@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.enums import OutboxStatus, Priority
+from app.db.base import Base
+from app.db.models.outbox import OutboxEvent
+from app.repositories.outbox_repo import OutboxRepository
+from app.services import task_service
+from app.services.immediate_dispatch import ImmediateDispatcher
+from app.services.task_service import TaskService
+
+
+class Publisher:
+    def __init__(self, fail=False): self.batches, self.fail = [], fail
+    def publish_batch(self, messages):
+        if self.fail:
+            raise RuntimeError("broker down")
+        self.batches.append(list(messages))
+
+
+class Recorder:
+    def __init__(self): self.events = []
+    def submit(self, events): self.events.extend(events)
+
+
+def file_factory(tmp_path):
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'outbox.db'}", future=True)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+def test_create_task_defers_poller_and_submits_after_commit(monkeypatch, db_session):
+    monkeypatch.setattr(settings, "OUTBOX_IMMEDIATE_DISPATCH", True)
+    recorder = Recorder()
+    monkeypatch.setattr(task_service, "immediate_dispatcher", recorder)
+
+    TaskService(db_session).create_task(title="t", description=None, priority=Priority.HIGH)
+
+    ev = db_session.query(OutboxEvent).one()
+    assert [e.id for e in recorder.events] == [ev.id]
+    assert ev.next_attempt_at - ev.created_at == timedelta(seconds=settings.OUTBOX_IMMEDIATE_GRACE_SECONDS)
+    assert OutboxRepository(db_session).fetch_batch_for_publish(limit=10) == []
+
+
+def test_dispatcher_marks_sent_on_ack_and_leaves_new_on_error(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "OUTBOX_IMMEDIATE_DISPATCH", True)
+    factory = file_factory(tmp_path)
+    recorder = Recorder()
+    monkeypatch.setattr(task_service, "immediate_dispatcher", recorder)
+    s = factory()
+    TaskService(s).create_tasks([{"title": f"t{i}", "priority": Priority.LOW} for i in range(3)])
+    s.close()
+    sent, failed = recorder.events[:2], recorder.events[2:]
+
+    publisher = Publisher()
+    dispatcher = ImmediateDispatcher(publisher=publisher, session_factory=factory)
+    dispatcher.submit(sent)
+    dispatcher.stop()
+    ImmediateDispatcher(publisher=Publisher(fail=True), session_factory=factory).flush(failed)
+
+    s = factory()
+    statuses = {ev.id: ev.status for ev in s.query(OutboxEvent).all()}
+    s.close()
+    assert sum(len(b) for b in publisher.batches) == 2
+    assert [statuses[ev.id] for ev in sent] == [OutboxStatus.SENT, OutboxStatus.SENT]
+    assert statuses[failed[0].id] == OutboxStatus.NEW
@@ -0,0 +1,95 @@
+from datetime import timedelta
+from uuid import uuid4
+
+from app.core.config import settings
+from app.core.enums import OutboxStatus
+from app.db.models.outbox import OutboxEvent
+from app.repositories.outbox_repo import utcnow
+from app.workers import outbox_publisher
+
+
+def add_events(session_factory, n, attempts=0):
+    s = session_factory()
+    ids = []
+    for i in range(n):
+        ev = OutboxEvent(
+            id=uuid4(), task_id=uuid4(), routing_key="tasks.high", payload={"i": i},
+            attempts=attempts, next_attempt_at=utcnow() - timedelta(seconds=1),
+        )
+        s.add(ev)
+        ids.append(ev.id)
+    s.commit(); s.close()
+    return ids
+
+
+def load(session_factory):
+    s = session_factory(); events = {e.id: e for e in s.query(OutboxEvent).all()}; s.close()
+    return events
+
+
+def test_batch_mode_publishes_once_and_marks_sent(monkeypatch, db_session_factory):
+    monkeypatch.setattr(settings, "OUTBOX_PUBLISH_MODE", "batch")
+    calls = []
+    monkeypatch.setattr(outbox_publisher, "publish_batch", lambda messages: calls.append(list(messages)))
+    ids = add_events(db_session_factory, 3)
+
+    s = db_session_factory()
+    assert outbox_publisher.run_once(s) == 3
+    s.close()
+
+    events = load(db_session_factory)
+    assert len(calls) == 1 and len(calls[0]) == 3
+    assert all(events[i].status == OutboxStatus.SENT and events[i].sent_at for i in ids)
+
+
+def test_batch_mode_failure_backoff_and_exhausted(monkeypatch, db_session_factory):
+    monkeypatch.setattr(settings, "OUTBOX_PUBLISH_MODE", "batch")
+    monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(outbox_publisher, "publish_batch", lambda _: (_ for _ in ()).throw(RuntimeError("broker down")))
+    fresh = add_events(db_session_factory, 2, attempts=0)
+    last = add_events(db_session_factory, 1, attempts=2)
+
+    s = db_session_factory()
+    outbox_publisher.run_once(s)
+    s.close()
+
+    events = load(db_session_factory)
+    for i in fresh:
+        assert events[i].status == OutboxStatus.NEW and events[i].attempts == 1 and "broker down" in events[i].last_error
+        assert events[i].next_attempt_at.replace(tzinfo=None) > utcnow().replace(tzinfo=None)
+    assert events[last[0]].status == OutboxStatus.FAILED and events[last[0]].attempts == 3
+
+
+def test_single_mode_publishes_each_event(monkeypatch, db_session_factory):
+    monkeypatch.setattr(settings, "OUTBOX_PUBLISH_MODE", "single")
+    calls = []
+    monkeypatch.setattr(outbox_publisher, "publish", lambda queue_name, payload: calls.append(queue_name))
+    ids = add_events(db_session_factory, 2)
+
+    s = db_session_factory()
+    outbox_publisher.run_once(s)
+    s.close()
+
+    events = load(db_session_factory)
+    assert calls == ["tasks.high", "tasks.high"]
+    assert all(events[i].status == OutboxStatus.SENT for i in ids)
+
+
+def test_shards_partition_buckets_and_filter_fetch(db_session_factory):
+    from app.db.models.outbox import OUTBOX_SHARD_BUCKETS, outbox_shard_bucket
+    from app.repositories.outbox_repo import OutboxRepository, OutboxShard
+
+    shards = [OutboxShard.parse(f"{i}/3") for i in range(3)]
+    covered = [b for sh in shards for b in range(*sh.buckets)]
+    assert covered == list(range(OUTBOX_SHARD_BUCKETS))
+
+    add_events(db_session_factory, 30)
+    s = db_session_factory()
+    seen = []
+    for sh in shards:
+        lo, hi = sh.buckets
+        events = OutboxRepository(s).fetch_batch_for_publish(limit=100, shard=sh)
+        assert all(lo <= e.shard_bucket < hi and e.shard_bucket == outbox_shard_bucket(e.task_id) for e in events)
+        seen.extend(e.id for e in events)
+    s.close()
+    assert len(seen) == len(set(seen)) == 30
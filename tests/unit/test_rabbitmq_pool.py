@@ -0,0 +1,95 @@
+import threading
+
+import msgpack
+import pytest
+
+from app.core.config import settings
+from app.messaging import rabbitmq
+from app.messaging.codec import MSGPACK
+from app.messaging.rabbitmq import ChannelPool, RabbitMQPublisher
+from app.utils.exceptions import ExternalServiceError
+
+
+release = threading.Event()
+
+
+class Channel:
+    def __init__(self, conn): self.conn, self.is_open, self.confirms, self.published, self.bodies = conn, True, False, [], []
+    def confirm_delivery(self): self.confirms = True
+    def queue_declare(self, queue, durable): pass
+    def tx_select(self): pass
+    def tx_commit(self): pass
+    def basic_publish(self, exchange, routing_key, body, properties=None):
+        if self.conn.broken:
+            raise RuntimeError("connection lost")
+        if routing_key == "slow":
+            assert release.wait(1)
+        self.published.append(routing_key)
+        self.bodies.append((properties.content_type, body))
+
+
+class Connection:
+    def __init__(self): self.is_open, self.broken, self.channels = True, False, []
+    def channel(self):
+        self.channels.append(Channel(self))
+        return self.channels[-1]
+    def process_data_events(self, time_limit=0):
+        if self.broken:
+            raise RuntimeError("connection lost")
+    def close(self): self.is_open = False
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    monkeypatch.setattr(settings, "RABBITMQ_ENABLED", True)
+    created = []
+    monkeypatch.setattr(rabbitmq, "_connect", lambda: created.append(Connection()) or created[-1])
+    return created
+
+
+def test_publishers_use_separate_connections_concurrently(monkeypatch, connections):
+    monkeypatch.setattr(settings, "RABBITMQ_PUBLISH_CONFIRMS", True)
+    publisher = RabbitMQPublisher(pool_size=2)
+    release.clear()
+
+    blocked = threading.Thread(target=publisher.publish, kwargs={"queue_name": "slow", "payload": {}})
+    blocked.start()
+    while not connections:
+        pass
+    publisher.publish(queue_name="fast", payload={})
+    fast_done = [ch.published for conn in connections for ch in conn.channels]
+    release.set()
+    blocked.join()
+
+    assert len(connections) == 2
+    assert ["fast"] in fast_done
+    assert all(conn.channels[0].confirms for conn in connections)
+
+
+def test_dead_connection_replaced_on_checkout(connections):
+    publisher = RabbitMQPublisher(pool_size=1)
+    publisher.publish(queue_name="a", payload={})
+    connections[0].broken = True
+
+    publisher.publish_batch([("b", {})])
+
+    assert not connections[0].is_open
+    assert connections[1].channels[1].published == ["b"]
+
+
+def test_checkout_times_out_when_pool_exhausted():
+    pool = ChannelPool(1, timeout=0.01)
+    with pool.slot():
+        with pytest.raises(ExternalServiceError):
+            with pool.slot():
+                pass
+
+
+def test_publisher_encodes_with_configured_codec(monkeypatch, connections):
+    monkeypatch.setattr(settings, "RABBITMQ_CONTENT_TYPE", MSGPACK)
+    publisher = RabbitMQPublisher(pool_size=1)
+    publisher.publish(queue_name="a", payload={"task_id": "t1"})
+    publisher.publish_batch([("b", {"task_id": "t2"})])
+
+    bodies = [b for ch in connections[0].channels for b in ch.bodies]
+    assert [(ct, msgpack.unpackb(b)) for ct, b in bodies] == [(MSGPACK, {"task_id": "t1"}), (MSGPACK, {"task_id": "t2"})]
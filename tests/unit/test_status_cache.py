@@ -0,0 +1,64 @@
+from uuid import uuid4
+
+from app.core.enums import Priority, TaskStatus
+from app.services import task_service
+from app.services.status_cache import StatusCache
+from app.services.task_service import TaskService
+
+
+class Clock:
+    def __init__(self): self.now = 0.0
+    def __call__(self): return self.now
+
+
+def test_terminal_status_never_expires_and_pending_does():
+    clock = Clock()
+    cache = StatusCache(max_size=10, ttl=1.0, clock=clock)
+    done, pending = uuid4(), uuid4()
+    cache.put(done, TaskStatus.COMPLETED)
+    cache.put(pending, TaskStatus.PENDING)
+
+    clock.now = 5.0
+    assert cache.get(done) == TaskStatus.COMPLETED
+    assert cache.get(pending) is None
+    assert cache.stats().expirations == 1
+
+
+def test_lru_evicts_least_recently_used():
+    cache = StatusCache(max_size=2, ttl=1.0)
+    a, b, c = uuid4(), uuid4(), uuid4()
+    cache.put(a, TaskStatus.FAILED)
+    cache.put(b, TaskStatus.FAILED)
+    cache.get(a)
+    cache.put(c, TaskStatus.FAILED)
+
+    assert cache.get(b) is None and cache.get(a) == TaskStatus.FAILED
+    assert cache.stats().evictions == 1
+
+
+def test_service_status_served_from_cache_and_updated_on_cancel(monkeypatch, db_session):
+    cache = StatusCache(max_size=10, ttl=60.0)
+    monkeypatch.setattr(task_service, "status_cache", cache)
+    svc = TaskService(db_session)
+    t = svc.create_task(title="t", description=None, priority=Priority.LOW)
+
+    assert svc.get_task_status(t.id) == TaskStatus.PENDING
+    assert svc.get_task_status(t.id) == TaskStatus.PENDING
+    svc.cancel_task(t.id)
+    assert svc.get_task_status(t.id) == TaskStatus.CANCELLED
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (2, 1)
+    assert stats.hit_rate == 2 / 3
+
+
+def test_cancel_does_not_touch_cache_when_disabled(monkeypatch, db_session):
+    cache = StatusCache(max_size=10, ttl=60.0)
+    monkeypatch.setattr(task_service, "status_cache", cache)
+    monkeypatch.setattr(task_service.settings, "STATUS_CACHE_ENABLED", False)
+    svc = TaskService(db_session)
+    t = svc.create_task(title="t", description=None, priority=Priority.LOW)
+
+    svc.cancel_task(t.id)
+    assert svc.get_task_status(t.id) == TaskStatus.CANCELLED
+    assert cache.get(t.id) is None
@@ -0,0 +1,64 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from starlette.requests import ClientDisconnect
+
+from app.api.v1 import tasks as tasks_api
+from app.core.enums import TaskStatus
+from app.services import task_events
+from app.services.task_events import TaskStatusListener
+
+
+@pytest.fixture
+def listener(monkeypatch):
+    listener = TaskStatusListener()
+    # без соединения LISTEN: проверяется только учет подписчиков
+    monkeypatch.setattr(listener, "_ensure_started", lambda: None)
+    monkeypatch.setattr(task_events, "task_listener", listener)
+    return listener
+
+
+async def _snapshot(task_ids):
+    return {task_id: TaskStatus.PENDING for task_id in task_ids}
+
+
+def test_subscription_released_when_client_leaves_before_first_chunk(listener, monkeypatch):
+    monkeypatch.setattr(tasks_api, "_snapshot", _snapshot)
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        raise OSError("client disconnected")
+
+    async def go():
+        resp = await tasks_api.stream_task_events(ids=[uuid4(), uuid4()])
+        assert listener.waiters == 2
+        with pytest.raises(ClientDisconnect):
+            await resp({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+
+    asyncio.run(go())
+    assert listener.waiters == 0
+
+
+def test_subscription_released_when_stream_finishes(listener, monkeypatch):
+    task_id = uuid4()
+    monkeypatch.setattr(tasks_api, "_snapshot", _snapshot)
+    sent = []
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+        if len(sent) == 2:
+            listener.dispatch(task_id, TaskStatus.COMPLETED)
+
+    async def go():
+        resp = await tasks_api.stream_task_events(ids=[task_id])
+        await resp({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+
+    asyncio.run(go())
+    assert listener.waiters == 0
+    assert b"COMPLETED" in sent[2]["body"]
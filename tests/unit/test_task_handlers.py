@@ -0,0 +1,90 @@
+import json
+from dataclasses import dataclass
+from uuid import uuid4
+
+import pytest
+
+from app.core.enums import Priority, TaskStatus
+from app.db.models.task import Task
+from app.workers import batch_consumer
+from app.workers.batch_consumer import Delivery
+from app.workers.handlers import HandlerRegistry, UnknownTaskTypeError, registry
+
+
+class Ch:
+    def __init__(self): self.published, self.acked = [], []
+    def basic_publish(self, exchange, routing_key, body, properties=None): self.published.append(routing_key)
+    def basic_ack(self, delivery_tag, multiple=False): self.acked.append(delivery_tag)
+
+
+@dataclass
+class M:
+    delivery_tag: int = 1
+    routing_key: str = "tasks.low"
+
+
+class P:
+    headers = {}
+
+
+def task(task_type="default"):
+    return Task(id=uuid4(), title="t", type=task_type, priority=Priority.MEDIUM, status=TaskStatus.IN_PROGRESS)
+
+
+def test_single_and_batch_handlers():
+    reg = HandlerRegistry()
+    calls = []
+
+    @reg.register("echo")
+    def echo(t): return f"echo:{t.title}"
+
+    @reg.register_batch("score", max_batch=2)
+    def score(tasks):
+        calls.append(len(tasks))
+        return [ValueError("bad") if t.title == "bad" else "scored" for t in tasks]
+
+    tasks = [task("score"), task("echo"), task("score"), task("score"), task("nope"), task("score")]
+    tasks[3].title = "bad"
+
+    outcomes = reg.execute_many(tasks)
+
+    assert calls == [2, 2]
+    assert outcomes[0] == "scored" and outcomes[1] == "echo:t" and outcomes[2] == "scored" and outcomes[5] == "scored"
+    assert isinstance(outcomes[3], ValueError) and isinstance(outcomes[4], UnknownTaskTypeError)
+    assert reg.execute(tasks[0]) == "scored" and calls[-1] == 1
+    with pytest.raises(ValueError):
+        reg.execute(tasks[3])
+
+
+def test_batch_handler_errors_apply_to_whole_chunk():
+    reg = HandlerRegistry()
+
+    @reg.register_batch("boom")
+    def boom(tasks): raise RuntimeError("down")
+
+    @reg.register_batch("short")
+    def short(tasks): return ["only one"]
+
+    outcomes = reg.execute_many([task("boom"), task("short"), task("short")])
+    assert isinstance(outcomes[0], RuntimeError)
+    assert all(isinstance(o, ValueError) for o in outcomes[1:])
+
+
+def test_batch_consumer_groups_tasks_for_batch_handler(monkeypatch, db_session_factory):
+    calls = []
+    monkeypatch.setitem(registry._handlers, "bulk", None)
+    registry.register_batch("bulk")(lambda tasks: calls.append([t.id for t in tasks]) or [f"bulk:{t.id}" for t in tasks])
+    monkeypatch.setattr(batch_consumer, "SessionLocal", db_session_factory)
+
+    s = db_session_factory()
+    tasks = [Task(id=uuid4(), title="t", type="bulk", priority=Priority.LOW, status=TaskStatus.PENDING) for _ in range(3)]
+    s.add_all(tasks); s.commit(); s.close()
+    ids = [t.id for t in tasks]
+    ch = Ch()
+
+    batch_consumer.process_batch(ch, [Delivery(M(n), P(), json.dumps({"task_id": str(i)}).encode()) for n, i in enumerate(ids, start=1)])
+
+    s = db_session_factory(); results = [s.get(Task, i).result for i in ids]; s.close()
+    assert calls == [ids]
+    assert results == [f"bulk:{i}" for i in ids]
+    assert ch.acked == [3] and ch.published == []
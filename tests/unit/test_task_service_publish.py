@@ -1,8 +1,11 @@
+import time
+from datetime import datetime, timedelta, timezone
+
 import pytest
 
 from app.core.enums import Priority, TaskStatus
 from app.db.models.task import Task
-from app.services.task_service import TaskService
+from app.services.task_service import TaskService, promote_due_tasks
 from app.utils.exceptions import ConflictError
 from app.services.publisher import TaskPublisher
 from app.db.models.outbox import OutboxEvent
@@ -35,4 +38,56 @@ def test_cancel_completed_conflict(db_session):
     db_session.commit()
     t = db_session.query(Task).one()
     with pytest.raises(ConflictError):
-        TaskService(db_session).cancel_task(t.id)
\ No newline at end of file
+        TaskService(db_session).cancel_task(t.id)
+
+def test_create_tasks_batch_creates_outbox_events(db_session):
+    svc = TaskService(db_session)
+    items = [
+        {"title": "a", "description": None, "priority": Priority.HIGH},
+        {"title": "b", "description": "d", "priority": Priority.LOW},
+    ]
+    tasks = svc.create_tasks(items)
+
+    assert [t.title for t in tasks] == ["a", "b"]
+    assert all(t.status == TaskStatus.PENDING and t.created_at for t in tasks)
+    assert db_session.query(Task).count() == 2
+
+    events = {e.task_id: e for e in db_session.query(OutboxEvent).all()}
+    for t in tasks:
+        rk, payload = TaskPublisher().build_task_created(t.id, t.priority)
+        assert events[t.id].routing_key == rk and events[t.id].payload == payload
+
+
+def test_scheduled_task_promoted_when_due(db_session):
+    svc = TaskService(db_session)
+    now = datetime.now(timezone.utc)
+    later = svc.create_task(title="later", description=None, priority=Priority.LOW, run_at=now + timedelta(hours=1))
+    [soon, asap] = svc.create_tasks(
+        [{"title": "soon", "run_at": now + timedelta(milliseconds=50)}, {"title": "asap", "run_at": now - timedelta(seconds=1)}]
+    )
+    assert later.status == soon.status == TaskStatus.SCHEDULED and asap.status == TaskStatus.PENDING
+    assert [e.task_id for e in db_session.query(OutboxEvent)] == [asap.id]
+
+    time.sleep(0.1)
+    assert promote_due_tasks(db_session, limit=100) == 1
+    db_session.commit()
+
+    assert {e.task_id for e in db_session.query(OutboxEvent)} == {asap.id, soon.id}
+    assert db_session.get(Task, later.id).status == TaskStatus.SCHEDULED
+    assert db_session.get(Task, soon.id).status == TaskStatus.PENDING
+    assert promote_due_tasks(db_session, limit=100) == 0
+
+
+def test_stats_without_counters_table_count_tasks(db_session):
+    svc = TaskService(db_session)
+    [a, _, _] = svc.create_tasks([{"title": "a", "priority": Priority.HIGH}, {"title": "b"}, {"title": "c"}])
+    svc.cancel_task(a.id)
+
+    stats = svc.get_stats()
+    assert {(x["status"], x["priority"]): x["count"] for x in stats["items"]} == {
+        (TaskStatus.CANCELLED, Priority.HIGH): 1,
+        (TaskStatus.PENDING, Priority.MEDIUM): 2,
+    }
+    assert stats["by_status"][TaskStatus.PENDING] == 2 and stats["total"] == 3
+    assert svc.count_tasks(status=TaskStatus.PENDING, priority=None) == 2
+    assert svc.count_tasks(status=None, priority=Priority.LOW) == 0
@@ -0,0 +1,115 @@
+import json
+from dataclasses import dataclass
+from uuid import uuid4
+
+from app.core.enums import Priority, TaskStatus
+from app.db.models.task import Task
+from app.workers import batch_consumer
+from app.workers.batch_consumer import BatchConsumer, Delivery
+
+
+class Ch:
+    def __init__(self): self.published, self.acked = [], []
+    def basic_publish(self, exchange, routing_key, body, properties=None): self.published.append((exchange, routing_key, body, properties))
+    def basic_ack(self, delivery_tag, multiple=False): self.acked.append((delivery_tag, multiple))
+
+
+class Conn:
+    def __init__(self): self.timers, self.removed = [], []
+    def call_later(self, delay, callback): self.timers.append(callback); return len(self.timers)
+    def remove_timeout(self, timer): self.removed.append(timer)
+
+
+@dataclass
+class M:
+    delivery_tag: int = 1
+    routing_key: str = "tasks.high"
+
+
+class P:
+    def __init__(self, headers=None): self.headers = headers or {}
+
+
+def body(task_id): return json.dumps({"task_id": str(task_id)}).encode()
+
+
+def add_tasks(session_factory, *statuses):
+    s = session_factory()
+    ids = []
+    for st in statuses:
+        t = Task(id=uuid4(), title="t", description=None, priority=Priority.MEDIUM, status=st)
+        s.add(t); ids.append(t.id)
+    s.commit(); s.close()
+    return ids
+
+
+def load(session_factory, ids):
+    s = session_factory(); tasks = {i: s.get(Task, i) for i in ids}; s.close()
+    return tasks
+
+
+def test_batch_completes_skips_and_acks_once(monkeypatch, db_session_factory):
+    monkeypatch.setattr(batch_consumer, "SessionLocal", db_session_factory)
+    monkeypatch.setattr(batch_consumer, "_execute_many", lambda tasks: [f"OK:{t.id}" for t in tasks])
+    ok1, ok2, cancelled = add_tasks(db_session_factory, TaskStatus.PENDING, TaskStatus.PENDING, TaskStatus.CANCELLED)
+    ch = Ch()
+    deliveries = [
+        Delivery(M(1), P(), body(ok1)),
+        Delivery(M(2), P(), b"nope"),
+        Delivery(M(3), P(), body(cancelled)),
+        Delivery(M(4), P(), body(ok2)),
+        Delivery(M(5), P(), body(ok2)),
+    ]
+
+    batch_consumer.process_batch(ch, deliveries)
+
+    tasks = load(db_session_factory, [ok1, ok2, cancelled])
+    assert ch.acked == [(5, True)]
+    assert [p[1] for p in ch.published] == ["tasks.dlq"]
+    assert tasks[ok1].status == TaskStatus.COMPLETED and tasks[ok1].result == f"OK:{ok1}" and tasks[ok1].finished_at
+    assert tasks[ok2].status == TaskStatus.COMPLETED
+    assert tasks[cancelled].status == TaskStatus.CANCELLED
+
+
+def test_batch_execute_error_retries_per_message(monkeypatch, db_session_factory):
+    monkeypatch.setattr(batch_consumer, "SessionLocal", db_session_factory)
+    ok, bad, exhausted = add_tasks(db_session_factory, TaskStatus.PENDING, TaskStatus.PENDING, TaskStatus.PENDING)
+    monkeypatch.setattr(batch_consumer, "_execute_many", lambda tasks: ["OK" if t.id == ok else ValueError("boom") for t in tasks])
+    ch = Ch()
+    batch_consumer.process_batch(ch, [
+        Delivery(M(1, "tasks.low"), P(), body(ok)),
+        Delivery(M(2, "tasks.low"), P(), body(bad)),
+        Delivery(M(3, "tasks.low"), P(headers={"x-retry-count": 9999}), body(exhausted)),
+    ])
+
+    tasks = load(db_session_factory, [ok, bad, exhausted])
+    assert ch.acked == [(3, True)]
+    assert tasks[ok].status == TaskStatus.COMPLETED
+    assert tasks[bad].status == TaskStatus.FAILED and "boom" in tasks[bad].error
+    assert ch.published[0][1].startswith("tasks.low.retry.") and ch.published[0][3].headers["x-retry-count"] == 1
+    assert ch.published[1][1] == "tasks.dlq"
+
+
+def test_batch_claim_error_republishes_same_queue(monkeypatch, db_session_factory):
+    monkeypatch.setattr(batch_consumer, "SessionLocal", db_session_factory)
+    monkeypatch.setattr(batch_consumer, "_claim_many", lambda *_: (_ for _ in ()).throw(RuntimeError("db blew up")))
+    t1, t2 = add_tasks(db_session_factory, TaskStatus.PENDING, TaskStatus.PENDING)
+    ch = Ch()
+    batch_consumer.process_batch(ch, [Delivery(M(1), P(), body(t1)), Delivery(M(2), P(headers={"x-retry-count": 2}), body(t2))])
+    assert ch.acked == [(2, True)]
+    assert [(p[1], p[3].headers["x-retry-count"]) for p in ch.published] == [("tasks.high", 1), ("tasks.high", 3)]
+
+
+def test_batch_consumer_flushes_by_size_and_timer(monkeypatch):
+    flushed = []
+    monkeypatch.setattr(batch_consumer, "process_batch", lambda ch, batch: flushed.append([d.method.delivery_tag for d in batch]))
+    conn, ch = Conn(), Ch()
+    consumer = BatchConsumer(conn, ch, size=2, wait_ms=10)
+
+    consumer.on_message(ch, M(1), P(), b"")
+    consumer.on_message(ch, M(2), P(), b"")
+    consumer.on_message(ch, M(3), P(), b"")
+    conn.timers[-1]()
+
+    assert flushed == [[1, 2], [3]]
+    assert conn.removed == [1]
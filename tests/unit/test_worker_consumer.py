@@ -3,7 +3,10 @@ from dataclasses import dataclass
 from uuid import uuid4
 
 from app.core.enums import Priority, TaskStatus
+from app.core.config import settings
 from app.db.models.task import Task
+from app.db.models.task_result import TaskResult
+from app.messaging.codec import JSON, MSGPACK, get_codec
 from app.workers import consumer
 
 
@@ -54,6 +57,28 @@ def test_success_completed(monkeypatch, db_session_factory):
     assert ch.acked == [7] and t.status == TaskStatus.COMPLETED and t.started_at and t.finished_at and t.result == "OK" and t.error is None
 
 
+def test_large_result_stored_compressed(monkeypatch, db_session_factory):
+    monkeypatch.setattr(consumer, "SessionLocal", db_session_factory)
+    monkeypatch.setattr(settings, "TASK_RESULT_INLINE_MAX_BYTES", 100)
+    monkeypatch.setattr(settings, "TASK_RESULT_COMPRESSION", "zlib")
+    small, large = uuid4(), uuid4()
+    s = db_session_factory()
+    s.add_all([Task(id=x, title="t", description=None, priority=Priority.LOW, status=TaskStatus.PENDING) for x in (small, large)])
+    s.commit(); s.close()
+
+    monkeypatch.setattr(consumer, "_execute", lambda task: "ok" if task.id == small else "r" * 100_000)
+    for tid in (small, large):
+        consumer.on_message(Ch(), M(), P(), body(tid))
+
+    s2 = db_session_factory()
+    stored = s2.get(TaskResult, large)
+    assert stored.encoding == "zlib" and stored.size == 100_000 and len(stored.data) < 1000
+    t = s2.get(Task, large)
+    assert t.result_inline is None and t.result == "r" * 100_000
+    assert s2.get(Task, small).result == "ok" and s2.get(TaskResult, small) is None
+    s2.close()
+
+
 def test_execute_error_failed(monkeypatch, db_session_factory):
     monkeypatch.setattr(consumer, "SessionLocal", db_session_factory)
     tid = uuid4()
@@ -85,4 +110,44 @@ def test_outer_exception_dlq_when_retry_huge(monkeypatch, db_session_factory):
     ch, m, p = Ch(), M(delivery_tag=77, routing_key="tasks.high"), P(headers={"x-retry-count": 9999})
     b = body(tid)
     consumer.on_message(ch, m, p, b)
-    assert ch.acked == [77] and len(ch.published) == 1 and ch.published[0][1] == "tasks.dlq" and ch.published[0][2] == b
\ No newline at end of file
+    assert ch.acked == [77] and len(ch.published) == 1 and ch.published[0][1] == "tasks.dlq" and ch.published[0][2] == b
+
+def test_execute_error_rescheduled_in_schedule_mode(monkeypatch, db_session_factory):
+    monkeypatch.setattr(consumer, "SessionLocal", db_session_factory)
+    monkeypatch.setattr(consumer.settings, "RETRY_MODE", "schedule")
+    monkeypatch.setattr(consumer.settings, "MAX_RETRIES", 1)
+    tid = uuid4()
+    s = db_session_factory(); s.add(Task(id=tid, title="t", description=None, priority=Priority.LOW, status=TaskStatus.PENDING)); s.commit(); s.close()
+    monkeypatch.setattr(consumer, "_execute", lambda _: (_ for _ in ()).throw(ValueError("boom")))
+    ch = Ch()
+    consumer.on_message(ch, M(delivery_tag=1, routing_key="tasks.low"), P(), body(tid))
+    s2 = db_session_factory(); t = s2.get(Task, tid); s2.close()
+    assert ch.published == [] and t.status == TaskStatus.SCHEDULED and t.attempts == 1 and t.run_at and t.started_at is None
+
+    s3 = db_session_factory(); s3.get(Task, tid).status = TaskStatus.PENDING; s3.commit(); s3.close()
+    consumer.on_message(ch, M(delivery_tag=2, routing_key="tasks.low"), P(), body(tid))
+    s4 = db_session_factory(); t = s4.get(Task, tid); s4.close()
+    assert [x[1] for x in ch.published] == ["tasks.dlq"] and t.status == TaskStatus.FAILED and ch.acked == [1, 2]
+
+
+def test_msgpack_message_accepted_next_to_json(monkeypatch, db_session_factory):
+    monkeypatch.setattr(consumer, "SessionLocal", db_session_factory)
+    monkeypatch.setattr(consumer, "_execute", lambda _: "OK")
+    ids = [uuid4(), uuid4()]
+    s = db_session_factory(); s.add_all([Task(id=tid, title="t", description=None, priority=Priority.HIGH, status=TaskStatus.PENDING) for tid in ids]); s.commit(); s.close()
+    ch = Ch()
+    msgpack_props, json_props = P(), P()
+    msgpack_props.content_type, json_props.content_type = MSGPACK, JSON
+    consumer.on_message(ch, M(delivery_tag=1), msgpack_props, get_codec(MSGPACK).encode({"task_id": str(ids[0])}))
+    consumer.on_message(ch, M(delivery_tag=2), json_props, body(ids[1]))
+    consumer.on_message(ch, M(delivery_tag=3), P(), body(ids[1]))
+    s2 = db_session_factory(); statuses = [s2.get(Task, tid).status for tid in ids]; s2.close()
+    assert statuses == [TaskStatus.COMPLETED, TaskStatus.COMPLETED] and ch.published == [] and ch.acked == [1, 2, 3]
+
+
+def test_unknown_content_type_dlq(monkeypatch, db_session_factory):
+    monkeypatch.setattr(consumer, "SessionLocal", db_session_factory)
+    ch, p = Ch(), P()
+    p.content_type = "application/xml"
+    consumer.on_message(ch, M(delivery_tag=4), p, b"<task/>")
+    assert ch.acked == [4] and [x[1] for x in ch.published] == ["tasks.dlq"]
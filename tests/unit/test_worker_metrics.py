@@ -0,0 +1,51 @@
+import json
+from dataclasses import dataclass
+from uuid import uuid4
+
+from prometheus_client import REGISTRY
+
+from app.core.enums import Priority, TaskStatus
+from app.db.models.task import Task
+from app.workers import consumer
+
+
+class Ch:
+    def __init__(self): self.published, self.acked = [], []
+    def basic_publish(self, exchange, routing_key, body, properties=None): self.published.append(routing_key)
+    def basic_ack(self, delivery_tag): self.acked.append(delivery_tag)
+
+
+@dataclass
+class M:
+    delivery_tag: int = 1
+    routing_key: str = "tasks.metrics"
+
+
+class P:
+    headers = {}
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_consumer_counts_outcomes_and_handler_time(monkeypatch, db_session_factory):
+    monkeypatch.setattr(consumer, "SessionLocal", db_session_factory)
+    monkeypatch.setattr(consumer, "_execute", lambda task: "OK")
+    done, cancelled = uuid4(), uuid4()
+    s = db_session_factory()
+    s.add(Task(id=done, title="t", description=None, priority=Priority.HIGH, status=TaskStatus.PENDING, type="metrics"))
+    s.add(Task(id=cancelled, title="t", description=None, priority=Priority.HIGH, status=TaskStatus.CANCELLED))
+    s.commit(); s.close()
+    before = {o: sample("worker_messages_total", queue="tasks.metrics", outcome=o) for o in ("completed", "claim_miss", "invalid")}
+    handled = sample("worker_handler_duration_seconds_count", type="metrics")
+
+    ch = Ch()
+    for tid in (done, cancelled):
+        consumer.on_message(ch, M(), P(), json.dumps({"task_id": str(tid)}).encode())
+    consumer.on_message(ch, M(), P(), b"nope")
+
+    for outcome in ("completed", "claim_miss", "invalid"):
+        assert sample("worker_messages_total", queue="tasks.metrics", outcome=outcome) - before[outcome] == 1
+    assert sample("worker_dlq_total", queue="tasks.metrics", reason="invalid") >= 1
+    assert sample("worker_handler_duration_seconds_count", type="metrics") - handled == 1
@@ -0,0 +1,100 @@
+import json
+import pickle
+import threading
+from dataclasses import dataclass
+from uuid import uuid4
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.enums import Priority, TaskStatus
+from app.db.base import Base
+from app.db.models.task import Task
+from app.workers import consumer
+from app.workers.pool import PooledConsumer, task_values
+
+
+class Ch:
+    def __init__(self): self.published, self.acked = [], []
+    def basic_publish(self, exchange, routing_key, body, properties=None): self.published.append((exchange, routing_key, body, properties))
+    def basic_ack(self, delivery_tag, multiple=False): self.acked.append(delivery_tag)
+
+
+class Conn:
+    def __init__(self): self.callbacks, self.threads = [], set()
+    def add_callback_threadsafe(self, cb): self.threads.add(threading.get_ident()); self.callbacks.append(cb)
+    def run_callbacks(self):
+        for cb in self.callbacks: cb()
+
+
+@dataclass
+class M:
+    delivery_tag: int = 1
+    routing_key: str = "tasks.high"
+
+
+class P:
+    def __init__(self, headers=None): self.headers = headers or {}
+
+
+def body(task_id): return json.dumps({"task_id": str(task_id)}).encode()
+
+
+def add_tasks(session_factory, n):
+    s = session_factory()
+    ids = [uuid4() for _ in range(n)]
+    s.add_all([Task(id=i, title="t", description=None, priority=Priority.HIGH, status=TaskStatus.PENDING) for i in ids])
+    s.commit(); s.close()
+    return ids
+
+
+def test_thread_pool_runs_off_connection_thread_and_acks_via_callbacks(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'pool.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    monkeypatch.setattr(consumer, "SessionLocal", factory)
+    ran_in = []
+    monkeypatch.setattr(consumer, "_execute", lambda task: ran_in.append(threading.get_ident()) or "OK")
+    ids = add_tasks(factory, 4)
+
+    conn, ch = Conn(), Ch()
+    pooled = PooledConsumer(conn, ch, mode="thread", concurrency=2)
+    for n, tid in enumerate(ids, start=1):
+        pooled.on_message(ch, M(delivery_tag=n), P(), body(tid))
+    pooled.shutdown()
+
+    assert ch.acked == []
+    conn.run_callbacks()
+
+    s = factory(); statuses = {s.get(Task, i).status for i in ids}; s.close()
+    assert sorted(ch.acked) == [1, 2, 3, 4]
+    assert statuses == {TaskStatus.COMPLETED}
+    assert threading.get_ident() not in set(ran_in) and threading.get_ident() not in conn.threads
+
+
+def test_process_pool_executes_in_child():
+    task = Task(id=uuid4(), title="t", type="default", priority=Priority.HIGH, status=TaskStatus.IN_PROGRESS)
+    pooled = PooledConsumer(Conn(), Ch(), mode="process", concurrency=1)
+    try:
+        assert pooled._execute(task) == f"ok:{task.id}"
+    finally:
+        pooled.shutdown()
+
+
+def test_process_pool_gets_plain_values_of_session_bound_task(tmp_path):
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'pool.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    [task_id] = add_tasks(factory, 1)
+
+    with factory() as s:
+        task = s.get(Task, task_id)
+        values = task_values(task)
+        assert pickle.loads(pickle.dumps(values)) == values
+        assert "stored_result" not in values and "_sa_instance_state" not in values
+
+        pooled = PooledConsumer(Conn(), Ch(), mode="process", concurrency=1)
+        try:
+            assert pooled._execute(task) == f"ok:{task_id}"
+        finally:
+            pooled.shutdown()
@@ -0,0 +1,72 @@
+from collections import Counter
+from dataclasses import dataclass
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.enums import Priority
+from app.workers.scheduler import PriorityScheduler, SmoothWeightedRoundRobin, parse_weights
+
+H, M_, L = Priority.HIGH, Priority.MEDIUM, Priority.LOW
+
+
+class Ch:
+    def __init__(self): self.consumers = {}
+    def basic_consume(self, queue, on_message_callback, auto_ack=False): self.consumers[queue] = on_message_callback
+
+
+class Conn:
+    def __init__(self): self.limits = []
+    def process_data_events(self, time_limit=None): self.limits.append(time_limit)
+
+
+@dataclass
+class M:
+    delivery_tag: int = 1
+
+
+def wait_count(priority):
+    return REGISTRY.get_sample_value("worker_queue_wait_seconds_count", {"priority": priority.value}) or 0.0
+
+
+def test_parse_weights():
+    assert parse_weights("6, 3, 1") == {H: 6, M_: 3, L: 1}
+    with pytest.raises(ValueError):
+        parse_weights("6,3")
+    with pytest.raises(ValueError):
+        parse_weights("6,0,1")
+
+
+def test_wrr_follows_weights_and_is_work_conserving():
+    wrr = SmoothWeightedRoundRobin({H: 6, M_: 3, L: 1})
+    picks = Counter(wrr.pick([H, M_, L]) for _ in range(100))
+    assert picks == {H: 60, M_: 30, L: 10}
+
+    assert [wrr.pick([L]) for _ in range(3)] == [L, L, L]
+    assert wrr.pick([]) is None
+
+
+def test_scheduler_dispatches_by_weight_and_records_wait():
+    before = {p: wait_count(p) for p in (H, L)}
+    dispatched = []
+    conn, ch = Conn(), Ch()
+    sched = PriorityScheduler(
+        conn, ch,
+        queues={H: "tasks.high", M_: "tasks.medium", L: "tasks.low"},
+        weights={H: 6, M_: 3, L: 1},
+        dispatch=lambda channel, method, props, body: dispatched.append(body),
+        capacity=lambda: 1,
+    )
+    sched.consume()
+    for n in range(20):
+        for queue in ("tasks.low", "tasks.medium", "tasks.high"):
+            ch.consumers[queue](ch, M(n), None, queue)
+
+    for _ in range(10):
+        sched.run_once()
+
+    assert Counter(dispatched) == {"tasks.high": 6, "tasks.medium": 3, "tasks.low": 1}
+    assert conn.limits == [0] * 10
+    assert sched.stats[H].dispatched == 6 and sched.stats[L].dispatched == 1
+    assert sched.stats[H].percentile(99) >= 0
+    assert wait_count(H) - before[H] == 6 and wait_count(L) - before[L] == 1